@@ -0,0 +1,90 @@
+"""Micro-benchmark of the fitting parser against the former regex cascade.
+
+Usage: python benchmarks/bench_fitting_parser.py [--lines N] [--repeat N]
+"""
+import argparse
+import os
+import re
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from structureintel.helper.fitting_parser import parse_fitting  # noqa: E402
+
+SECTIONS = (
+    ("High Power Slots", "Standup Launcher"),
+    ("Medium Power Slots", "Standup Warp Scrambler I"),
+    ("Low Power Slots", "Standup Ballistic Control System I"),
+    ("Rig Slots", "Standup M-Set Missile Projection I"),
+    ("Service Slots", "Standup Market Hub I"),
+)
+
+
+def make_paste(lines_per_section: int, sections=SECTIONS) -> str:
+    parts = []
+    for header, module in sections:
+        parts.append(header)
+        parts += [module] * lines_per_section
+    return "\r\n".join(parts) + "\r\n"
+
+
+def legacy_parse(fitting: str) -> list:
+    """Section extraction as done by StructureForm.save up to 0.1.0"""
+    fitting_data = fitting.replace("\r\n", "\n")
+    flags = re.M | re.S
+
+    def section(header, following):
+        if header not in fitting_data:
+            return None
+        for next_header in following:
+            match = re.search(f"{header}\n(.*?){next_header}", fitting_data, flags)
+            if match:
+                return match.group(1)
+        return fitting_data.replace(f"{header}\n", "")
+
+    highslots = section(
+        "High Power Slots",
+        ("Medium Power Slots", "Low Power Slots", "Rig Slots", "Service Slots"),
+    )
+    mediumslots = section(
+        "Medium Power Slots", ("Low Power Slots", "Rig Slots", "Service Slots")
+    )
+    lowslots = section("Low Power Slots", ("Rig Slots", "Service Slots"))
+    rigslots = section("Rig Slots", ("Service Slots",))
+    serviceslots = None
+    if "Service Slots" in fitting_data:
+        serviceslots = fitting_data.split("Service Slots\n")[1]
+
+    items = []
+    for slot, modules in (
+        ("Highslot", highslots),
+        ("Midslot", mediumslots),
+        ("Lowslot", lowslots),
+        ("Rigslot", rigslots),
+        ("Service", serviceslots),
+    ):
+        if modules:
+            items += [(slot, name) for name in modules.strip().split("\n")]
+    return items
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--lines", type=int, default=2000, help="lines per section")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    pastes = {
+        "all sections": make_paste(args.lines),
+        "high and service only": make_paste(args.lines, (SECTIONS[0], SECTIONS[4])),
+    }
+    for title, paste in pastes.items():
+        print(f"{title}: {len(paste.splitlines())} lines, {len(paste)} bytes")
+        for name, func in (("regex cascade", legacy_parse), ("parser", parse_fitting)):
+            best = min(timeit.repeat(lambda: func(paste), number=1, repeat=args.repeat))
+            print(f"  {name:<14} {best * 1000:9.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
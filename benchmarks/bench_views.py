@@ -0,0 +1,233 @@
+"""Benchmark of the structureintel views on a synthetic universe.
+
+Runs offline on an in-memory SQLite database migrated from the testauth
+settings. The views use a local memory cache, which is cleared before every
+cold run, so the Redis configured there is never written to or flushed.
+Alliance Auth still connects to that Redis once on startup.
+
+For every structure count, the views are timed cold (empty cache) and warm.
+Results are written as JSON, which ``compare.py`` can compare between
+releases.
+
+Usage: python benchmarks/bench_views.py [--sizes N [N ...]] [--repeat N]
+       [--output FILE]
+"""
+import argparse
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "testauth.settings")
+
+import django  # noqa: E402
+
+django.setup()
+
+from django.core.cache import cache  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.test.utils import (  # noqa: E402
+    CaptureQueriesContext,
+    override_settings,
+    setup_test_environment,
+)
+from django.urls import reverse  # noqa: E402
+from eveuniverse.models import EveSolarSystem  # noqa: E402
+
+from allianceauth.tests.auth_utils import AuthUtils  # noqa: E402
+
+from benchmarks import synthetic  # noqa: E402
+from structureintel import __version__  # noqa: E402
+from structureintel.forms import StructureForm  # noqa: E402
+from structureintel.models import Structure  # noqa: E402
+
+DEFAULT_SIZES = (1000, 10000, 50000)
+
+# cold runs clear the cache, which must never be a shared one
+BENCHMARK_CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.locmem.LocMemCache",
+        "LOCATION": "structureintel-benchmark",
+    }
+}
+
+# parameters of a DataTables request for the first page sorted by name
+PAGE_PARAMS = {
+    "draw": "1",
+    "start": "0",
+    "length": "50",
+    "search[value]": "",
+    "columns[0][data]": "structure_name",
+    "order[0][column]": "0",
+    "order[0][dir]": "asc",
+}
+
+
+def create_client() -> Client:
+    user = AuthUtils.create_user("Benchmark")
+    AuthUtils.add_main_character_2(user, "Benchmark", 1001)
+    user = AuthUtils.add_permission_to_user_by_name("structureintel.basic_access", user)
+    client = Client()
+    client.force_login(user)
+    return client
+
+
+def get(client: Client, url: str, params: dict = None) -> Callable[[], bytes]:
+    def request() -> bytes:
+        response = client.get(url, params or {})
+        if response.status_code != 200:
+            raise RuntimeError(f"{url} returned {response.status_code}")
+        if response.streaming:
+            return b"".join(response.streaming_content)
+        return response.content
+
+    return request
+
+
+def save_form(rng: random.Random, system_ids: List[int]) -> Callable[[], bytes]:
+    type_id, _, _, slots = synthetic.STRUCTURE_TYPES[0]
+
+    def save() -> bytes:
+        form = StructureForm(
+            data={
+                "eve_solar_system_2": str(rng.choice(system_ids)),
+                "eve_structure_type_2": str(type_id),
+                "name": "Benchmark Structure",
+                "owner": "Benchmark Corp",
+                "mode": Structure.PowerMode.FULL_POWER,
+                "reinforcement_hour": "18",
+                "fitting": synthetic.fitting_paste(
+                    synthetic.random_fitting(rng, slots)
+                ),
+            }
+        )
+        if not form.is_valid():
+            raise RuntimeError(f"Invalid form: {form.errors.as_json()}")
+        form.save()
+        return b""
+
+    return save
+
+
+def scenarios(client: Client) -> Dict[str, Callable[[], bytes]]:
+    rng = random.Random(0)
+    system_ids = list(EveSolarSystem.objects.values_list("id", flat=True))
+    structure_ids = list(Structure.objects.values_list("id", flat=True))
+    list_url = reverse("structureintel:structureintel_list_data")
+    details_url = reverse(
+        "structureintel:structure_details",
+        args=[structure_ids[len(structure_ids) // 2]],
+    )
+    return {
+        "dashboard": get(client, reverse("structureintel:dashboard")),
+        "list_data": get(client, list_url),
+        "list_data_compact": get(client, list_url, {"format": "compact"}),
+        "list_data_page": get(client, list_url, PAGE_PARAMS),
+        "structure_details": get(client, details_url),
+        "solar_system": get(
+            client, reverse("structureintel:solar_system"), {"term": "J1"}
+        ),
+        "structures": get(client, reverse("structureintel:structures"), {"term": "a"}),
+        "proximity": get(
+            client,
+            reverse("structureintel:proximity"),
+            {"system": system_ids[0], "jumps": 5},
+        ),
+        "list_data_near": get(
+            client, list_url, {**PAGE_PARAMS, "near": system_ids[0], "jumps": 5}
+        ),
+        "timers": get(client, reverse("structureintel:timers"), {"hours": 6}),
+        "timers_near": get(
+            client,
+            reverse("structureintel:timers"),
+            {"hours": 6, "near": system_ids[0], "jumps": 5},
+        ),
+        "form_save": save_form(rng, system_ids),
+    }
+
+
+def measure(func: Callable[[], bytes], repeat: int, cold: bool) -> dict:
+    """Return timings in ms, the maximum query count and payload size of a call"""
+    timings = []
+    queries = 0
+    size = 0
+    for _ in range(repeat):
+        if cold:
+            cache.clear()
+        with CaptureQueriesContext(connection) as context:
+            start = time.perf_counter()
+            size = len(func())
+            timings.append((time.perf_counter() - start) * 1000)
+        queries = max(queries, len(context))
+    timings.sort()
+    return {
+        "min_ms": round(timings[0], 3),
+        "median_ms": round(statistics.median(timings), 3),
+        "p95_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 3),
+        "queries": queries,
+        "bytes": size,
+    }
+
+
+def run(sizes: List[int], repeat: int) -> dict:
+    client = create_client()
+    synthetic.generate_universe()
+    results = {}
+    for size in sizes:
+        synthetic.clear_structures()
+        start = time.perf_counter()
+        synthetic.generate_structures(size)
+        print(f"{size} structures generated in {time.perf_counter() - start:.1f} s")
+        results[str(size)] = {}
+        for name, func in scenarios(client).items():
+            results[str(size)][name] = {
+                "cold": measure(func, repeat, cold=True),
+                "warm": measure(func, repeat, cold=False),
+            }
+            cold = results[str(size)][name]["cold"]
+            warm = results[str(size)][name]["warm"]
+            print(
+                f"  {name:<18} cold {cold['median_ms']:9.2f} ms"
+                f" ({cold['queries']:3d} queries)"
+                f"  warm {warm['median_ms']:9.2f} ms ({warm['queries']:3d} queries)"
+            )
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=DEFAULT_SIZES)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--output", default="bench_views.json")
+    args = parser.parse_args()
+
+    setup_test_environment()
+    connection.creation.create_test_db(verbosity=0)
+    with override_settings(CACHES=BENCHMARK_CACHES):
+        results = run(sorted(args.sizes), max(1, args.repeat))
+    with open(args.output, "w") as file:
+        json.dump(
+            {
+                "version": __version__,
+                "created_at": datetime.now(timezone.utc).isoformat(),
+                "python": platform.python_version(),
+                "django": django.get_version(),
+                "sqlite": connection.Database.sqlite_version,
+                "repeat": args.repeat,
+                "results": results,
+            },
+            file,
+            indent=2,
+        )
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Compare two result files of bench_views.py.
+
+Prints the change of the median time and the query count of every view and
+exits with status 1 if a view got slower than the threshold or needs more
+queries than before.
+
+Usage: python benchmarks/compare.py BASELINE CURRENT [--threshold PERCENT]
+"""
+import argparse
+import json
+import sys
+
+
+def compare(baseline: dict, current: dict, threshold: float) -> list:
+    """Return a report line for every measurement and whether it regressed"""
+    lines = []
+    for size, views in current["results"].items():
+        for view, modes in views.items():
+            for mode, result in modes.items():
+                try:
+                    before = baseline["results"][size][view][mode]
+                except KeyError:
+                    continue
+                change = (
+                    (result["median_ms"] - before["median_ms"])
+                    / before["median_ms"]
+                    * 100
+                    if before["median_ms"]
+                    else 0.0
+                )
+                regressed = change > threshold or result["queries"] > before["queries"]
+                lines.append(
+                    (
+                        f"{size:>6} {view:<18} {mode:<4}"
+                        f" {before['median_ms']:9.2f} -> {result['median_ms']:9.2f} ms"
+                        f" {change:+7.1f}%"
+                        f"  queries {before['queries']:3d} -> {result['queries']:3d}",
+                        regressed,
+                    )
+                )
+    return lines
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("baseline")
+    parser.add_argument("current")
+    parser.add_argument(
+        "--threshold", type=float, default=20, help="allowed slowdown in percent"
+    )
+    args = parser.parse_args()
+
+    with open(args.baseline) as file:
+        baseline = json.load(file)
+    with open(args.current) as file:
+        current = json.load(file)
+    print(f"{baseline['version']} -> {current['version']}")
+    lines = compare(baseline, current, args.threshold)
+    for line, regressed in lines:
+        print(f"{line}{'  REGRESSION' if regressed else ''}")
+    if any(regressed for _, regressed in lines):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
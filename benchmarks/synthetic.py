@@ -0,0 +1,290 @@
+"""Generator of a synthetic eve universe and structures for benchmarks.
+
+The universe roughly matches the size of the real map: regions with constellations and
+systems connected by stargates, structure types with slot attributes and structure
+modules for every slot. Structures are fitted from a pool of fittings per structure
+type, like the doctrine fits of real owners. All rows are created with bulk inserts and
+deterministic IDs and names, so results are comparable between runs.
+
+Requires a configured Django, see ``bench_views.py``.
+"""
+import random
+from collections import defaultdict
+from functools import lru_cache
+from typing import Dict, List, Tuple
+
+from django.db import connection
+from eveuniverse.models import (
+    EveCategory,
+    EveConstellation,
+    EveDogmaAttribute,
+    EveGroup,
+    EveRegion,
+    EveSolarSystem,
+    EveStargate,
+    EveType,
+    EveTypeDogmaAttribute,
+)
+
+from structureintel.helper import rollups, timers
+from structureintel.helper.fitting_parser import SECTION_HEADERS, FittingItem
+from structureintel.helper.fittings import (
+    apply_fitting,
+    canonical_fitting,
+    get_or_create_fittings,
+)
+from structureintel.models import (
+    Fitting,
+    FittingModule,
+    FittingRevision,
+    ReinforceHourCount,
+    Structure,
+    StructureRollup,
+)
+
+BATCH_SIZE = 5000
+
+STRUCTURE_CATEGORY_ID = 65
+STRUCTURE_MODULE_CATEGORY_ID = 66
+
+# name, group ID and slot counts high, med, low, rig, service
+STRUCTURE_TYPES = (
+    (35832, "Astrahus", 1657, (3, 3, 2, 3, 3)),
+    (35833, "Fortizar", 1657, (5, 4, 3, 3, 5)),
+    (35834, "Keepstar", 1657, (7, 6, 4, 3, 7)),
+    (35825, "Raitaru", 1404, (2, 3, 2, 3, 3)),
+    (35826, "Azbel", 1404, (3, 4, 3, 3, 5)),
+    (35827, "Sotiyo", 1404, (4, 5, 4, 3, 6)),
+    (35835, "Athanor", 1406, (2, 3, 2, 3, 3)),
+    (35836, "Tatara", 1406, (3, 4, 3, 3, 5)),
+)
+
+# dogma attribute IDs of the slot counts in the order of STRUCTURE_TYPES,
+# which is also the order of FittingModule.Slot
+SLOT_ATTRIBUTE_IDS = (14, 13, 12, 1137, 2056)
+
+# section headers of a pasted fitting by slot
+SLOT_HEADERS = {slot: header for header, slot in SECTION_HEADERS.items() if slot}
+
+MODULES_PER_SLOT = 20
+
+# distinct fittings of each structure type
+FITTINGS_PER_TYPE = 25
+
+
+def generate_universe(regions: int = 64, systems_per_region: int = 125) -> None:
+    """Create a universe with 5 constellations per region"""
+    rng = random.Random(0)
+    EveRegion.objects.bulk_create(
+        EveRegion(id=10000001 + num, name=f"Region {num:03d}") for num in range(regions)
+    )
+    constellations = [
+        EveConstellation(
+            id=20000001 + region * 5 + num,
+            name=f"Constellation {region:03d}-{num}",
+            eve_region_id=10000001 + region,
+        )
+        for region in range(regions)
+        for num in range(5)
+    ]
+    EveConstellation.objects.bulk_create(constellations)
+    EveSolarSystem.objects.bulk_create(
+        (
+            EveSolarSystem(
+                id=30000001 + num,
+                name=_system_name(rng, num),
+                eve_constellation_id=constellations[num % len(constellations)].id,
+                security_status=round(rng.uniform(-1, 1), 2),
+            )
+            for num in range(regions * systems_per_region)
+        ),
+        batch_size=BATCH_SIZE,
+    )
+    _generate_stargates(rng)
+    _generate_types()
+
+
+def _generate_stargates(rng: random.Random) -> None:
+    """Connect the systems of each constellation in a ring, the constellations
+    in a chain and add some random shortcuts
+    """
+    systems = defaultdict(list)
+    for system_id, constellation_id in EveSolarSystem.objects.order_by(
+        "id"
+    ).values_list("id", "eve_constellation_id"):
+        systems[constellation_id].append(system_id)
+    connections = set()
+    for system_ids in systems.values():
+        connections.update(zip(system_ids, system_ids[1:] + system_ids[:1]))
+    firsts = [system_ids[0] for _, system_ids in sorted(systems.items())]
+    connections.update(zip(firsts, firsts[1:]))
+    all_ids = [system_id for system_ids in systems.values() for system_id in system_ids]
+    for _ in range(len(all_ids) // 10):
+        connections.add(tuple(rng.sample(all_ids, 2)))
+
+    celestials = EveCategory.objects.create(id=2, name="Celestial", published=True)
+    EveGroup.objects.create(
+        id=10, name="Stargate", eve_category=celestials, published=True
+    )
+    EveType.objects.create(id=16, name="Stargate", eve_group_id=10, published=True)
+    EveStargate.objects.bulk_create(
+        (
+            EveStargate(
+                id=50000001 + num,
+                name=f"Stargate ({destination_id})",
+                eve_solar_system_id=source_id,
+                destination_eve_solar_system_id=destination_id,
+                eve_type_id=16,
+            )
+            for num, (source_id, destination_id) in enumerate(
+                gate
+                for first_id, second_id in sorted(connections)
+                for gate in ((first_id, second_id), (second_id, first_id))
+            )
+        ),
+        batch_size=BATCH_SIZE,
+    )
+
+
+def _system_name(rng: random.Random, num: int) -> str:
+    if num % 3 == 0:
+        # a third of the map are wormhole systems sharing the J prefix
+        return f"J{100000 + num}"
+    letters = "".join(rng.choice("ABCDEFGHIKLMNOPRSTUVY") for _ in range(2))
+    return f"{letters.title()}{num:05d}"
+
+
+def _generate_types() -> None:
+    structures = EveCategory.objects.create(
+        id=STRUCTURE_CATEGORY_ID, name="Structure", published=True
+    )
+    for group_id in {group_id for _, _, group_id, _ in STRUCTURE_TYPES}:
+        EveGroup.objects.create(
+            id=group_id,
+            name=f"Group {group_id}",
+            eve_category=structures,
+            published=True,
+        )
+    EveType.objects.bulk_create(
+        EveType(id=type_id, name=name, eve_group_id=group_id, published=True)
+        for type_id, name, group_id, _ in STRUCTURE_TYPES
+    )
+    EveDogmaAttribute.objects.bulk_create(
+        EveDogmaAttribute(id=attribute_id, name=f"Slots {attribute_id}")
+        for attribute_id in SLOT_ATTRIBUTE_IDS
+    )
+    EveTypeDogmaAttribute.objects.bulk_create(
+        EveTypeDogmaAttribute(
+            eve_type_id=type_id, eve_dogma_attribute_id=attribute_id, value=value
+        )
+        for type_id, _, _, slots in STRUCTURE_TYPES
+        for attribute_id, value in zip(SLOT_ATTRIBUTE_IDS, slots)
+    )
+
+    structure_modules = EveCategory.objects.create(
+        id=STRUCTURE_MODULE_CATEGORY_ID, name="Structure Module", published=True
+    )
+    EveGroup.objects.create(
+        id=1415,
+        name="Structure Module",
+        eve_category=structure_modules,
+        published=True,
+    )
+    EveType.objects.bulk_create(
+        EveType(id=type_id, name=name, eve_group_id=1415, published=True)
+        for slot_modules in module_types().values()
+        for type_id, name in slot_modules
+    )
+
+
+@lru_cache(maxsize=None)
+def module_types() -> Dict[str, List[Tuple[int, str]]]:
+    """Return the generated module types by slot"""
+    return {
+        slot: [
+            (40000000 + slot_num * 1000 + num, f"Standup {slot} Module {num}")
+            for num in range(MODULES_PER_SLOT)
+        ]
+        for slot_num, slot in enumerate(FittingModule.Slot.values)
+    }
+
+
+def random_fitting(rng: random.Random, slots: Tuple[int, ...]) -> Dict[str, list]:
+    """Return random module types filling the given slot counts"""
+    modules = module_types()
+    return {
+        slot: [rng.choice(modules[slot]) for _ in range(count)]
+        for slot, count in zip(FittingModule.Slot.values, slots)
+    }
+
+
+def fitting_paste(fitting: Dict[str, list]) -> str:
+    """Return a fitting in the format pasted from the game client"""
+    lines = []
+    for slot, modules in fitting.items():
+        lines.append(SLOT_HEADERS[slot])
+        lines += [name for _, name in modules]
+    return "\n".join(lines)
+
+
+def generate_structures(count: int, seed: int = 0) -> None:
+    """Create structures with random fittings spread over all systems"""
+    rng = random.Random(seed)
+    system_ids = list(EveSolarSystem.objects.values_list("id", flat=True))
+    power_modes = Structure.PowerMode.values
+    type_ids = {
+        name: type_id
+        for slot_modules in module_types().values()
+        for type_id, name in slot_modules
+    }
+    fittings = {
+        type_id: [
+            canonical_fitting(
+                (
+                    FittingItem(slot, name)
+                    for slot, modules in random_fitting(rng, slots).items()
+                    for _, name in modules
+                ),
+                type_ids,
+            )
+            for _ in range(FITTINGS_PER_TYPE)
+        ]
+        for type_id, _, _, slots in STRUCTURE_TYPES
+    }
+    fitting_ids = get_or_create_fittings(
+        fitting for type_fittings in fittings.values() for fitting in type_fittings
+    )
+    for start in range(0, count, BATCH_SIZE):
+        structures = []
+        for num in range(start, min(start + BATCH_SIZE, count)):
+            type_id, _, _, _ = rng.choice(STRUCTURE_TYPES)
+            structure = Structure(
+                eve_solar_system_id=rng.choice(system_ids),
+                eve_type_id=type_id,
+                name=f"Structure {num}",
+                owner=f"Corporation {rng.randrange(500)}",
+                power_mode=rng.choice(power_modes),
+                reinforce_hour=rng.randrange(24),
+            )
+            fitting = rng.choice(fittings[type_id])
+            apply_fitting(structure, fitting, fitting_ids[fitting], type_ids)
+            structures.append(structure)
+        Structure.objects.bulk_create(structures)
+    rollups.rebuild()
+    timers.rebuild()
+
+
+def clear_structures() -> None:
+    """Delete all structures, fittings and their stored counts without loading
+    them for signals
+    """
+    with connection.cursor() as cursor:
+        for model in (
+            FittingRevision,
+            Structure,
+            FittingModule,
+            Fitting,
+            StructureRollup,
+            ReinforceHourCount,
+        ):
+            cursor.execute(f"DELETE FROM {model._meta.db_table}")
@@ -1 +1,112 @@
-# put your app settings here
+import os
+import tempfile
+
+from django.conf import settings
+
+# Page, sort and filter the structure list on the server instead of in the browser
+STRUCTUREINTEL_LIST_SERVER_SIDE = getattr(
+    settings, "STRUCTUREINTEL_LIST_SERVER_SIDE", True
+)
+
+# Maximum number of rows returned for a single page of the structure list
+STRUCTUREINTEL_LIST_MAX_PAGE_LENGTH = getattr(
+    settings, "STRUCTUREINTEL_LIST_MAX_PAGE_LENGTH", 1000
+)
+
+# Seconds a rendered structure list payload is kept in the cache
+STRUCTUREINTEL_LIST_CACHE_TIMEOUT = getattr(
+    settings, "STRUCTUREINTEL_LIST_CACHE_TIMEOUT", 3600
+)
+
+# Stream the full structure list in chunks instead of building it in memory.
+# Streamed lists are not cached, but browsers can still revalidate them.
+STRUCTUREINTEL_LIST_STREAMING = getattr(
+    settings, "STRUCTUREINTEL_LIST_STREAMING", False
+)
+
+# Number of structures fetched from the database per chunk of a streamed list,
+# with one query per chunk
+STRUCTUREINTEL_LIST_STREAMING_CHUNK_SIZE = getattr(
+    settings, "STRUCTUREINTEL_LIST_STREAMING_CHUNK_SIZE", 500
+)
+
+# Seconds between polls of the list page for changed structures, 0 disables polling
+STRUCTUREINTEL_LIST_POLL_INTERVAL = getattr(
+    settings, "STRUCTUREINTEL_LIST_POLL_INTERVAL", 60
+)
+
+# Seconds a delta of the structure list reaches back before its cursor,
+# so changes committed after a poll started are not missed
+STRUCTUREINTEL_LIST_SYNC_OVERLAP = getattr(
+    settings, "STRUCTUREINTEL_LIST_SYNC_OVERLAP", 60
+)
+
+# Days tombstones of deleted structures are kept. Clients with an older
+# cursor have to reload the whole list.
+STRUCTUREINTEL_TOMBSTONE_MAX_AGE = getattr(
+    settings, "STRUCTUREINTEL_TOMBSTONE_MAX_AGE", 7
+)
+
+# Seconds a rendered structure details modal is kept in the cache
+STRUCTUREINTEL_DETAILS_CACHE_TIMEOUT = getattr(
+    settings, "STRUCTUREINTEL_DETAILS_CACHE_TIMEOUT", 3600
+)
+
+# Number of records imported by one task of a background import
+STRUCTUREINTEL_IMPORT_CHUNK_SIZE = getattr(
+    settings, "STRUCTUREINTEL_IMPORT_CHUNK_SIZE", 500
+)
+
+# Maximum number of results returned by the autocomplete views
+STRUCTUREINTEL_AUTOCOMPLETE_MAX_RESULTS = getattr(
+    settings, "STRUCTUREINTEL_AUTOCOMPLETE_MAX_RESULTS", 20
+)
+
+# Seconds browsers may reuse an autocomplete response
+STRUCTUREINTEL_AUTOCOMPLETE_MAX_AGE = getattr(
+    settings, "STRUCTUREINTEL_AUTOCOMPLETE_MAX_AGE", 3600
+)
+
+# Record wall time, SQL queries, payload size and cache hits of every view
+STRUCTUREINTEL_INSTRUMENTATION = getattr(
+    settings, "STRUCTUREINTEL_INSTRUMENTATION", False
+)
+
+# Instrumented requests taking at least this many milliseconds are logged
+STRUCTUREINTEL_SLOW_REQUEST_MS = getattr(
+    settings, "STRUCTUREINTEL_SLOW_REQUEST_MS", 1000
+)
+
+# Number of latest requests per view the stats percentiles are computed from
+STRUCTUREINTEL_STATS_WINDOW = getattr(settings, "STRUCTUREINTEL_STATS_WINDOW", 1000)
+
+# Allow staff with the profile_requests permission to profile requests
+# by adding profile=1 to the URL
+STRUCTUREINTEL_PROFILING = getattr(settings, "STRUCTUREINTEL_PROFILING", False)
+
+# Directory the profiling captures are saved to
+STRUCTUREINTEL_PROFILING_DIR = getattr(
+    settings,
+    "STRUCTUREINTEL_PROFILING_DIR",
+    os.path.join(tempfile.gettempdir(), "structureintel_profiles"),
+)
+
+# Number of latest profiling captures kept
+STRUCTUREINTEL_PROFILING_MAX_CAPTURES = getattr(
+    settings, "STRUCTUREINTEL_PROFILING_MAX_CAPTURES", 20
+)
+
+# Largest number of jumps accepted by proximity queries
+STRUCTUREINTEL_PROXIMITY_MAX_JUMPS = getattr(
+    settings, "STRUCTUREINTEL_PROXIMITY_MAX_JUMPS", 20
+)
+
+# Maximum number of structures returned by the timers endpoint
+STRUCTUREINTEL_TIMERS_MAX_RESULTS = getattr(
+    settings, "STRUCTUREINTEL_TIMERS_MAX_RESULTS", 1000
+)
+
+# Maximum number of rows shown per dimension on the dashboard
+STRUCTUREINTEL_DASHBOARD_MAX_ROWS = getattr(
+    settings, "STRUCTUREINTEL_DASHBOARD_MAX_ROWS", 25
+)
@@ -7,3 +7,6 @@ class StructureIntelConfig(AppConfig):
     name = "structureintel"
     label = "structureintel"
     verbose_name = f"Structures v{__version__}"
+
+    def ready(self):
+        from . import signals  # noqa: F401
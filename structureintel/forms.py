@@ -1,11 +1,20 @@
-import re
-
 from django import forms
 from django.core.validators import MaxValueValidator, MinValueValidator
+from django.db import transaction
 from django.utils.html import format_html
+from django.utils.translation import gettext_lazy as _
 from eveuniverse.models import EveSolarSystem, EveType
 
-from structureintel.models import Structure, StructureModule
+from structureintel.helper.fitting_parser import parse_fitting
+from structureintel.helper.fittings import (
+    apply_fitting,
+    canonical_fitting,
+    fitting_paste,
+    get_or_create_fittings,
+)
+from structureintel.helper.history import record_revision
+from structureintel.helper.type_index import resolve_type_ids
+from structureintel.models import ImportJob, Structure
 
 
 class StructureForm(forms.ModelForm):
@@ -50,7 +59,6 @@ class StructureForm(forms.ModelForm):
             "owner",
             "mode",
             "reinforcement_hour",
-            "fitting",
         }
 
     def __init__(self, *args, **kwargs):
@@ -64,6 +72,19 @@ class StructureForm(forms.ModelForm):
 
         super().__init__(*args, **kwargs)
         if my_instance:
+            # fitting and time of the last change before this edit
+            self.previous_fitting = (
+                my_instance.fitting_id,
+                my_instance.last_updated_at,
+            )
+            self.initial.setdefault(
+                "eve_solar_system_2", my_instance.eve_solar_system_id
+            )
+            self.initial.setdefault("eve_structure_type_2", my_instance.eve_type_id)
+            self.initial.setdefault("mode", my_instance.power_mode)
+            self.initial.setdefault("reinforcement_hour", my_instance.reinforce_hour)
+            if not self.is_bound:
+                self.initial["fitting"] = fitting_paste(my_instance.fitting_id)
             self.fields["eve_solar_system_2"].widget.choices = [
                 (
                     str(my_instance.eve_solar_system_id),
@@ -71,7 +92,7 @@ class StructureForm(forms.ModelForm):
                 )
             ]
             self.fields["eve_structure_type_2"].widget.choices = [
-                (str(my_instance.structure_type_id), my_instance.structure_type.name)
+                (str(my_instance.eve_type_id), my_instance.eve_type.name)
             ]
 
     def clean(self):
@@ -100,6 +121,20 @@ class StructureForm(forms.ModelForm):
                     (str(structure_type.id), structure_type.name)
                 ]
 
+    def clean_fitting(self):
+        fitting = self.cleaned_data["fitting"]
+        self.fitted_items = [item for item in parse_fitting(fitting) if item.slot]
+        self.module_type_ids, unknown_names = resolve_type_ids(
+            item.name for item in self.fitted_items
+        )
+        if unknown_names:
+            raise forms.ValidationError(
+                _("Unknown modules: %(names)s"),
+                code="unknown_modules",
+                params={"names": ", ".join(unknown_names)},
+            )
+        return fitting
+
     def save(self, commit=True):
         # Store default fields
         structure: Structure = super().save(commit=False)
@@ -108,149 +143,41 @@ class StructureForm(forms.ModelForm):
         structure.eve_solar_system_id = self.cleaned_data.get("eve_solar_system_2")
         structure.eve_type_id = self.cleaned_data.get("eve_structure_type_2")
         structure.reinforce_hour = self.cleaned_data.get("reinforcement_hour")
-        fitting = self.cleaned_data.get("fitting")
-        # Parse fitting
-        fitting_data = fitting.replace("\r\n", "\n")
-        highslots = None
-        # Fitting has high slots
-        if "High Power Slots" in fitting_data:
-            # Assume High and Med slots are fitted
-            highslots = re.search(
-                "High Power Slots\n(.*?)Medium Power Slots", fitting_data, re.M | re.S
-            )
-            if not highslots:
-                # Assume High and Low slots are fitted
-                highslots = re.search(
-                    "High Power Slots\n(.*?)Low Power Slots", fitting_data, re.M | re.S
-                )
-                if not highslots:
-                    # Assume High and Rig slots are fitted
-                    highslots = re.search(
-                        "High Power Slots\n(.*?)Rig Slots", fitting_data, re.M | re.S
-                    )
-                    if not highslots:
-                        # Assume High and Service slots are fitted
-                        highslots = re.search(
-                            "High Power Slots\n(.*?)Service Slots",
-                            fitting_data,
-                            re.M | re.S,
-                        )
-                        if not highslots:
-                            highslots = fitting_data.replace("High Power Slots\n", "")
-        if type(highslots) == re.Match:
-            highslots = highslots.group(1)
+        fitting = canonical_fitting(self.fitted_items, self.module_type_ids)
+        with transaction.atomic():
+            fitting_id = get_or_create_fittings([fitting]).get(fitting)
+            apply_fitting(structure, fitting, fitting_id, self.module_type_ids)
+            if commit:
+                structure.save()
+                self._save_m2m()
+                if self.is_new:
+                    record_revision(structure, self.user, created=True)
+                else:
+                    record_revision(structure, self.user, self.previous_fitting)
+        return structure
 
-        mediumslots = None
-        # Fitting has med slots
-        if "Medium Power Slots" in fitting_data:
-            # Assume Medium and Low slots are fitted
-            mediumslots = re.search(
-                "Medium Power Slots\n(.*?)Low Power Slots", fitting_data, re.M | re.S
-            )
-            if not mediumslots:
-                # Assume Medium and Low slots are fitted
-                mediumslots = re.search(
-                    "Medium Power Slots\n(.*?)Rig Slots", fitting_data, re.M | re.S
-                )
-                if not mediumslots:
-                    # Assume Medium and Rig slots are fitted
-                    mediumslots = re.search(
-                        "Medium Power Slots\n(.*?)Service Slots",
-                        fitting_data,
-                        re.M | re.S,
-                    )
-                    if not mediumslots:
-                        mediumslots = fitting_data.replace("Medium Power Slots\n", "")
-        if type(mediumslots) == re.Match:
-            mediumslots = mediumslots.group(1)
 
-        lowslots = None
-        # Fitting has low slots
-        if "Low Power Slots" in fitting_data:
-            # Assume Low and rig slots are fitted
-            lowslots = re.search(
-                "Low Power Slots\n(.*?)Rig Slots", fitting_data, re.M | re.S
-            )
-            if not lowslots:
-                # Assume Low and Service slots are fitted
-                lowslots = re.search(
-                    "Low Power Slots\n(.*?)Service Slots", fitting_data, re.M | re.S
-                )
-                if not lowslots:
-                    lowslots = fitting_data.replace("Low Power Slots\n", "")
-        if type(lowslots) == re.Match:
-            lowslots = lowslots.group(1)
+class StructureImportForm(forms.Form):
+    input_format = forms.ChoiceField(
+        required=True, choices=ImportJob.Format.choices, label=_("Format")
+    )
+    file = forms.FileField(required=False, label=_("File"))
+    content = forms.CharField(
+        required=False,
+        label=_("Or paste structures"),
+        widget=forms.Textarea(attrs={"rows": 10}),
+    )
 
-        rigslots = None
-        # Fitting has rig slots
-        if "Rig Slots" in fitting_data:
-            # Assume Rig and Service slots are fitted
-            rigslots = re.search(
-                "Rig Slots\n(.*?)Service Slots", fitting_data, re.M | re.S
+    def clean(self):
+        cleaned_data = super().clean()
+        upload = cleaned_data.get("file")
+        if upload:
+            try:
+                cleaned_data["content"] = upload.read().decode("utf-8")
+            except UnicodeDecodeError:
+                raise forms.ValidationError(_("The file must be UTF-8 encoded."))
+        if not cleaned_data.get("content", "").strip():
+            raise forms.ValidationError(
+                _("Upload a file or paste the structures to import.")
             )
-            if not rigslots:
-                rigslots = fitting_data.replace("Low Power Slots\n", "")
-        if type(rigslots) == re.Match:
-            rigslots = rigslots.group(1)
-
-        serviceslots = None
-        # Fitting has service slots
-        if "Service Slots" in fitting_data:
-            serviceslots = fitting_data.split("Service Slots\n")[1]
-
-        # Save structure so related objects can be stored
-        if commit:
-            structure.save()
-
-        # Store fitting mods
-
-        if highslots:
-            modules = highslots.strip().split("\n")
-            for module in modules:
-                evemodule = EveType.objects.get(name=module)
-                fittingmodule = StructureModule()
-                fittingmodule.eve_type_id = evemodule.id
-                fittingmodule.slot = StructureModule.Slot.HIGHSLOT
-                fittingmodule.structure_id = structure.id
-                fittingmodule.save()
-
-        if mediumslots:
-            modules = mediumslots.strip().split("\n")
-            for module in modules:
-                evemodule = EveType.objects.get(name=module)
-                fittingmodule = StructureModule()
-                fittingmodule.eve_type_id = evemodule.id
-                fittingmodule.slot = StructureModule.Slot.MEDSLOT
-                fittingmodule.structure_id = structure.id
-                fittingmodule.save()
-
-        if lowslots:
-            modules = lowslots.strip().split("\n")
-            for module in modules:
-                evemodule = EveType.objects.get(name=module)
-                fittingmodule = StructureModule()
-                fittingmodule.eve_type_id = evemodule.id
-                fittingmodule.slot = StructureModule.Slot.LOWSLOT
-                fittingmodule.structure_id = structure.id
-                fittingmodule.save()
-
-        if rigslots:
-            modules = rigslots.strip().split("\n")
-            for module in modules:
-                evemodule = EveType.objects.get(name=module)
-                fittingmodule = StructureModule()
-                fittingmodule.eve_type_id = evemodule.id
-                fittingmodule.slot = StructureModule.Slot.RIGSLOT
-                fittingmodule.structure_id = structure.id
-                fittingmodule.save()
-
-        if serviceslots:
-            modules = serviceslots.strip().split("\n")
-            for module in modules:
-                evemodule = EveType.objects.get(name=module)
-                fittingmodule = StructureModule()
-                fittingmodule.eve_type_id = evemodule.id
-                fittingmodule.slot = StructureModule.Slot.SERVICE
-                fittingmodule.structure_id = structure.id
-                fittingmodule.save()
-        return structure
+        return cleaned_data
@@ -0,0 +1,166 @@
+import hashlib
+import threading
+from typing import Any, Callable, Optional
+from uuid import uuid4
+
+from django.core.cache import cache
+from django.db import transaction
+from django.http import QueryDict
+
+from ..app_settings import (
+    STRUCTUREINTEL_DETAILS_CACHE_TIMEOUT,
+    STRUCTUREINTEL_LIST_CACHE_TIMEOUT,
+)
+
+CACHE_KEY_PREFIX = "structureintel"
+
+LIST_DATA = "list_data"
+EVE_TYPES = "eve_types"
+SOLAR_SYSTEMS = "solar_systems"
+STARGATES = "stargates"
+ROLLUPS = "rollups"
+DETAILS = "details"
+
+# seconds data shared between processes is kept, entries of outdated
+# versions are never read again and just expire
+SHARED_DATA_TIMEOUT = 24 * 3600
+
+
+def _version_key(name: str) -> str:
+    return f"{CACHE_KEY_PREFIX}:version:{name}"
+
+
+def get_version(name: str) -> str:
+    """Return the current version of a cached dataset.
+
+    Versions are random tokens, so a version key lost from the cache
+    can never make stale entries of an earlier version valid again.
+    """
+    key = _version_key(name)
+    version = cache.get(key)
+    if version is None:
+        version = uuid4().hex
+        if not cache.add(key, version, timeout=None):
+            version = cache.get(key, version)
+    return version
+
+
+def bump_version(name: str) -> None:
+    """Invalidate all cached entries of a dataset"""
+    cache.set(_version_key(name), uuid4().hex, timeout=None)
+
+
+def bump_version_on_commit(name: str) -> None:
+    """Invalidate all cached entries of a dataset once the transaction commits"""
+    transaction.on_commit(lambda: bump_version(name))
+
+
+def drop_version_on_commit(name: str) -> None:
+    """Remove the version of a dataset that no longer exists once the
+    transaction commits, its cached entries just expire
+    """
+    transaction.on_commit(lambda: cache.delete(_version_key(name)))
+
+
+def list_data_key(
+    version: str, can_delete: bool, params: QueryDict = None, compact: bool = False
+) -> str:
+    """Return cache key for a structure list payload.
+
+    The payload depends on the dataset version, the permission controlling
+    the ``actions`` column, the payload format and for server-side requests
+    on the query parameters, except the ones DataTables changes with every
+    request and the profiling switch.
+    """
+    key = f"{CACHE_KEY_PREFIX}:{LIST_DATA}:{version}:{int(can_delete)}"
+    if compact:
+        key += ":compact"
+    if params is not None:
+        items = sorted(
+            (name, value)
+            for name, values in params.lists()
+            if name not in ("draw", "_", "profile")
+            for value in values
+        )
+        digest = hashlib.md5(repr(items).encode("utf-8")).hexdigest()
+        key += f":{digest}"
+    return key
+
+
+def list_data_get(key: str):
+    return cache.get(key)
+
+
+def list_data_set(key: str, payload) -> None:
+    cache.set(key, payload, timeout=STRUCTUREINTEL_LIST_CACHE_TIMEOUT)
+
+
+def fitting_version_name(structure_id: int) -> str:
+    """Return name of the dataset with the fitting of a structure"""
+    return f"fitting:{structure_id}"
+
+
+def details_key(structure_id: int) -> str:
+    """Return cache key for the rendered details of a structure.
+
+    The fragment depends on the fitting of the structure and on the slot
+    layout of its type, which is rebuilt when EVE types change.
+    """
+    fitting_version = get_version(fitting_version_name(structure_id))
+    types_version = get_version(EVE_TYPES)
+    return (
+        f"{CACHE_KEY_PREFIX}:{DETAILS}:{structure_id}:{fitting_version}:"
+        f"{types_version}"
+    )
+
+
+def details_get(key: str):
+    return cache.get(key)
+
+
+def details_set(key: str, content: str) -> None:
+    cache.set(key, content, timeout=STRUCTUREINTEL_DETAILS_CACHE_TIMEOUT)
+
+
+class VersionedProcessCache:
+    """Data built lazily once per process and rebuilt when its dataset changes.
+
+    Checking whether the data is current costs one cache lookup of the
+    dataset version and no database query. With a ``shared_key`` the built
+    data is also stored in the shared cache, so only one process per
+    version has to build it.
+    """
+
+    def __init__(
+        self, name: str, build: Callable[[], Any], shared_key: Optional[str] = None
+    ) -> None:
+        self.name = name
+        self.shared_key = shared_key
+        self._build = build
+        self._data = None
+        self._version = None
+        self._lock = threading.Lock()
+
+    def get(self) -> Any:
+        version = get_version(self.name)
+        if self._version != version:
+            with self._lock:
+                if self._version != version:
+                    self._data = self._load(version)
+                    self._version = version
+        return self._data
+
+    def _load(self, version: str) -> Any:
+        if not self.shared_key:
+            return self._build()
+        key = f"{CACHE_KEY_PREFIX}:{self.shared_key}:{version}"
+        data = cache.get(key)
+        if data is None:
+            data = self._build()
+            cache.set(key, data, timeout=SHARED_DATA_TIMEOUT)
+        return data
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data = None
+            self._version = None
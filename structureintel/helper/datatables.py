@@ -0,0 +1,250 @@
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+from django.db.models import Q, QuerySet
+from django.http import QueryDict
+
+from ..app_settings import (
+    STRUCTUREINTEL_LIST_MAX_PAGE_LENGTH,
+    STRUCTUREINTEL_PROXIMITY_MAX_JUMPS,
+)
+from ..models import Structure
+from . import stargate_graph
+from .cache import LIST_DATA, VersionedProcessCache
+from .serializer import StructureCompactSerializer, StructureSerializer
+from .type_index import get_type
+
+
+class Column(NamedTuple):
+    """Server-side definition of a structure list column"""
+
+    order_by: Optional[Tuple[str, ...]] = None
+    filter_field: Optional[str] = None
+    search_fields: Tuple[str, ...] = ()
+
+
+class DataTablesRequest:
+    """Parameters of a DataTables server-side processing request"""
+
+    def __init__(self, params: QueryDict) -> None:
+        self.draw = self._int(params.get("draw"), 0)
+        self.start = max(self._int(params.get("start"), 0), 0)
+        length = self._int(params.get("length"), 10)
+        if length < 0 or length > STRUCTUREINTEL_LIST_MAX_PAGE_LENGTH:
+            length = STRUCTUREINTEL_LIST_MAX_PAGE_LENGTH
+        self.length = length
+        self.search = params.get("search[value]", "").strip()
+        # only structures within a number of jumps from this system
+        self.near = self._int(params.get("near"), None)
+        jumps = self._int(params.get("jumps"), 0)
+        self.jumps = min(max(jumps, 0), STRUCTUREINTEL_PROXIMITY_MAX_JUMPS)
+        self.columns = self._parse_columns(params)
+        self.order = self._parse_order(params)
+
+    @staticmethod
+    def _int(value, default: int) -> int:
+        try:
+            return int(value)
+        except (TypeError, ValueError):
+            return default
+
+    def _parse_columns(self, params: QueryDict) -> List[Tuple[str, str]]:
+        """Return list of (data name, search value) for every column"""
+        columns = []
+        idx = 0
+        while f"columns[{idx}][data]" in params:
+            columns.append(
+                (
+                    params[f"columns[{idx}][data]"],
+                    params.get(f"columns[{idx}][search][value]", "").strip(),
+                )
+            )
+            idx += 1
+        return columns
+
+    def _parse_order(self, params: QueryDict) -> List[Tuple[str, bool]]:
+        """Return list of (data name, descending) in order of precedence"""
+        order = []
+        idx = 0
+        while f"order[{idx}][column]" in params:
+            column_idx = self._int(params[f"order[{idx}][column]"], -1)
+            if 0 <= column_idx < len(self.columns):
+                order.append(
+                    (
+                        self.columns[column_idx][0],
+                        params.get(f"order[{idx}][dir]") == "desc",
+                    )
+                )
+            idx += 1
+        return order
+
+    def column_filters(self) -> Dict[str, str]:
+        return {name: value for name, value in self.columns if value}
+
+
+class StructureDataTable:
+    """Server-side processing of the structure list for DataTables"""
+
+    COLUMNS = {
+        "location": Column(
+            order_by=(
+                "eve_solar_system__eve_constellation__eve_region__name",
+                "eve_solar_system__name",
+            ),
+            search_fields=(
+                "eve_solar_system__name",
+                "eve_solar_system__eve_constellation__eve_region__name",
+            ),
+        ),
+        "type": Column(
+            order_by=("eve_type__name",),
+            filter_field="eve_type__name",
+            search_fields=("eve_type__name",),
+        ),
+        "structure_name": Column(order_by=("name",), search_fields=("name", "owner")),
+        "services": Column(
+            filter_field="service_type_ids", search_fields=("service_names",)
+        ),
+        "power": Column(order_by=("power_mode",), filter_field="power_mode"),
+        "reinforcement": Column(order_by=("reinforce_hour",)),
+        "system_name": Column(
+            order_by=("eve_solar_system__name",),
+            filter_field="eve_solar_system__name",
+        ),
+        "constellation_name": Column(
+            order_by=("eve_solar_system__eve_constellation__name",),
+            filter_field="eve_solar_system__eve_constellation__name",
+            search_fields=("eve_solar_system__eve_constellation__name",),
+        ),
+        "region_name": Column(
+            order_by=("eve_solar_system__eve_constellation__eve_region__name",),
+            filter_field="eve_solar_system__eve_constellation__eve_region__name",
+        ),
+    }
+
+    def __init__(self, params: QueryDict, queryset: QuerySet = None) -> None:
+        self.request = DataTablesRequest(params)
+        self.queryset = Structure.objects.all() if queryset is None else queryset
+
+    def filtered_queryset(self) -> QuerySet:
+        queryset = self.queryset
+        if self.request.near is not None:
+            system_ids = stargate_graph.systems_within(
+                self.request.near, self.request.jumps
+            )
+            queryset = queryset.filter(eve_solar_system_id__in=list(system_ids))
+        for name, value in self.request.column_filters().items():
+            column = self.COLUMNS.get(name)
+            if not column or not column.filter_field:
+                continue
+            if column.filter_field == "power_mode":
+                value = self._power_mode_from_label(value)
+            elif column.filter_field == "service_type_ids":
+                queryset = queryset.filter(
+                    service_type_ids__contains=self._service_type_id_value(value)
+                )
+                continue
+            queryset = queryset.filter(**{column.filter_field: value})
+
+        if self.request.search:
+            search_fields = {
+                field
+                for column in self.COLUMNS.values()
+                for field in column.search_fields
+            }
+            query = Q()
+            for field in search_fields:
+                query |= Q(**{f"{field}__icontains": self.request.search})
+            queryset = queryset.filter(query)
+        return queryset
+
+    def ordered_queryset(self, queryset: QuerySet) -> QuerySet:
+        order_by = []
+        for name, descending in self.request.order:
+            column = self.COLUMNS.get(name)
+            if not column or not column.order_by:
+                continue
+            prefix = "-" if descending else ""
+            order_by += [prefix + field for field in column.order_by]
+        return queryset.order_by(*order_by, "id")
+
+    @classmethod
+    def filter_options(cls) -> Dict[str, list]:
+        """Distinct values of all filterable columns for the dropdown filters,
+        computed once per process and version of the structure list
+        """
+        return _filter_options.get()
+
+    @classmethod
+    def _build_filter_options(cls) -> Dict[str, list]:
+        queryset = Structure.objects.all()
+        options = {}
+        for name, column in cls.COLUMNS.items():
+            if not column.filter_field:
+                continue
+            if column.filter_field == "service_type_ids":
+                options[name] = cls._service_names(queryset)
+                continue
+            values = (
+                queryset.order_by(column.filter_field)
+                .values_list(column.filter_field, flat=True)
+                .distinct()
+            )
+            if column.filter_field == "power_mode":
+                labels = dict(Structure.PowerMode.choices)
+                values = [str(labels.get(value, value)) for value in values]
+            options[name] = [value for value in values if value]
+        return options
+
+    def to_dict(self, request, compact: bool = False) -> dict:
+        """Return the requested page, with compact rows and lookup tables
+        instead of rendered rows if ``compact`` is set
+        """
+        filtered = self.filtered_queryset()
+        page = self.ordered_queryset(filtered)[
+            self.request.start : self.request.start + self.request.length
+        ]
+        if compact:
+            rows = StructureCompactSerializer(page).to_dict(request)
+        else:
+            rows = {"data": StructureSerializer(page).to_list(request)}
+        return {
+            "draw": self.request.draw,
+            "recordsTotal": self.queryset.count(),
+            "recordsFiltered": filtered.count(),
+            **rows,
+            "filter_options": self.filter_options(),
+        }
+
+    @staticmethod
+    def _service_names(queryset: QuerySet) -> List[str]:
+        """Names of all fitted services, read from the distinct summaries"""
+        names = set()
+        for summary in (
+            queryset.order_by().values_list("service_names", flat=True).distinct()
+        ):
+            names.update(summary.splitlines())
+        return sorted(names)
+
+    @staticmethod
+    def _service_type_id_value(name: str) -> str:
+        """Pattern matching a service by name in the stored service type IDs"""
+        type_info = get_type(name)
+        type_id = type_info.id if type_info else 0
+        return f",{type_id},"
+
+    @staticmethod
+    def _power_mode_from_label(label: str) -> str:
+        for value, display in Structure.PowerMode.choices:
+            if label in (value, str(display)):
+                return value
+        return label
+
+
+_filter_options = VersionedProcessCache(
+    LIST_DATA, StructureDataTable._build_filter_options, shared_key="filter_options"
+)
+
+
+def clear() -> None:
+    """Drop the filter options of this process"""
+    _filter_options.clear()
@@ -0,0 +1,84 @@
+"""Delta sync of the structure list.
+
+List payloads carry a cursor. Clients pass it back as ``since`` to get only
+the structures changed and deleted since then. Deletions are recorded as
+tombstones, which are kept for ``STRUCTUREINTEL_TOMBSTONE_MAX_AGE`` days.
+"""
+import json
+from datetime import datetime, timedelta, timezone
+from typing import List, NamedTuple, Optional
+
+from django.db.models import QuerySet
+from django.utils.timezone import now
+
+from ..app_settings import (
+    STRUCTUREINTEL_LIST_SYNC_OVERLAP,
+    STRUCTUREINTEL_TOMBSTONE_MAX_AGE,
+)
+from ..models import DeletedStructure, Structure
+
+_EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+class Delta(NamedTuple):
+    """Changes of the structure list since a cursor"""
+
+    structures: QuerySet
+    deleted_ids: List[int]
+
+
+def make_cursor(moment: datetime) -> str:
+    """Return the cursor for a time, which is microseconds since the epoch"""
+    return str((moment - _EPOCH) // timedelta(microseconds=1))
+
+
+def parse_cursor(value: str) -> datetime:
+    """Return the time of a cursor. Raises ValueError for invalid cursors."""
+    try:
+        return _EPOCH + timedelta(microseconds=int(value))
+    except OverflowError:
+        raise ValueError(f"Invalid cursor: {value!r}") from None
+
+
+def with_cursor(content: str, cursor: str) -> str:
+    """Return a serialized JSON object with a cursor added as first member.
+
+    Cached list payloads are stored serialized without a cursor, so each
+    response gets the cursor of its own request without encoding the whole
+    list again.
+    """
+    body = content.strip()
+    if not (body.startswith("{") and body.endswith("}")):
+        raise ValueError("Content is not a JSON object")
+    members = body[1:-1].strip()
+    head = f'{{"cursor": {json.dumps(cursor)}'
+    return f"{head}, {members}}}" if members else f"{head}}}"
+
+
+def changes_since(since: datetime) -> Optional[Delta]:
+    """Return the changes since a time or ``None`` if the tombstones
+    since then may already be purged and the whole list must be reloaded.
+
+    Changes are returned from ``STRUCTUREINTEL_LIST_SYNC_OVERLAP`` seconds
+    before that time, since changes of transactions that committed late
+    can carry an earlier time than the cursor.
+    """
+    if since < now() - timedelta(days=STRUCTUREINTEL_TOMBSTONE_MAX_AGE):
+        return None
+    start = since - timedelta(seconds=STRUCTUREINTEL_LIST_SYNC_OVERLAP)
+    structures = Structure.objects.filter(last_updated_at__gte=start).order_by("id")
+    deleted_ids = list(
+        DeletedStructure.objects.filter(deleted_at__gte=start)
+        .order_by("structure_id")
+        .values_list("structure_id", flat=True)
+        .distinct()
+    )
+    return Delta(structures, deleted_ids)
+
+
+def purge_tombstones() -> int:
+    """Delete expired tombstones and return their number"""
+    deleted, _ = DeletedStructure.objects.filter(
+        deleted_at__lt=now() - timedelta(days=STRUCTUREINTEL_TOMBSTONE_MAX_AGE)
+    ).delete()
+    return deleted
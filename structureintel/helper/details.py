@@ -0,0 +1,84 @@
+"""Context of the structure details modal"""
+from datetime import datetime
+from typing import Optional
+
+from ..models import FittingModule, Structure
+from . import slot_layout
+from .history import revision_as_of, timeline
+
+# keys of the slot groups in the template by module slot
+SLOT_KEYS = {
+    FittingModule.Slot.HIGHSLOT: "HiSlot",
+    FittingModule.Slot.MEDSLOT: "MedSlot",
+    FittingModule.Slot.LOWSLOT: "LoSlot",
+    FittingModule.Slot.RIGSLOT: "RigSlot",
+    FittingModule.Slot.SERVICE: "SerSlot",
+}
+
+# fields of the structure and of its modules loaded for the modal
+STRUCTURE_FIELDS = ("name", "eve_solar_system__name", "eve_type_id", "eve_type__name")
+MODULE_FIELDS = ("slot", "eve_type_id", "eve_type__name", "quantity")
+
+
+def details_context(
+    structure_id: int, as_of: Optional[datetime] = None
+) -> Optional[dict]:
+    """Return the template context for a structure or ``None`` if it does not exist.
+
+    The structure, its system, its type and all modules of its fitting are
+    loaded with a single query, which has one row per module type and slot,
+    and its fitting history with two more. With ``as_of`` the fitting the
+    structure had at that time is shown instead.
+    """
+    structures = Structure.objects.filter(id=structure_id)
+    if as_of is None:
+        rows = list(
+            structures.order_by("fitting__modules__id").values_list(
+                *STRUCTURE_FIELDS,
+                *(f"fitting__modules__{field}" for field in MODULE_FIELDS),
+            )
+        )
+        if not rows:
+            return None
+        structure = rows[0][: len(STRUCTURE_FIELDS)]
+        modules = [row[len(STRUCTURE_FIELDS) :] for row in rows]
+        revision = None
+    else:
+        structure = structures.values_list(*STRUCTURE_FIELDS).first()
+        if structure is None:
+            return None
+        revision = revision_as_of(structure_id, as_of)
+        modules = (
+            FittingModule.objects.filter(
+                fitting_id=revision.fitting_id if revision else None
+            )
+            .order_by("id")
+            .values_list(*MODULE_FIELDS)
+        )
+
+    name, system_name, type_id, type_name = structure
+    assets = {slot_key: [] for slot_key in SLOT_KEYS.values()}
+    assets_grouped = {}
+    for slot, module_type_id, module_name, quantity in modules:
+        slot_key = SLOT_KEYS.get(slot)
+        if not slot_key:
+            continue
+        for _ in range(quantity):
+            assets_grouped[f"{slot_key}{len(assets[slot_key])}"] = {
+                "eve_type_id": module_type_id,
+                "eve_type": {"name": module_name},
+            }
+            assets[slot_key].append({"id": module_type_id, "name": module_name})
+
+    return {
+        "structure_id": structure_id,
+        "system": system_name,
+        "name": name,
+        "slots": slot_layout.get_layout(type_id).image_urls,
+        "assets_grouped": assets_grouped,
+        "assets": assets,
+        "structure": {"name": type_name, "eve_type_id": type_id},
+        "as_of": as_of,
+        "revision": revision,
+        "revisions": timeline(structure_id),
+    }
@@ -0,0 +1,113 @@
+"""Parser for structure fittings pasted from the game client or in EFT format.
+
+Two layouts are understood:
+
+- Section headers like ``High Power Slots`` followed by one module per line
+- EFT, which starts with a ``[Type, Name]`` line and lists low, medium, high,
+  rig and service slots as blocks separated by blank lines
+
+The paste is tokenized in a single pass over its lines.
+"""
+import re
+from functools import lru_cache
+from typing import Iterator, List, NamedTuple, Optional, Tuple
+
+# values match FittingModule.Slot
+HIGHSLOT = "Highslot"
+MEDSLOT = "Midslot"
+LOWSLOT = "Lowslot"
+RIGSLOT = "Rigslot"
+SERVICE = "Service"
+
+SECTION_HEADERS = {
+    "High Power Slots": HIGHSLOT,
+    "Medium Power Slots": MEDSLOT,
+    "Low Power Slots": LOWSLOT,
+    "Rig Slots": RIGSLOT,
+    "Service Slots": SERVICE,
+    # sections with items that are not fitted to a slot
+    "Charges": None,
+    "Cargo": None,
+    "Drones": None,
+    "Fighters": None,
+}
+
+# order of the blank line separated slot blocks in EFT
+EFT_SLOT_ORDER = (LOWSLOT, MEDSLOT, HIGHSLOT, RIGSLOT, SERVICE)
+
+_EFT_HEADER = re.compile(r"^\[(?P<type>[^,\]]+),\s*(?P<name>.*)\]$")
+_EMPTY_SLOT = re.compile(r"^\[Empty .+\]$", re.IGNORECASE)
+_QUANTITY = re.compile(r"^(?P<name>.+?)\s+x(?P<quantity>\d+)$")
+
+
+class FittingItem(NamedTuple):
+    """An item of a parsed fitting.
+
+    ``slot`` is ``None`` for charges, drones and cargo.
+    """
+
+    slot: Optional[str]
+    name: str
+    quantity: int = 1
+    charge: Optional[str] = None
+
+
+def parse_eft_header(line: str) -> Optional[Tuple[str, str]]:
+    """Return type name and fitting name of an EFT header line or ``None``"""
+    match = _EFT_HEADER.match(line.strip())
+    if not match or _EMPTY_SLOT.match(line.strip()):
+        return None
+    return match.group("type").strip(), match.group("name").strip()
+
+
+def iter_fitting(text: str) -> Iterator[FittingItem]:
+    """Yield all items of a fitting in the order they appear"""
+    slot = None
+    eft_block = None
+    in_block = False
+    for raw_line in text.splitlines():
+        line = raw_line.strip()
+        if not line:
+            in_block = False
+            continue
+
+        if line in SECTION_HEADERS:
+            slot = SECTION_HEADERS[line]
+            eft_block = None
+            in_block = True
+            continue
+
+        is_bracketed = line[0] == "["
+        if is_bracketed and eft_block is None and slot is None:
+            if parse_eft_header(line):
+                eft_block = -1
+                continue
+
+        if eft_block is not None and not in_block:
+            # a new blank line separated block starts
+            eft_block += 1
+            slot = (
+                EFT_SLOT_ORDER[eft_block] if eft_block < len(EFT_SLOT_ORDER) else None
+            )
+        in_block = True
+
+        if not is_bracketed or not _EMPTY_SLOT.match(line):
+            yield _parse_item(slot, line)
+
+
+def parse_fitting(text: str) -> List[FittingItem]:
+    """Return all items of a fitting"""
+    return list(iter_fitting(text))
+
+
+@lru_cache(maxsize=1024)
+def _parse_item(slot: Optional[str], line: str) -> FittingItem:
+    name, _, charge = line.partition(",")
+    name = name.strip()
+    charge = charge.strip() or None
+    quantity = 1
+    match = _QUANTITY.match(name) if " x" in name else None
+    if match:
+        name = match.group("name")
+        quantity = int(match.group("quantity"))
+    return FittingItem(slot, name, quantity, charge)
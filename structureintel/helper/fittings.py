@@ -0,0 +1,231 @@
+"""Content addressed storage of fittings.
+
+Fitted items are merged into canonical modules, which are hashed. Each
+distinct fitting is stored once and shared by all structures fitted with it,
+so storing a known fitting costs a single hash lookup.
+"""
+import hashlib
+from collections import defaultdict
+from typing import Dict, Iterable, NamedTuple, Optional, Tuple
+
+from django.db import transaction
+from django.utils.timezone import now
+
+from ..models import Fitting, FittingModule, Structure
+from . import rollups
+from .cache import LIST_DATA, bump_version_on_commit
+from .fitting_parser import SECTION_HEADERS, FittingItem
+
+# fields of Structure with the number of fitted modules by slot
+SLOT_COUNT_FIELDS = {
+    FittingModule.Slot.HIGHSLOT: "highslot_count",
+    FittingModule.Slot.MEDSLOT: "midslot_count",
+    FittingModule.Slot.LOWSLOT: "lowslot_count",
+    FittingModule.Slot.RIGSLOT: "rigslot_count",
+    FittingModule.Slot.SERVICE: "service_count",
+}
+
+# all denormalized module fields of Structure
+SUMMARY_FIELDS = [
+    *SLOT_COUNT_FIELDS.values(),
+    "service_type_ids",
+    "service_names",
+]
+
+# section headers of pasted fittings by slot
+SLOT_HEADERS = {slot: header for header, slot in SECTION_HEADERS.items() if slot}
+
+# order of the slots in canonical fittings
+SLOT_ORDER = {slot: num for num, slot in enumerate(FittingModule.Slot.values)}
+
+
+class CanonicalModule(NamedTuple):
+    """All modules of one type fitted to a slot"""
+
+    slot: str
+    type_id: int
+    quantity: int
+
+
+# canonical modules of a fitting in canonical order
+CanonicalFitting = Tuple[CanonicalModule, ...]
+
+
+def canonical_fitting(
+    items: Iterable[FittingItem], type_ids: Dict[str, int]
+) -> CanonicalFitting:
+    """Return the fitted items as canonical modules.
+
+    Items of the same type and slot are merged and sorted by slot and type,
+    so the same modules always result in the same fitting.
+    """
+    quantities = defaultdict(int)
+    for item in items:
+        if item.slot:
+            quantities[(item.slot, type_ids[item.name])] += item.quantity
+    return tuple(
+        CanonicalModule(slot, type_id, quantity)
+        for (slot, type_id), quantity in sorted(
+            quantities.items(), key=lambda entry: (SLOT_ORDER[entry[0][0]], entry[0][1])
+        )
+    )
+
+
+def fitting_hash(fitting: CanonicalFitting) -> str:
+    """Return the content address of a canonical fitting"""
+    content = "\n".join(
+        f"{module.slot}:{module.type_id}:{module.quantity}" for module in fitting
+    )
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def get_or_create_fittings(
+    fittings: Iterable[CanonicalFitting],
+) -> Dict[CanonicalFitting, int]:
+    """Return the IDs of stored fittings, storing the unknown ones.
+
+    Known fittings cost one lookup for all of them. Unknown fittings and
+    their modules are stored with one insert each. Empty fittings are
+    not stored and have no ID.
+    """
+    by_hash = {fitting_hash(fitting): fitting for fitting in fittings if fitting}
+    if not by_hash:
+        return {}
+    fitting_ids = dict(
+        Fitting.objects.filter(hash__in=by_hash.keys()).values_list("hash", "id")
+    )
+    missing = [digest for digest in by_hash if digest not in fitting_ids]
+    if missing:
+        # fittings stored concurrently by another process are skipped
+        with transaction.atomic():
+            Fitting.objects.bulk_create(
+                [Fitting(hash=digest) for digest in missing], ignore_conflicts=True
+            )
+            created_ids = dict(
+                Fitting.objects.select_for_update()
+                .filter(hash__in=missing)
+                .values_list("hash", "id")
+            )
+            FittingModule.objects.bulk_create(
+                [
+                    FittingModule(
+                        fitting_id=created_ids[digest],
+                        slot=module.slot,
+                        eve_type_id=module.type_id,
+                        quantity=module.quantity,
+                    )
+                    for digest in missing
+                    for module in by_hash[digest]
+                ],
+                ignore_conflicts=True,
+            )
+        fitting_ids.update(created_ids)
+    return {fitting: fitting_ids[digest] for digest, fitting in by_hash.items()}
+
+
+def fitting_paste(fitting_id: Optional[int]) -> str:
+    """Return a stored fitting in the format pasted from the game client"""
+    if not fitting_id:
+        return ""
+    lines = []
+    slot = None
+    for module_slot, name, quantity in (
+        FittingModule.objects.filter(fitting_id=fitting_id)
+        .order_by("id")
+        .values_list("slot", "eve_type__name", "quantity")
+    ):
+        if module_slot != slot:
+            slot = module_slot
+            lines.append(SLOT_HEADERS[slot])
+        lines += [name] * quantity
+    return "\n".join(lines)
+
+
+def service_type_ids_value(type_ids: Iterable[int]) -> str:
+    """Return the stored form of service type IDs, which is matched with
+    ``service_type_ids__contains=",<id>,"``
+    """
+    type_ids = list(type_ids)
+    return f",{','.join(map(str, type_ids))}," if type_ids else ""
+
+
+def module_summary(modules: Iterable[Tuple[str, int, str, int]]) -> dict:
+    """Return the denormalized module fields of a structure.
+
+    ``modules`` are slot, type ID, type name and quantity of all fitted
+    modules in canonical order.
+    """
+    summary = {field: 0 for field in SLOT_COUNT_FIELDS.values()}
+    service_ids = []
+    service_names = []
+    for slot, type_id, name, quantity in modules:
+        summary[SLOT_COUNT_FIELDS[slot]] += quantity
+        if slot == FittingModule.Slot.SERVICE:
+            service_ids += [type_id] * quantity
+            service_names += [name] * quantity
+    summary["service_type_ids"] = service_type_ids_value(service_ids)
+    summary["service_names"] = "\n".join(service_names)
+    return summary
+
+
+def apply_fitting(
+    structure: Structure,
+    fitting: CanonicalFitting,
+    fitting_id: Optional[int],
+    type_ids: Dict[str, int],
+) -> None:
+    """Set the fitting and the module fields of a structure"""
+    names = {type_id: name for name, type_id in type_ids.items()}
+    structure.fitting_id = fitting_id
+    summary = module_summary(
+        (module.slot, module.type_id, names[module.type_id], module.quantity)
+        for module in fitting
+    )
+    for field, value in summary.items():
+        setattr(structure, field, value)
+
+
+def refresh_module_summaries(
+    structure_ids: Optional[Iterable[int]] = None, batch_size: int = 1000
+) -> int:
+    """Recompute the module fields of structures from their fittings.
+
+    Updates all structures if no IDs are given and returns their number.
+    Needs to be called when fittings are assigned without the helpers
+    of this module, e.g. in the Django admin or the shell. Rebuilds the
+    rollups, since the services are updated without signals.
+    """
+    queryset = Structure.objects.order_by("id")
+    if structure_ids is not None:
+        queryset = queryset.filter(id__in=list(structure_ids))
+    all_rows = list(queryset.values_list("id", "fitting_id"))
+    for start in range(0, len(all_rows), batch_size):
+        batch = all_rows[start : start + batch_size]
+        modules = defaultdict(list)
+        for fitting_id, slot, type_id, name, quantity in (
+            FittingModule.objects.filter(
+                fitting_id__in={fitting_id for _, fitting_id in batch if fitting_id}
+            )
+            .order_by("fitting_id", "id")
+            .values_list(
+                "fitting_id", "slot", "eve_type_id", "eve_type__name", "quantity"
+            )
+        ):
+            modules[fitting_id].append((slot, type_id, name, quantity))
+        summaries = {}
+        structures = []
+        updated_at = now()
+        for structure_id, fitting_id in batch:
+            if fitting_id not in summaries:
+                summaries[fitting_id] = module_summary(modules[fitting_id])
+            structure = Structure(id=structure_id, last_updated_at=updated_at)
+            for field, value in summaries[fitting_id].items():
+                setattr(structure, field, value)
+            structures.append(structure)
+        # bulk updates do not set auto_now fields
+        Structure.objects.bulk_update(structures, SUMMARY_FIELDS + ["last_updated_at"])
+    if all_rows:
+        # services may have changed without signals
+        rollups.rebuild()
+        bump_version_on_commit(LIST_DATA)
+    return len(all_rows)
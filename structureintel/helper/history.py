@@ -0,0 +1,122 @@
+"""Fitting history of structures.
+
+Every submitted fitting that differs from the previous one is recorded as a
+revision pointing to the shared fitting, so re-scouting an unchanged
+structure stores nothing and a refit stores a single row. The changes of a
+revision are computed from the modules of its fitting and the one before.
+"""
+from collections import defaultdict
+from datetime import datetime
+from typing import TYPE_CHECKING, Dict, List, NamedTuple, Optional, Tuple
+
+from ..models import FittingModule, FittingRevision, Structure
+
+if TYPE_CHECKING:
+    from django.contrib.auth.base_user import AbstractBaseUser
+
+# quantities of the modules of a fitting by slot and type ID
+Modules = Dict[Tuple[str, int], int]
+
+
+class ModuleChange(NamedTuple):
+    """Change of the quantity of a module type in a slot"""
+
+    slot: str
+    type_id: int
+    name: str
+    change: int
+
+
+def record_revision(
+    structure: Structure,
+    user: Optional["AbstractBaseUser"] = None,
+    previous: Optional[Tuple[Optional[int], datetime]] = None,
+    created: bool = False,
+) -> Optional[FittingRevision]:
+    """Record the fitting of a saved structure if it changed.
+
+    ``previous`` is the fitting ID and the time of the last change of a
+    structure before it was edited. It is recorded as the first revision of
+    structures that have none yet, e.g. imported ones. Structures that were
+    just ``created`` have no revisions, so they are not looked up.
+    Returns the new revision or ``None`` if the fitting did not change.
+    """
+    if created:
+        last = []
+    else:
+        last = list(
+            FittingRevision.objects.filter(structure_id=structure.pk)
+            .order_by("-created_at", "-id")
+            .values_list("fitting_id", flat=True)[:1]
+        )
+    if not last and previous:
+        fitting_id, created_at = previous
+        FittingRevision.objects.create(
+            structure_id=structure.pk, fitting_id=fitting_id, created_at=created_at
+        )
+        last = [fitting_id]
+    if last and last[0] == structure.fitting_id:
+        return None
+    return FittingRevision.objects.create(
+        structure_id=structure.pk, fitting_id=structure.fitting_id, submitted_by=user
+    )
+
+
+def revision_as_of(structure_id: int, moment: datetime) -> Optional[FittingRevision]:
+    """Return the revision of a structure at a time with a single query
+    or ``None`` if no fitting was recorded by then
+    """
+    return (
+        FittingRevision.objects.filter(
+            structure_id=structure_id, created_at__lte=moment
+        )
+        .order_by("-created_at", "-id")
+        .first()
+    )
+
+
+def fitting_changes(old: Modules, new: Modules, names: Dict[int, str]) -> list:
+    """Return the module changes from one fitting to another"""
+    changes = []
+    for slot, type_id in sorted(old.keys() | new.keys()):
+        change = new.get((slot, type_id), 0) - old.get((slot, type_id), 0)
+        if change:
+            changes.append(ModuleChange(slot, type_id, names[type_id], change))
+    return changes
+
+
+def timeline(structure_id: int) -> List[dict]:
+    """Return the revisions of a structure with their changes, newest first.
+
+    Needs one query for the revisions and one for the modules of all their
+    fittings.
+    """
+    revisions = list(
+        FittingRevision.objects.filter(structure_id=structure_id)
+        .order_by("created_at", "id")
+        .values_list("id", "created_at", "fitting_id", "submitted_by__username")
+    )
+    if not revisions:
+        return []
+    modules = defaultdict(dict)
+    names = {}
+    for fitting_id, slot, type_id, name, quantity in FittingModule.objects.filter(
+        fitting_id__in={fitting_id for _, _, fitting_id, _ in revisions if fitting_id}
+    ).values_list("fitting_id", "slot", "eve_type_id", "eve_type__name", "quantity"):
+        modules[fitting_id][(slot, type_id)] = quantity
+        names[type_id] = name
+    entries = []
+    previous = {}
+    for revision_id, created_at, fitting_id, username in revisions:
+        current = modules[fitting_id] if fitting_id else {}
+        entries.append(
+            {
+                "id": revision_id,
+                "created_at": created_at,
+                "submitted_by": username,
+                "changes": fitting_changes(previous, current, names),
+            }
+        )
+        previous = current
+    entries.reverse()
+    return entries
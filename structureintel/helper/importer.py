@@ -0,0 +1,270 @@
+"""Bulk import of structure intel.
+
+Records are read lazily from JSONL or multi-fit EFT input and stored in
+batches, each inside its own transaction. All names and fittings of a batch
+are resolved with one query per kind and the structures are stored with one
+insert, so the number of queries per batch does not depend on its size.
+"""
+import json
+import re
+from itertools import islice
+from typing import Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import Q
+from eveuniverse.models import EveSolarSystem
+
+from ..models import Structure
+from . import rollups, timers
+from .cache import LIST_DATA, bump_version_on_commit
+from .fitting_parser import iter_fitting, parse_eft_header
+from .fittings import apply_fitting, canonical_fitting, get_or_create_fittings
+from .type_index import resolve_type_ids
+
+_EFT_META = re.compile(r"^#\s*(?P<key>[\w ]+?)\s*:\s*(?P<value>.*)$")
+
+# accepted keys and aliases for structure properties
+RECORD_KEYS = {
+    "system": "system",
+    "solar_system": "system",
+    "type": "structure_type",
+    "structure_type": "structure_type",
+    "name": "name",
+    "owner": "owner",
+    "power": "power_mode",
+    "power_mode": "power_mode",
+    "mode": "power_mode",
+    "reinforce_hour": "reinforce_hour",
+    "reinforcement_hour": "reinforce_hour",
+    "fitting": "fitting",
+}
+
+
+class ImportRecord(NamedTuple):
+    """A structure to import, ``line`` is the first line in the input"""
+
+    line: int
+    system: str = ""
+    structure_type: str = ""
+    name: str = ""
+    owner: str = ""
+    power_mode: str = ""
+    reinforce_hour: Optional[str] = None
+    fitting: str = ""
+
+
+class RecordError(NamedTuple):
+    line: int
+    message: str
+
+
+class ImportResult:
+    """Outcome of an import"""
+
+    def __init__(self) -> None:
+        self.created = 0
+        self.errors: List[RecordError] = []
+
+    @property
+    def processed(self) -> int:
+        return self.created + len(self.errors)
+
+    def update(self, other: "ImportResult") -> None:
+        self.created += other.created
+        self.errors += other.errors
+
+
+def make_record(line: int, data: dict) -> ImportRecord:
+    """Return a record from a mapping with property names as keys"""
+    params = {}
+    for key, value in data.items():
+        field = RECORD_KEYS.get(str(key).strip().lower().replace("-", "_"))
+        if field and value is not None:
+            params[field] = str(value).strip() if field != "fitting" else str(value)
+    return ImportRecord(line=line, **params)
+
+
+def iter_jsonl_records(
+    lines: Iterable[str],
+) -> Iterator[Tuple[Optional[ImportRecord], Optional[RecordError]]]:
+    """Yield a record or an error for every non-empty line of JSONL input"""
+    for line_num, line in enumerate(lines, start=1):
+        if not line.strip():
+            continue
+        try:
+            data = json.loads(line)
+        except ValueError as ex:
+            yield None, RecordError(line_num, f"Invalid JSON: {ex}")
+            continue
+        if not isinstance(data, dict):
+            yield None, RecordError(line_num, "Record is not an object")
+            continue
+        yield make_record(line_num, data), None
+
+
+def iter_eft_records(
+    lines: Iterable[str],
+) -> Iterator[Tuple[Optional[ImportRecord], Optional[RecordError]]]:
+    """Yield a record for every fit of multi-fit EFT input.
+
+    Every fit starts with its ``[Type, Name]`` header. Properties of a
+    structure are given as comment lines like ``# system: Jita``
+    before the header of its fit.
+    """
+    meta = {}
+    current = None
+    for line_num, line in enumerate(lines, start=1):
+        stripped = line.strip()
+        match = _EFT_META.match(stripped)
+        if match:
+            meta[match.group("key")] = match.group("value").strip()
+            continue
+        header = parse_eft_header(stripped) if stripped.startswith("[") else None
+        if header:
+            if current:
+                yield _eft_record(*current), None
+            structure_type, name = header
+            meta.setdefault("type", structure_type)
+            meta.setdefault("name", name)
+            current = (line_num, meta, [stripped])
+            meta = {}
+        elif current:
+            current[2].append(stripped)
+    if current:
+        yield _eft_record(*current), None
+
+
+def _eft_record(line_num: int, meta: dict, lines: List[str]) -> ImportRecord:
+    return make_record(line_num, dict(meta, fitting="\n".join(lines)))
+
+
+# record readers by input format
+READERS = {"jsonl": iter_jsonl_records, "eft": iter_eft_records}
+
+
+def iter_batches(iterable: Iterable, batch_size: int) -> Iterator[list]:
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+class StructureImporter:
+    """Store structure records in batches"""
+
+    def __init__(self, batch_size: int = 500) -> None:
+        self.batch_size = max(1, batch_size)
+
+    def import_records(
+        self, records: Iterable[Tuple[Optional[ImportRecord], Optional[RecordError]]]
+    ) -> Iterator[ImportResult]:
+        """Import records batch by batch and yield the result of each batch"""
+        for batch in iter_batches(records, self.batch_size):
+            result = ImportResult()
+            result.errors += [error for _, error in batch if error]
+            result.update(self.import_batch([record for record, _ in batch if record]))
+            yield result
+
+    def import_batch(self, records: List[ImportRecord]) -> ImportResult:
+        """Import a batch of records inside one transaction"""
+        result = ImportResult()
+        parsed = [
+            (record, [item for item in iter_fitting(record.fitting) if item.slot])
+            for record in records
+        ]
+        system_ids = resolve_solar_system_ids(record.system for record in records)
+        type_ids, _ = resolve_type_ids(
+            {record.structure_type for record in records}
+            | {item.name for _, items in parsed for item in items}
+        )
+
+        valid = []
+        for record, items in parsed:
+            try:
+                structure = self._make_structure(record, system_ids, type_ids)
+                unknown = sorted({item.name for item in items} - type_ids.keys())
+                if unknown:
+                    raise ValueError(f"Unknown modules: {', '.join(unknown)}")
+            except ValueError as ex:
+                result.errors.append(RecordError(record.line, str(ex)))
+            else:
+                valid.append((structure, canonical_fitting(items, type_ids)))
+
+        if valid:
+            with transaction.atomic():
+                self._store(valid, type_ids)
+            result.created = len(valid)
+        return result
+
+    @staticmethod
+    def _store(valid: list, type_ids: Dict[str, int]) -> None:
+        fitting_ids = get_or_create_fittings(fitting for _, fitting in valid)
+        for structure, fitting in valid:
+            apply_fitting(structure, fitting, fitting_ids.get(fitting), type_ids)
+        structures = Structure.objects.bulk_create(structure for structure, _ in valid)
+        rollups.structures_added(structures)
+        timers.structures_added(structures)
+        bump_version_on_commit(LIST_DATA)
+
+    @staticmethod
+    def _make_structure(
+        record: ImportRecord, system_ids: Dict[str, int], type_ids: Dict[str, int]
+    ) -> Structure:
+        if not record.name:
+            raise ValueError("Missing structure name")
+        try:
+            system_id = system_ids[record.system]
+        except KeyError:
+            raise ValueError(f"Unknown solar system: {record.system!r}") from None
+        try:
+            type_id = type_ids[record.structure_type]
+        except KeyError:
+            raise ValueError(
+                f"Unknown structure type: {record.structure_type!r}"
+            ) from None
+        return Structure(
+            eve_solar_system_id=system_id,
+            eve_type_id=type_id,
+            name=record.name,
+            owner=record.owner,
+            power_mode=parse_power_mode(record.power_mode),
+            reinforce_hour=parse_reinforce_hour(record.reinforce_hour),
+        )
+
+
+def resolve_solar_system_ids(values: Iterable[str]) -> Dict[str, int]:
+    """Resolve solar systems given by name or ID with a single query"""
+    values = {value for value in values if value}
+    if not values:
+        return {}
+    ids = {int(value) for value in values if value.isdigit()}
+    systems = EveSolarSystem.objects.filter(Q(name__in=values) | Q(id__in=ids))
+    result = {}
+    for system_id, name in systems.values_list("id", "name"):
+        result[name] = system_id
+        result[str(system_id)] = system_id
+    return result
+
+
+def parse_power_mode(value: str) -> str:
+    if not value:
+        return Structure.PowerMode.UNKNOWN
+    for code, label in Structure.PowerMode.choices:
+        if value.lower() in (code.lower(), str(label).lower()):
+            return code
+    raise ValueError(f"Unknown power mode: {value!r}")
+
+
+def parse_reinforce_hour(value: Optional[str]) -> int:
+    # required like in the structure form, the lists and timers need it
+    if value in (None, ""):
+        raise ValueError("Missing reinforcement hour")
+    try:
+        hour = int(str(value).split(":")[0])
+    except ValueError:
+        hour = -1
+    if not 0 <= hour <= 23:
+        raise ValueError(f"Invalid reinforcement hour: {value!r}")
+    return hour
@@ -0,0 +1,170 @@
+"""Opt-in performance instrumentation of the views.
+
+When ``STRUCTUREINTEL_INSTRUMENTATION`` is enabled, every instrumented view
+records wall time, number and duration of its SQL queries, payload size and
+whether it was served from the cache. Requests slower than
+``STRUCTUREINTEL_SLOW_REQUEST_MS`` are logged. The latest samples of every
+view are kept per process for the stats endpoint.
+
+Instrumented views can also be profiled, see ``profiling``.
+"""
+import math
+import threading
+import time
+from collections import defaultdict, deque
+from functools import wraps
+from typing import Dict, List, Optional
+
+from django.db import connection
+
+from allianceauth.services.hooks import get_extension_logger
+
+from ..app_settings import (
+    STRUCTUREINTEL_INSTRUMENTATION,
+    STRUCTUREINTEL_SLOW_REQUEST_MS,
+    STRUCTUREINTEL_STATS_WINDOW,
+)
+from .profiling import capture, should_profile
+
+logger = get_extension_logger(__name__)
+
+CACHE_HIT_ATTRIBUTE = "_structureintel_cache_hit"
+
+
+class RequestMetrics:
+    """Metrics of a single request"""
+
+    def __init__(self) -> None:
+        self.wall_ms = 0.0
+        self.sql_count = 0
+        self.sql_ms = 0.0
+        self.payload_bytes: Optional[int] = None
+        self.cache_hit: Optional[bool] = None
+        self.status_code: Optional[int] = None
+
+    def __call__(self, execute, sql, params, many, context):
+        """Execute wrapper counting and timing the queries of the request"""
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.sql_ms += (time.perf_counter() - start) * 1000
+            self.sql_count += 1
+
+
+class ViewStats:
+    """Rolling window of the latest request metrics of a view"""
+
+    def __init__(self, window: int) -> None:
+        self.count = 0
+        self.slow_count = 0
+        self._samples = deque(maxlen=window)
+
+    def add(self, metrics: RequestMetrics, slow: bool) -> None:
+        self.count += 1
+        self.slow_count += int(slow)
+        self._samples.append(
+            (metrics.wall_ms, metrics.sql_count, metrics.sql_ms, metrics.cache_hit)
+        )
+
+    def summary(self) -> dict:
+        samples = list(self._samples)
+        wall_times = sorted(sample[0] for sample in samples)
+        cache_results = [sample[3] for sample in samples if sample[3] is not None]
+        return {
+            "count": self.count,
+            "slow_count": self.slow_count,
+            "window": len(samples),
+            "wall_ms": {
+                "p50": percentile(wall_times, 50),
+                "p90": percentile(wall_times, 90),
+                "p99": percentile(wall_times, 99),
+                "max": round(wall_times[-1], 2) if wall_times else None,
+            },
+            "sql_count_mean": _mean([sample[1] for sample in samples]),
+            "sql_ms_mean": _mean([sample[2] for sample in samples]),
+            "cache_hit_ratio": _mean([float(hit) for hit in cache_results]),
+        }
+
+
+def percentile(sorted_values: List[float], percent: float) -> Optional[float]:
+    """Return the percentile of sorted values with the nearest-rank method"""
+    if not sorted_values:
+        return None
+    rank = max(math.ceil(len(sorted_values) * percent / 100), 1)
+    return round(sorted_values[rank - 1], 2)
+
+
+def _mean(values: List[float]) -> Optional[float]:
+    return round(sum(values) / len(values), 2) if values else None
+
+
+_stats: Dict[str, ViewStats] = defaultdict(
+    lambda: ViewStats(STRUCTUREINTEL_STATS_WINDOW)
+)
+_stats_lock = threading.Lock()
+
+
+def mark_cache(request, hit: bool) -> None:
+    """Record whether the response of a request was served from the cache"""
+    setattr(request, CACHE_HIT_ATTRIBUTE, hit)
+
+
+def instrument(name: str):
+    """Decorator recording metrics of a view under the given name"""
+
+    def decorator(view_func):
+        @wraps(view_func)
+        def wrapper(request, *args, **kwargs):
+            if should_profile(request):
+                return capture(name, request, view_func, *args, **kwargs)
+            if not STRUCTUREINTEL_INSTRUMENTATION:
+                return view_func(request, *args, **kwargs)
+            metrics = RequestMetrics()
+            start = time.perf_counter()
+            with connection.execute_wrapper(metrics):
+                response = view_func(request, *args, **kwargs)
+                if hasattr(response, "render"):
+                    # template responses of class based views render lazily
+                    response.render()
+            metrics.wall_ms = (time.perf_counter() - start) * 1000
+            metrics.status_code = response.status_code
+            if not response.streaming:
+                metrics.payload_bytes = len(response.content)
+            metrics.cache_hit = getattr(request, CACHE_HIT_ATTRIBUTE, None)
+            record(name, metrics)
+            return response
+
+        return wrapper
+
+    return decorator
+
+
+def record(name: str, metrics: RequestMetrics) -> None:
+    slow = metrics.wall_ms >= STRUCTUREINTEL_SLOW_REQUEST_MS
+    with _stats_lock:
+        _stats[name].add(metrics, slow)
+    log = logger.warning if slow else logger.debug
+    log(
+        "%s%s: %.1f ms, status %s, %d queries in %.1f ms, %s bytes, cache %s",
+        "Slow request " if slow else "",
+        name,
+        metrics.wall_ms,
+        metrics.status_code,
+        metrics.sql_count,
+        metrics.sql_ms,
+        metrics.payload_bytes,
+        {True: "hit", False: "miss", None: "-"}[metrics.cache_hit],
+    )
+
+
+def stats_summary() -> Dict[str, dict]:
+    """Return the summary of all views of this process by name"""
+    with _stats_lock:
+        return {name: stats.summary() for name, stats in sorted(_stats.items())}
+
+
+def reset() -> None:
+    """Drop all recorded stats of this process"""
+    with _stats_lock:
+        _stats.clear()
@@ -0,0 +1,160 @@
+"""Profiling captures of single requests.
+
+Staff users with the ``profile_requests`` permission can add ``profile=1``
+to the URL of an instrumented view while ``STRUCTUREINTEL_PROFILING`` is
+enabled. The request then runs under cProfile and the stats are saved to
+``STRUCTUREINTEL_PROFILING_DIR`` together with a JSON file holding the
+request details and the ordered SQL log. Only the latest
+``STRUCTUREINTEL_PROFILING_MAX_CAPTURES`` captures are kept.
+"""
+import cProfile
+import io
+import json
+import os
+import pstats
+import re
+import time
+from datetime import datetime, timezone
+from typing import List, Optional
+from uuid import uuid4
+
+from django.db import connection
+
+from ..app_settings import (
+    STRUCTUREINTEL_PROFILING,
+    STRUCTUREINTEL_PROFILING_DIR,
+    STRUCTUREINTEL_PROFILING_MAX_CAPTURES,
+)
+
+PROFILE_PARAM = "profile"
+
+_CAPTURE_ID = re.compile(r"^[\w-]+$")
+
+
+class SqlLog:
+    """Execute wrapper recording all queries in order"""
+
+    def __init__(self) -> None:
+        self.queries = []
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.queries.append(
+                {
+                    "sql": sql,
+                    "params": repr(params)[:500],
+                    "ms": round((time.perf_counter() - start) * 1000, 3),
+                }
+            )
+
+
+def should_profile(request) -> bool:
+    return (
+        STRUCTUREINTEL_PROFILING
+        and request.GET.get(PROFILE_PARAM) == "1"
+        and request.user.is_staff
+        and request.user.has_perm("structureintel.profile_requests")
+    )
+
+
+def capture(name: str, request, view_func, *args, **kwargs):
+    """Run a view under the profiler, save the capture and return the response"""
+    profiler = cProfile.Profile()
+    sql_log = SqlLog()
+    started_at = datetime.now(timezone.utc)
+    start = time.perf_counter()
+    with connection.execute_wrapper(sql_log):
+        profiler.enable()
+        try:
+            response = view_func(request, *args, **kwargs)
+            if hasattr(response, "render"):
+                response.render()
+        finally:
+            profiler.disable()
+    wall_ms = (time.perf_counter() - start) * 1000
+
+    capture_id = f"{started_at:%Y%m%dT%H%M%S%f}-{name}-{uuid4().hex[:8]}"
+    os.makedirs(STRUCTUREINTEL_PROFILING_DIR, exist_ok=True)
+    profiler.dump_stats(_path(capture_id, "prof"))
+    with open(_path(capture_id, "json"), "w") as file:
+        json.dump(
+            {
+                "id": capture_id,
+                "view": name,
+                "path": request.get_full_path(),
+                "user": request.user.username,
+                "started_at": started_at.isoformat(),
+                "status_code": response.status_code,
+                "wall_ms": round(wall_ms, 3),
+                "sql_count": len(sql_log.queries),
+                "sql_ms": round(sum(query["ms"] for query in sql_log.queries), 3),
+                "queries": sql_log.queries,
+            },
+            file,
+        )
+    prune()
+    return response
+
+
+def _path(capture_id: str, extension: str) -> str:
+    return os.path.join(STRUCTUREINTEL_PROFILING_DIR, f"{capture_id}.{extension}")
+
+
+def list_captures() -> List[dict]:
+    """Return the summaries of all captures, latest first"""
+    captures = []
+    for capture_id in _capture_ids():
+        data = load_capture(capture_id)
+        if data:
+            data.pop("queries")
+            captures.append(data)
+    return captures
+
+
+def load_capture(capture_id: str) -> Optional[dict]:
+    """Return details of a capture or ``None`` if it does not exist"""
+    if not _CAPTURE_ID.match(capture_id):
+        return None
+    try:
+        with open(_path(capture_id, "json")) as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return None
+
+
+def stats_text(capture_id: str, limit: int = 40) -> str:
+    """Return the functions of a capture with the highest cumulative time"""
+    output = io.StringIO()
+    stats = pstats.Stats(_path(capture_id, "prof"), stream=output)
+    stats.sort_stats("cumulative").print_stats(limit)
+    return output.getvalue()
+
+
+def stats_path(capture_id: str) -> Optional[str]:
+    path = _path(capture_id, "prof")
+    return path if _CAPTURE_ID.match(capture_id) and os.path.isfile(path) else None
+
+
+def prune() -> None:
+    """Delete the oldest captures exceeding the retention cap"""
+    for capture_id in _capture_ids()[STRUCTUREINTEL_PROFILING_MAX_CAPTURES:]:
+        for extension in ("json", "prof"):
+            try:
+                os.remove(_path(capture_id, extension))
+            except FileNotFoundError:
+                pass
+
+
+def _capture_ids() -> List[str]:
+    try:
+        filenames = os.listdir(STRUCTUREINTEL_PROFILING_DIR)
+    except FileNotFoundError:
+        return []
+    # IDs start with the UTC timestamp of the request
+    return sorted(
+        (filename[:-5] for filename in filenames if filename.endswith(".json")),
+        reverse=True,
+    )
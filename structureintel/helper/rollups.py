@@ -0,0 +1,271 @@
+"""Structure counts by region, constellation, owner, type, power mode and service.
+
+The counts are stored as one row per dimension and value. They are built
+with one grouped query per dimension and kept up to date incrementally:
+every saved or deleted structure moves its count from the values it had to
+the values it has with two queries, independent of the number of
+structures. The dashboard reads the largest counts of each dimension once
+per process and change of the counts.
+
+Paths that bypass the signals must keep the counts up to date themselves:
+bulk created structures are counted with ``structures_added()``, as the
+importer does, and changes with queryset or bulk updates need a
+``rebuild()``, as ``fittings.refresh_module_summaries()`` does.
+"""
+from collections import Counter
+from functools import reduce
+from operator import or_
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import Case, Count, F, IntegerField, Q, Sum, Value, When
+from eveuniverse.models import EveConstellation, EveRegion, EveSolarSystem, EveType
+
+from ..app_settings import STRUCTUREINTEL_DASHBOARD_MAX_ROWS
+from ..models import FittingModule, Structure, StructureRollup
+from .cache import ROLLUPS, VersionedProcessCache, bump_version_on_commit
+
+Dimension = StructureRollup.Dimension
+
+# fields of a structure its rollup keys are derived from
+KEY_FIELDS = (
+    "eve_solar_system_id",
+    "eve_type_id",
+    "owner",
+    "power_mode",
+    "service_type_ids",
+)
+
+# fields the structures are grouped by for each dimension except services
+GROUP_FIELDS = {
+    Dimension.REGION: "eve_solar_system__eve_constellation__eve_region_id",
+    Dimension.CONSTELLATION: "eve_solar_system__eve_constellation_id",
+    Dimension.OWNER: "owner",
+    Dimension.TYPE: "eve_type_id",
+    Dimension.POWER_MODE: "power_mode",
+}
+
+# constellation and region IDs by solar system ID
+Locations = Dict[int, Tuple[int, int]]
+
+
+class RollupRow(NamedTuple):
+    key: str
+    label: str
+    count: int
+
+
+class RollupTable(NamedTuple):
+    """Largest counts of a dimension"""
+
+    dimension: str
+    label: str
+    rows: List[RollupRow]
+    total: int
+    distinct: int
+
+    @property
+    def others(self) -> int:
+        """Return the sum of the counts not in the rows"""
+        return self.total - sum(row.count for row in self.rows)
+
+
+def row_of(structure: Structure) -> dict:
+    """Return the values of a structure its rollup keys are derived from"""
+    # forms may assign IDs as strings
+    return {
+        field: Structure._meta.get_field(field).to_python(getattr(structure, field))
+        for field in KEY_FIELDS
+    }
+
+
+def _locations(system_ids: Iterable[int]) -> Locations:
+    return {
+        system_id: (constellation_id, region_id)
+        for system_id, constellation_id, region_id in EveSolarSystem.objects.filter(
+            id__in=set(system_ids)
+        ).values_list("id", "eve_constellation_id", "eve_constellation__eve_region_id")
+    }
+
+
+def _keys(row: dict, locations: Locations) -> List[Tuple[str, str]]:
+    constellation_id, region_id = locations.get(
+        row["eve_solar_system_id"], (None, None)
+    )
+    keys = [
+        (Dimension.REGION, region_id),
+        (Dimension.CONSTELLATION, constellation_id),
+        (Dimension.OWNER, row["owner"]),
+        (Dimension.TYPE, row["eve_type_id"]),
+        (Dimension.POWER_MODE, row["power_mode"]),
+    ]
+    keys += [
+        (Dimension.SERVICE, type_id)
+        for type_id in set(row["service_type_ids"].strip(",").split(","))
+        if type_id
+    ]
+    return [(str(dimension), str(key)) for dimension, key in keys if key is not None]
+
+
+def _counts(rows: Iterable[dict], locations: Locations) -> Counter:
+    counts = Counter()
+    for row in rows:
+        counts.update(_keys(row, locations))
+    return counts
+
+
+def _apply(changes: Dict[Tuple[str, str], int]) -> None:
+    changes = {key: change for key, change in changes.items() if change}
+    if not changes:
+        return
+    StructureRollup.objects.bulk_create(
+        [
+            StructureRollup(dimension=dimension, key=key)
+            for (dimension, key), change in changes.items()
+            if change > 0
+        ],
+        ignore_conflicts=True,
+    )
+    StructureRollup.objects.filter(
+        reduce(or_, (Q(dimension=dimension, key=key) for dimension, key in changes))
+    ).update(
+        count=F("count")
+        + Case(
+            *(
+                When(dimension=dimension, key=key, then=Value(change))
+                for (dimension, key), change in changes.items()
+            ),
+            default=Value(0),
+            output_field=IntegerField(),
+        )
+    )
+    bump_version_on_commit(ROLLUPS)
+
+
+def structure_changed(old: Optional[dict], new: Optional[dict]) -> None:
+    """Move the counts of a structure from its ``old`` to its ``new`` values.
+
+    ``old`` is ``None`` for created and ``new`` for deleted structures. Needs
+    no query if none of the values the structures are grouped by changed.
+    """
+    if old == new:
+        return
+    rows = [row for row in (old, new) if row]
+    locations = _locations(row["eve_solar_system_id"] for row in rows)
+    changes = _counts([new] if new else [], locations)
+    changes.subtract(_counts([old] if old else [], locations))
+    _apply(changes)
+
+
+def structures_added(structures: Iterable[Structure]) -> None:
+    """Count structures that were created without signals, e.g. in bulk"""
+    rows = [row_of(structure) for structure in structures]
+    _apply(_counts(rows, _locations(row["eve_solar_system_id"] for row in rows)))
+
+
+def _grouped_counts() -> Counter:
+    counts = Counter()
+    structures = Structure.objects.order_by()
+    for dimension, field in GROUP_FIELDS.items():
+        for key, count in (
+            structures.exclude(**{f"{field}__isnull": True})
+            .values_list(field)
+            .annotate(count=Count("id"))
+        ):
+            counts[(str(dimension), str(key))] = count
+    for type_id, count in (
+        FittingModule.objects.filter(
+            slot=FittingModule.Slot.SERVICE, fitting__structures__isnull=False
+        )
+        .order_by()
+        .values_list("eve_type_id")
+        .annotate(count=Count("fitting__structures", distinct=True))
+    ):
+        counts[(str(Dimension.SERVICE), str(type_id))] = count
+    return counts
+
+
+def rebuild() -> int:
+    """Recompute all counts with one grouped query per dimension.
+
+    Needs to be called when structures are changed without signals, e.g.
+    with bulk updates or raw SQL. Returns the number of stored counts.
+    """
+    with transaction.atomic():
+        counts = _grouped_counts()
+        StructureRollup.objects.all().delete()
+        StructureRollup.objects.bulk_create(
+            StructureRollup(dimension=dimension, key=key, count=count)
+            for (dimension, key), count in counts.items()
+        )
+        bump_version_on_commit(ROLLUPS)
+    return len(counts)
+
+
+def _names(model, ids: Iterable[str]) -> Dict[str, str]:
+    return {
+        str(obj_id): name
+        for obj_id, name in model.objects.filter(
+            id__in=[int(key) for key in ids]
+        ).values_list("id", "name")
+    }
+
+
+def _labels(keys: Dict[str, List[str]]) -> Dict[str, Dict[str, str]]:
+    """Return the names of the keys by dimension"""
+    type_names = _names(EveType, keys[Dimension.TYPE] + keys[Dimension.SERVICE])
+    return {
+        Dimension.REGION: _names(EveRegion, keys[Dimension.REGION]),
+        Dimension.CONSTELLATION: _names(
+            EveConstellation, keys[Dimension.CONSTELLATION]
+        ),
+        Dimension.OWNER: {},
+        Dimension.TYPE: type_names,
+        Dimension.POWER_MODE: {
+            value: str(label) for value, label in Structure.PowerMode.choices
+        },
+        Dimension.SERVICE: type_names,
+    }
+
+
+def _build_tables() -> List[RollupTable]:
+    rollups = StructureRollup.objects.filter(count__gt=0)
+    totals = {
+        dimension: (total, distinct)
+        for dimension, total, distinct in rollups.order_by()
+        .values_list("dimension")
+        .annotate(total=Sum("count"), distinct=Count("id"))
+    }
+    top = {
+        dimension: list(
+            rollups.filter(dimension=dimension)
+            .order_by("-count", "key")
+            .values_list("key", "count")[:STRUCTUREINTEL_DASHBOARD_MAX_ROWS]
+        )
+        for dimension in Dimension.values
+    }
+    labels = _labels(
+        {dimension: [key for key, _ in rows] for dimension, rows in top.items()}
+    )
+    tables = []
+    for dimension, label in Dimension.choices:
+        total, distinct = totals.get(dimension, (0, 0))
+        rows = [
+            RollupRow(key, labels[dimension].get(key, key), count)
+            for key, count in top[dimension]
+        ]
+        tables.append(RollupTable(dimension, str(label), rows, total, distinct))
+    return tables
+
+
+_tables = VersionedProcessCache(ROLLUPS, _build_tables, shared_key="rollups")
+
+
+def get_tables() -> List[RollupTable]:
+    """Return the largest counts of all dimensions"""
+    return _tables.get()
+
+
+def clear() -> None:
+    """Drop the counts of this process"""
+    _tables.clear()
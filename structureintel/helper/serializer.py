@@ -1,3 +1,7 @@
+from operator import attrgetter, itemgetter
+from typing import Callable, Iterator
+
+from django.core.serializers.json import DjangoJSONEncoder
 from django.urls import reverse
 from django.utils.html import format_html
 from eveuniverse.models import EveSolarSystem, EveType
@@ -5,49 +9,87 @@ from eveuniverse.models import EveSolarSystem, EveType
 from allianceauth.eveonline.evelinks.dotlan import solar_system_url
 from allianceauth.eveonline.evelinks.eveimageserver import type_icon_url
 
-from ..models import Structure, StructureModule
+from ..models import Structure
+
+
+def iter_chunks(queryset, chunk_size: int, id_of: Callable) -> Iterator[list]:
+    """Yield the rows of a queryset in chunks ordered by ID.
+
+    Every chunk is fetched with its own query for the IDs after the last
+    chunk. Unlike ``QuerySet.iterator()`` this holds only one chunk in memory
+    on MySQL too, which has no server-side cursors.
+    """
+    queryset = queryset.order_by("id")
+    chunk = list(queryset[:chunk_size])
+    while chunk:
+        yield chunk
+        if len(chunk) < chunk_size:
+            return
+        chunk = list(queryset.filter(id__gt=id_of(chunk[-1]))[:chunk_size])
 
 
 class StructureSerializer:
+    """Serializer for the structure list.
+
+    Loads all rows with one joined query for structures, systems,
+    constellations, regions and types. Services are read from the summary
+    stored on each structure, so the module table is never queried.
+    """
+
     def __init__(self, queryset) -> None:
-        self.queryset = queryset
+        self.queryset = queryset.select_related(
+            "eve_solar_system__eve_constellation__eve_region", "eve_type"
+        )
 
     def to_list(self, request) -> list:
-        return [self.serialize_obj(obj, request) for obj in self.queryset]
+        can_delete = request.user.has_perm("structureintel.delete_structure")
+        return [self.serialize_obj(obj, can_delete) for obj in self.queryset]
+
+    def iter_json(self, request, chunk_size: int, extra: dict = None) -> Iterator[str]:
+        """Yield the list as JSON object with a ``data`` array chunk by chunk.
+
+        Structures are fetched with one query per chunk and written in
+        chunks, so only one chunk is held in memory at a time. Items of
+        ``extra`` are added to the object.
+        """
+        can_delete = request.user.has_perm("structureintel.delete_structure")
+        encode = DjangoJSONEncoder().encode
+        # the object up to the opening bracket of its data array
+        yield encode({**(extra or {}), "data": []})[:-2]
+        separator = ""
+        for chunk in iter_chunks(self.queryset, chunk_size, attrgetter("id")):
+            yield separator + ", ".join(
+                encode(self.serialize_obj(obj, can_delete)) for obj in chunk
+            )
+            separator = ", "
+        yield "]}"
 
-    def serialize_obj(self, structure: Structure, request) -> dict:
-        # Fetch services
-        services = StructureModule.objects.filter(
-            structure_id=structure.id, slot="Service"
+    def serialize_obj(self, structure: Structure, can_delete: bool) -> dict:
+        solar_system = structure.eve_solar_system
+        constellation = solar_system.eve_constellation
+        region = constellation.eve_region
+        details_url = reverse("structureintel:structure_details", args=[structure.id])
+        actions = format_html(
+            '<button type="button" class="btn btn-default" data-toggle="modal" data-target="#modalStructureDetails" data-ajax_url="{}" title="Show fitting"><i class="fas fa-search"></i></button> <a class="btn btn-default" href="{}" title="Update structure"><i class="fas fa-edit"></i></a>',
+            details_url,
+            reverse("structureintel:update", args=[structure.id]),
         )
-        servicesNames = []
-        for service in services:
-            servicesNames.append(service.eve_type.name)
-
-        if request.user.has_perm("structureintel.delete_structure"):
-            actions = format_html(
-                '<button type="button" class="btn btn-default" data-toggle="modal" data-target="#modalStructureDetails" data-ajax_url="{}" title="Show fitting"><i class="fas fa-search"></i></button> <a class="btn btn-danger" href="{}" title="Delete structure"><i class="fas fa-trash"></i></button>',
-                reverse("structureintel:structure_details", args=[structure.id]),
+        if can_delete:
+            actions += format_html(
+                ' <a class="btn btn-danger" href="{}" title="Delete structure"><i class="fas fa-trash"></i></a>',
                 reverse("structureintel:delete", args=[structure.id]),
             )
-        else:
-            actions = format_html(
-                '<button type="button" class="btn btn-default" data-toggle="modal" data-target="#modalStructureDetails" data-ajax_url="{}" title="Show fitting"><i class="fas fa-search"></i></button>',
-                reverse("structureintel:structure_details", args=[structure.id]),
-            )
         return {
             "id": structure.id,
             "location": format_html(
                 '<a href="{}" target="_blank">{}</a><br><a href="{}" target="_blank">{}</a>',
-                solar_system_url(structure.eve_solar_system.id),
-                structure.eve_solar_system.name,
+                solar_system_url(solar_system.id),
+                solar_system.name,
                 "https://evemaps.dotlan.net/map/"
-                + str(
-                    structure.eve_solar_system.eve_constellation.eve_region.name
-                ).replace(" ", "_")
+                + str(region.name).replace(" ", "_")
                 + "/"
-                + str(structure.eve_solar_system.name).replace(" ", "_"),
-                structure.eve_solar_system.eve_constellation.eve_region.name,
+                + str(solar_system.name).replace(" ", "_"),
+                region.name,
             ),
             "type_icon": format_html(
                 '<img src="{}" width="{}" height="{}"/>',
@@ -57,13 +99,126 @@ class StructureSerializer:
             ),
             "type": structure.eve_type.name,
             "structure_name": format_html("{}<br>{}", structure.name, structure.owner),
-            "services": "<br>".join(servicesNames),
+            "services": "<br>".join(structure.service_names.splitlines()),
             "power": structure.get_power_mode_display(),
             "reinforcement": "{:02d}:00".format(structure.reinforce_hour),
             "actions": actions,
-            "system_name": structure.eve_solar_system.name,
-            "constellation_name": structure.eve_solar_system.eve_constellation.name,
-            "region_name": structure.eve_solar_system.eve_constellation.eve_region.name,
+            "system_name": solar_system.name,
+            "constellation_name": constellation.name,
+            "region_name": region.name,
+        }
+
+
+class StructureCompactSerializer:
+    """Compact serializer for the structure list.
+
+    Rows are arrays of raw values in the order of ``COLUMNS``. Names of
+    systems, constellations, regions and types are sent once in lookup
+    tables and the markup is built by the render callbacks of the list page.
+    """
+
+    COLUMNS = (
+        "id",
+        "system_id",
+        "type_id",
+        "name",
+        "owner",
+        "service_type_ids",
+        "power_mode",
+        "reinforce_hour",
+    )
+
+    FIELDS = (
+        "id",
+        "eve_solar_system_id",
+        "eve_type_id",
+        "name",
+        "owner",
+        "service_type_ids",
+        "power_mode",
+        "reinforce_hour",
+        "service_names",
+        "eve_type__name",
+        "eve_solar_system__name",
+        "eve_solar_system__eve_constellation_id",
+        "eve_solar_system__eve_constellation__name",
+        "eve_solar_system__eve_constellation__eve_region_id",
+        "eve_solar_system__eve_constellation__eve_region__name",
+    )
+
+    def __init__(self, queryset) -> None:
+        self.queryset = queryset.values_list(*self.FIELDS)
+        self.systems = {}
+        self.constellations = {}
+        self.regions = {}
+        self.types = {}
+
+    def to_dict(self, request) -> dict:
+        data = [self.serialize_row(values) for values in self.queryset]
+        return {"columns": self.COLUMNS, "data": data, **self.lookups(request)}
+
+    def iter_json(self, request, chunk_size: int, extra: dict = None) -> Iterator[str]:
+        """Yield the payload as JSON chunk by chunk, lookup tables last"""
+        encode = DjangoJSONEncoder().encode
+        # the object up to the opening bracket of its data array
+        yield encode({**(extra or {}), "columns": self.COLUMNS, "data": []})[:-2]
+        separator = ""
+        # the ID is the first of the fields
+        for chunk in iter_chunks(self.queryset, chunk_size, itemgetter(0)):
+            yield separator + encode([self.serialize_row(row) for row in chunk])[1:-1]
+            separator = ", "
+        yield f"], {encode(self.lookups(request))[1:]}"
+
+    def serialize_row(self, values: tuple) -> list:
+        """Return the row of a structure and add its names to the lookups"""
+        (
+            structure_id,
+            system_id,
+            type_id,
+            name,
+            owner,
+            service_type_ids,
+            power_mode,
+            reinforce_hour,
+            service_names,
+            type_name,
+            system_name,
+            constellation_id,
+            constellation_name,
+            region_id,
+            region_name,
+        ) = values
+        services = (
+            [int(value) for value in service_type_ids.strip(",").split(",")]
+            if service_type_ids
+            else []
+        )
+        self.types[type_id] = type_name
+        self.types.update(zip(services, service_names.splitlines()))
+        self.systems[system_id] = [system_name, constellation_id]
+        self.constellations[constellation_id] = [constellation_name, region_id]
+        self.regions[region_id] = region_name
+        return [
+            structure_id,
+            system_id,
+            type_id,
+            name,
+            owner,
+            services,
+            power_mode,
+            reinforce_hour,
+        ]
+
+    def lookups(self, request) -> dict:
+        return {
+            "systems": self.systems,
+            "constellations": self.constellations,
+            "regions": self.regions,
+            "types": self.types,
+            "power_modes": {
+                value: str(label) for value, label in Structure.PowerMode.choices
+            },
+            "can_delete": request.user.has_perm("structureintel.delete_structure"),
         }
 
 
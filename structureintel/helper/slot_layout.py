@@ -0,0 +1,78 @@
+"""Slot layout of structure types for the fitting panel of the details modal.
+
+Slot counts come from dogma attributes, which are loaded together with the
+structure types by ``structureintel_preload_structures``. The layouts of all
+structure types are built with one query and kept per process until EVE
+types change.
+"""
+from typing import Dict, NamedTuple
+
+from django.contrib.staticfiles.storage import staticfiles_storage
+from eveuniverse.models import EveTypeDogmaAttribute
+
+from .cache import EVE_TYPES, VersionedProcessCache
+from .type_index import STRUCTURE_CATEGORY_ID
+
+# dogma attribute IDs of the slot counts and suffixes of their panel images
+SLOT_ATTRIBUTES = {
+    "high": (14, "h"),
+    "med": (13, "m"),
+    "low": (12, "l"),
+    "rig": (1137, "r"),
+    "service": (2056, "s"),
+}
+
+
+class SlotLayout(NamedTuple):
+    """Number of slots by kind and the URLs of their panel images"""
+
+    counts: Dict[str, int]
+    image_urls: Dict[str, str]
+
+
+EMPTY_LAYOUT = SlotLayout({}, {slot: "" for slot in SLOT_ATTRIBUTES})
+
+
+def make_layout(attributes: Dict[int, int]) -> SlotLayout:
+    """Return the layout of a type from its slot attributes by ID"""
+    counts = {}
+    image_urls = {}
+    for slot, (attribute_id, suffix) in SLOT_ATTRIBUTES.items():
+        if attribute_id in attributes:
+            counts[slot] = attributes[attribute_id]
+            image_urls[slot] = staticfiles_storage.url(
+                f"structureintel/img/pannel/{counts[slot]}{suffix}.png"
+            )
+        else:
+            image_urls[slot] = ""
+    return SlotLayout(counts, image_urls)
+
+
+def _build_layouts() -> Dict[int, SlotLayout]:
+    attributes = {}
+    for type_id, attribute_id, value in EveTypeDogmaAttribute.objects.filter(
+        eve_type__eve_group__eve_category_id=STRUCTURE_CATEGORY_ID,
+        eve_dogma_attribute_id__in=[
+            attribute_id for attribute_id, _ in SLOT_ATTRIBUTES.values()
+        ],
+    ).values_list("eve_type_id", "eve_dogma_attribute_id", "value"):
+        attributes.setdefault(type_id, {})[attribute_id] = int(value)
+    return {type_id: make_layout(values) for type_id, values in attributes.items()}
+
+
+_layouts = VersionedProcessCache(EVE_TYPES, _build_layouts, shared_key="slot_layouts")
+
+
+def get_layout(type_id: int) -> SlotLayout:
+    """Return the slot layout of a structure type"""
+    return _layouts.get().get(type_id, EMPTY_LAYOUT)
+
+
+def warm() -> int:
+    """Build the layouts of this process and return the number of types"""
+    return len(_layouts.get())
+
+
+def clear() -> None:
+    """Drop the layouts of this process"""
+    _layouts.clear()
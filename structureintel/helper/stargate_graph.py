@@ -0,0 +1,153 @@
+"""Jump distances between solar systems over the stargate graph.
+
+The graph is kept as compressed sparse rows: systems are numbered, their
+neighbors are stored back to back in one integer array and a second array
+holds where the neighbors of each system start. It is built once per
+process from the stargates loaded by ``structureintel_preload_map``.
+
+A breadth first search from an origin visits all systems reachable from it.
+The visited systems are remembered in the order of their distance together
+with where each distance ends, so the systems within any number of jumps
+from a memoized origin are a slice of that order.
+"""
+import threading
+from array import array
+from collections import OrderedDict
+from typing import Dict, NamedTuple
+
+from eveuniverse.models import EveStargate
+
+from .cache import STARGATES, VersionedProcessCache
+
+# number of origins of which the search results are kept per process
+MEMOIZED_ORIGINS = 256
+
+
+class Reach(NamedTuple):
+    """Systems reachable from an origin.
+
+    ``system_ids`` are in order of their distance and the systems within
+    ``n`` jumps are the first ``level_ends[n]`` of them.
+    """
+
+    system_ids: array
+    level_ends: array
+
+    def within(self, max_jumps: int) -> Dict[int, int]:
+        """Return the jumps to all systems within ``max_jumps`` by system ID"""
+        result = {}
+        start = 0
+        for jumps, end in enumerate(self.level_ends[: max_jumps + 1]):
+            for system_id in self.system_ids[start:end]:
+                result[system_id] = jumps
+            start = end
+        return result
+
+
+class StargateGraph:
+    """Stargate connections between solar systems"""
+
+    def __init__(self, system_ids: array, offsets: array, neighbors: array) -> None:
+        self.system_ids = system_ids
+        self.offsets = offsets
+        self.neighbors = neighbors
+        self._setup()
+
+    def _setup(self) -> None:
+        self._index = {system_id: num for num, system_id in enumerate(self.system_ids)}
+        self._reaches = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __getstate__(self) -> tuple:
+        return self.system_ids, self.offsets, self.neighbors
+
+    def __setstate__(self, state: tuple) -> None:
+        self.system_ids, self.offsets, self.neighbors = state
+        self._setup()
+
+    def __len__(self) -> int:
+        return len(self.system_ids)
+
+    def reach(self, origin_id: int) -> Reach:
+        """Return the systems reachable from a system, memoized per origin.
+
+        Systems without stargates, e.g. in wormhole space, only reach
+        themselves.
+        """
+        with self._lock:
+            reach = self._reaches.get(origin_id)
+            if reach is not None:
+                self._reaches.move_to_end(origin_id)
+                return reach
+        reach = self._search(origin_id)
+        with self._lock:
+            self._reaches[origin_id] = reach
+            if len(self._reaches) > MEMOIZED_ORIGINS:
+                self._reaches.popitem(last=False)
+        return reach
+
+    def _search(self, origin_id: int) -> Reach:
+        origin = self._index.get(origin_id)
+        if origin is None:
+            return Reach(array("i", [origin_id]), array("i", [1]))
+        offsets = self.offsets
+        neighbors = self.neighbors
+        visited = bytearray(len(self.system_ids))
+        visited[origin] = 1
+        order = [origin]
+        level_ends = [1]
+        start = 0
+        while start < len(order):
+            end = len(order)
+            for node in order[start:end]:
+                for neighbor in neighbors[offsets[node] : offsets[node + 1]]:
+                    if not visited[neighbor]:
+                        visited[neighbor] = 1
+                        order.append(neighbor)
+            if len(order) > end:
+                level_ends.append(len(order))
+            start = end
+        system_ids = self.system_ids
+        return Reach(
+            array("i", (system_ids[node] for node in order)), array("i", level_ends)
+        )
+
+
+def _build_graph() -> StargateGraph:
+    edges = set()
+    for source_id, destination_id in EveStargate.objects.filter(
+        destination_eve_solar_system__isnull=False
+    ).values_list("eve_solar_system_id", "destination_eve_solar_system_id"):
+        if source_id != destination_id:
+            edges.add((source_id, destination_id))
+            edges.add((destination_id, source_id))
+    system_ids = array("i", sorted({source_id for source_id, _ in edges}))
+    index = {system_id: num for num, system_id in enumerate(system_ids)}
+    offsets = array("i", [0] * (len(system_ids) + 1))
+    neighbors = array("i")
+    for source_id, destination_id in sorted(edges):
+        offsets[index[source_id] + 1] += 1
+        neighbors.append(index[destination_id])
+    for num in range(len(system_ids)):
+        offsets[num + 1] += offsets[num]
+    return StargateGraph(system_ids, offsets, neighbors)
+
+
+_graph = VersionedProcessCache(STARGATES, _build_graph, shared_key="stargate_graph")
+
+
+def get_graph() -> StargateGraph:
+    """Return the stargate graph of this process"""
+    return _graph.get()
+
+
+def systems_within(origin_id: int, max_jumps: int) -> Dict[int, int]:
+    """Return the jumps from a system to all systems within ``max_jumps``
+    by system ID, including the system itself
+    """
+    return get_graph().reach(origin_id).within(max_jumps)
+
+
+def clear() -> None:
+    """Drop the graph of this process"""
+    _graph.clear()
@@ -0,0 +1,52 @@
+"""Prefix index of solar system names for the autocomplete.
+
+Names are kept in a list sorted by their lowercase form, so all systems
+starting with a term are a contiguous slice found with a binary search.
+"""
+import heapq
+from bisect import bisect_left
+from typing import List, NamedTuple
+
+from eveuniverse.models import EveSolarSystem
+
+from .cache import SOLAR_SYSTEMS, VersionedProcessCache
+
+
+class SystemEntry(NamedTuple):
+    key: str
+    name: str
+    id: int
+
+
+def _build_index() -> List[SystemEntry]:
+    return sorted(
+        SystemEntry(name.lower(), name, system_id)
+        for system_id, name in EveSolarSystem.objects.values_list("id", "name")
+    )
+
+
+_index = VersionedProcessCache(SOLAR_SYSTEMS, _build_index)
+
+
+def search(term: str, limit: int) -> List[SystemEntry]:
+    """Return up to ``limit`` systems with a name starting with ``term``.
+
+    An exact match comes first, followed by shorter names, so e.g. Jita
+    is not buried below the many systems that only share its prefix.
+    """
+    term = term.strip().lower()
+    if not term or limit < 1:
+        return []
+    index = _index.get()
+    start = bisect_left(index, (term,))
+    end = bisect_left(index, (term + "\uffff",), start)
+    return heapq.nsmallest(
+        limit,
+        index[start:end],
+        key=lambda entry: (entry.key != term, len(entry.key), entry.key),
+    )
+
+
+def clear() -> None:
+    """Drop the index of this process"""
+    _index.clear()
@@ -0,0 +1,260 @@
+"""Reinforcement timers of structures.
+
+Structures leave reinforcement at their reinforce hour in EVE time, which
+is UTC. Timers in a window of hours are found with the index on the
+reinforce hour. The number of structures per reinforce hour is stored as
+24-hour histograms in total and per region, system and owner. They are
+built with one grouped query each and kept up to date incrementally like
+the rollups: every saved or deleted structure moves its counts from the
+hour, location and owner it had to the ones it has, so no change needs a
+scan of all structures.
+"""
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from functools import reduce
+from operator import or_
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.db import transaction
+from django.db.models import Case, Count, F, IntegerField, Q, QuerySet, Sum, Value, When
+from eveuniverse.models import EveSolarSystem
+
+from ..models import ReinforceHourCount, Structure
+
+Scope = ReinforceHourCount.Scope
+
+HOURS_PER_DAY = 24
+
+REGION_FIELD = "eve_solar_system__eve_constellation__eve_region_id"
+
+# fields of a structure its hour counts are derived from
+KEY_FIELDS = ("eve_solar_system_id", "owner", "reinforce_hour")
+
+# fields the structures are grouped by for each scope except the total
+GROUP_FIELDS = {
+    Scope.REGION: REGION_FIELD,
+    Scope.SYSTEM: "eve_solar_system_id",
+    Scope.OWNER: "owner",
+}
+
+HourKey = Tuple[str, str, int]
+
+
+def _counts(queryset: QuerySet) -> List[int]:
+    """Return the number of structures by reinforce hour"""
+    counts = [0] * HOURS_PER_DAY
+    for hour, count in (
+        queryset.filter(reinforce_hour__isnull=False)
+        .order_by()
+        .values_list("reinforce_hour")
+        .annotate(count=Count("id"))
+    ):
+        counts[hour] = count
+    return counts
+
+
+def row_of(structure: Structure) -> dict:
+    """Return the values of a structure its hour counts are derived from"""
+    # forms may assign IDs as strings
+    return {
+        field: Structure._meta.get_field(field).to_python(getattr(structure, field))
+        for field in KEY_FIELDS
+    }
+
+
+def _regions(system_ids: Iterable[int]) -> Dict[int, int]:
+    return dict(
+        EveSolarSystem.objects.filter(id__in=set(system_ids)).values_list(
+            "id", "eve_constellation__eve_region_id"
+        )
+    )
+
+
+def _keys(row: dict, regions: Dict[int, int]) -> List[HourKey]:
+    hour = row["reinforce_hour"]
+    if hour is None:
+        return []
+    keys = [
+        (Scope.TOTAL, "", hour),
+        (Scope.REGION, regions.get(row["eve_solar_system_id"]), hour),
+        (Scope.SYSTEM, row["eve_solar_system_id"], hour),
+        (Scope.OWNER, row["owner"], hour),
+    ]
+    return [
+        (str(scope), str(key), hour) for scope, key, hour in keys if key is not None
+    ]
+
+
+def _key_counts(rows: Iterable[dict], regions: Dict[int, int]) -> Counter:
+    counts = Counter()
+    for row in rows:
+        counts.update(_keys(row, regions))
+    return counts
+
+
+def _apply(changes: Dict[HourKey, int]) -> None:
+    changes = {key: change for key, change in changes.items() if change}
+    if not changes:
+        return
+    ReinforceHourCount.objects.bulk_create(
+        [
+            ReinforceHourCount(scope=scope, key=key, hour=hour)
+            for (scope, key, hour), change in changes.items()
+            if change > 0
+        ],
+        ignore_conflicts=True,
+    )
+    ReinforceHourCount.objects.filter(
+        reduce(
+            or_, (Q(scope=scope, key=key, hour=hour) for scope, key, hour in changes)
+        )
+    ).update(
+        count=F("count")
+        + Case(
+            *(
+                When(scope=scope, key=key, hour=hour, then=Value(change))
+                for (scope, key, hour), change in changes.items()
+            ),
+            default=Value(0),
+            output_field=IntegerField(),
+        )
+    )
+
+
+def structure_changed(old: Optional[dict], new: Optional[dict]) -> None:
+    """Move the hour counts of a structure from its ``old`` to its ``new`` values.
+
+    ``old`` is ``None`` for created and ``new`` for deleted structures. Needs
+    no query if neither the reinforce hour, the location nor the owner changed.
+    """
+    if old == new:
+        return
+    rows = [row for row in (old, new) if row and row["reinforce_hour"] is not None]
+    if not rows:
+        return
+    regions = _regions(row["eve_solar_system_id"] for row in rows)
+    changes = _key_counts([new] if new else [], regions)
+    changes.subtract(_key_counts([old] if old else [], regions))
+    _apply(changes)
+
+
+def structures_added(structures: Iterable[Structure]) -> None:
+    """Count structures that were created without signals, e.g. in bulk"""
+    rows = [row_of(structure) for structure in structures]
+    rows = [row for row in rows if row["reinforce_hour"] is not None]
+    if rows:
+        _apply(_key_counts(rows, _regions(row["eve_solar_system_id"] for row in rows)))
+
+
+def _grouped_counts() -> Counter:
+    counts = Counter()
+    structures = Structure.objects.filter(reinforce_hour__isnull=False).order_by()
+    for hour, count in structures.values_list("reinforce_hour").annotate(
+        count=Count("id")
+    ):
+        counts[(str(Scope.TOTAL), "", hour)] = count
+    for scope, field in GROUP_FIELDS.items():
+        for key, hour, count in (
+            structures.exclude(**{f"{field}__isnull": True})
+            .values_list(field, "reinforce_hour")
+            .annotate(count=Count("id"))
+        ):
+            counts[(str(scope), str(key), hour)] = count
+    return counts
+
+
+def rebuild() -> int:
+    """Recompute all hour counts with one grouped query per scope.
+
+    Needs to be called when the reinforce hour, location or owner of
+    structures is changed without signals, e.g. with bulk updates or raw SQL.
+    Returns the number of stored counts.
+    """
+    with transaction.atomic():
+        counts = _grouped_counts()
+        ReinforceHourCount.objects.all().delete()
+        ReinforceHourCount.objects.bulk_create(
+            ReinforceHourCount(scope=scope, key=key, hour=hour, count=count)
+            for (scope, key, hour), count in counts.items()
+        )
+    return len(counts)
+
+
+def _stored(scope: str, keys: Iterable) -> List[int]:
+    """Return the sum of the stored hour counts of keys of a scope"""
+    counts = [0] * HOURS_PER_DAY
+    for hour, count in (
+        ReinforceHourCount.objects.filter(scope=scope, key__in=[str(k) for k in keys])
+        .order_by()
+        .values_list("hour")
+        .annotate(total=Sum("count"))
+    ):
+        counts[hour] = count
+    return counts
+
+
+def histogram(
+    region_id: Optional[int] = None,
+    owner: Optional[str] = None,
+    system_ids: Optional[Iterable[int]] = None,
+) -> List[int]:
+    """Return the number of structures by reinforce hour in an area.
+
+    Single filters are answered from the stored hour counts, combined
+    filters with one grouped query over the matching structures.
+    """
+    filters = {}
+    if region_id is not None:
+        filters[REGION_FIELD] = region_id
+    if owner:
+        filters["owner"] = owner
+    if system_ids is not None:
+        system_ids = list(system_ids)
+        filters["eve_solar_system_id__in"] = system_ids
+    if len(filters) > 1:
+        return _counts(Structure.objects.filter(**filters))
+    if region_id is not None:
+        return _stored(Scope.REGION, [region_id])
+    if owner:
+        return _stored(Scope.OWNER, [owner])
+    if system_ids is not None:
+        return _stored(Scope.SYSTEM, system_ids)
+    return _stored(Scope.TOTAL, [""])
+
+
+def first_hour(moment: datetime) -> int:
+    """Return the first full hour after a time in EVE time"""
+    return (moment.astimezone(timezone.utc).hour + 1) % HOURS_PER_DAY
+
+
+def window_hours(moment: datetime, hours: int) -> List[int]:
+    """Return the reinforce hours of the timers within ``hours`` after a time,
+    in order of their next occurrence
+    """
+    start = first_hour(moment)
+    return [(start + num) % HOURS_PER_DAY for num in range(min(hours, HOURS_PER_DAY))]
+
+
+def next_occurrence(moment: datetime, reinforce_hour: int) -> datetime:
+    """Return the next time a timer of a reinforce hour ends after a time"""
+    hour = moment.astimezone(timezone.utc).replace(minute=0, second=0, microsecond=0)
+    offset = (reinforce_hour - first_hour(moment)) % HOURS_PER_DAY
+    return hour + timedelta(hours=offset + 1)
+
+
+def timers(queryset: QuerySet, moment: datetime, hours: int) -> QuerySet:
+    """Return the structures of a queryset with timers ending within ``hours``
+    after a time, ordered by the end of their timer
+    """
+    start = first_hour(moment)
+    return (
+        queryset.filter(reinforce_hour__in=window_hours(moment, hours))
+        .annotate(
+            timer_offset=Case(
+                When(reinforce_hour__gte=start, then=F("reinforce_hour") - start),
+                default=F("reinforce_hour") + HOURS_PER_DAY - start,
+                output_field=IntegerField(),
+            )
+        )
+        .order_by("timer_offset", "name", "id")
+    )
@@ -0,0 +1,97 @@
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from django.db.models import Q
+from eveuniverse.models import EveType
+
+from .cache import EVE_TYPES, VersionedProcessCache
+
+# types loaded by structureintel_preload_structures
+STRUCTURE_CATEGORY_ID = 65
+STRUCTURE_MODULE_CATEGORY_ID = 66
+INDEXED_TYPES = (
+    Q(
+        eve_group__eve_category_id__in=[
+            STRUCTURE_CATEGORY_ID,
+            STRUCTURE_MODULE_CATEGORY_ID,
+        ]
+    )
+    | Q(eve_group_id=365)
+    | Q(id=2233)
+)
+
+
+class TypeInfo(NamedTuple):
+    id: int
+    group_id: int
+    category_id: int
+
+
+class CatalogEntry(NamedTuple):
+    key: str
+    name: str
+    id: int
+
+
+def _build_index() -> Dict[str, TypeInfo]:
+    return {
+        name: TypeInfo(type_id, group_id, category_id)
+        for name, type_id, group_id, category_id in EveType.objects.filter(
+            INDEXED_TYPES
+        ).values_list("name", "id", "eve_group_id", "eve_group__eve_category_id")
+    }
+
+
+def _build_structure_types() -> List[CatalogEntry]:
+    return [
+        CatalogEntry(name.casefold(), name, type_id)
+        for type_id, name in EveType.objects.filter(
+            eve_group__eve_category_id=STRUCTURE_CATEGORY_ID, published=True
+        )
+        .order_by("name")
+        .values_list("id", "name")
+    ]
+
+
+_index = VersionedProcessCache(EVE_TYPES, _build_index)
+_structure_types = VersionedProcessCache(
+    EVE_TYPES, _build_structure_types, shared_key="structure_types"
+)
+
+
+def get_type(name: str) -> Optional[TypeInfo]:
+    """Return the indexed type with the given name or ``None``"""
+    return _index.get().get(name)
+
+
+def resolve_type_ids(names: Iterable[str]) -> Tuple[Dict[str, int], List[str]]:
+    """Resolve eve type names to IDs.
+
+    Names are looked up in the in-process index first. Only names missing
+    from it, e.g. types of other categories, are looked up with one query.
+    Returns the IDs of all known types by name and the sorted unknown names.
+    """
+    names = set(names)
+    if not names:
+        return {}, []
+    index = _index.get()
+    type_ids = {name: index[name].id for name in names if name in index}
+    missing = names - type_ids.keys()
+    if missing:
+        type_ids.update(
+            EveType.objects.filter(name__in=missing).values_list("name", "id")
+        )
+    return type_ids, sorted(names - type_ids.keys())
+
+
+def search_structure_types(term: str, limit: int) -> List[CatalogEntry]:
+    """Return up to ``limit`` published structure types containing ``term``"""
+    term = term.strip().casefold()
+    if not term:
+        return []
+    return [entry for entry in _structure_types.get() if term in entry.key][:limit]
+
+
+def clear() -> None:
+    """Drop the indexes of this process"""
+    _index.clear()
+    _structure_types.clear()
@@ -0,0 +1,70 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from ...helper.importer import READERS, ImportResult, StructureImporter
+
+
+class Command(BaseCommand):
+    help = (
+        "Imports structures from a JSONL file with one structure per line "
+        "or a multi-fit EFT file"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("filename", help="file to import, - for stdin")
+        parser.add_argument(
+            "--format",
+            choices=sorted(READERS),
+            help="input format, detected from the file extension by default",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="number of records stored per transaction",
+        )
+
+    def handle(self, *args, **options):
+        filename = options["filename"]
+        input_format = options["format"] or (
+            "jsonl" if filename.lower().endswith((".jsonl", ".json")) else "eft"
+        )
+        try:
+            file = (
+                sys.stdin
+                if filename == "-"
+                else open(filename, encoding="utf-8", newline="")
+            )
+        except OSError as ex:
+            raise CommandError(f"Can not open {filename}: {ex}") from ex
+
+        importer = StructureImporter(batch_size=options["batch_size"])
+        total = ImportResult()
+        started = time.perf_counter()
+        try:
+            for result in importer.import_records(READERS[input_format](file)):
+                total.update(result)
+                for error in result.errors:
+                    self.stderr.write(f"Line {error.line}: {error.message}")
+                self.stdout.write(
+                    f"{total.processed:,} records processed, "
+                    f"{self._rate(total.processed, started):,.0f} records/s"
+                )
+        finally:
+            if file is not sys.stdin:
+                file.close()
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Imported {total.created:,} structures in "
+                f"{time.perf_counter() - started:.1f}s "
+                f"({self._rate(total.created, started):,.0f} structures/s), "
+                f"{len(total.errors):,} records failed"
+            )
+        )
+
+    @staticmethod
+    def _rate(count: int, started: float) -> float:
+        return count / max(time.perf_counter() - started, 1e-6)
@@ -1,3 +1,4 @@
+from django.conf import settings
 from django.core.management.base import BaseCommand
 from eveuniverse.tasks import load_map
 
@@ -6,6 +7,13 @@ class Command(BaseCommand):
     help = "Preloads map for this app"
 
     def handle(self, *args, **options):
+        if not getattr(settings, "EVEUNIVERSE_LOAD_STARGATES", False):
+            self.stdout.write(
+                self.style.WARNING(
+                    "EVEUNIVERSE_LOAD_STARGATES is not enabled, so no stargates "
+                    "are loaded and proximity queries find no systems in range."
+                )
+            )
 
         # Load systems
         load_map()
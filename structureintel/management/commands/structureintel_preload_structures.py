@@ -2,6 +2,7 @@ from django.core.management import call_command
 from django.core.management.base import BaseCommand
 
 from ... import __title__
+from ...helper import slot_layout
 
 
 class Command(BaseCommand):
@@ -21,3 +22,7 @@ class Command(BaseCommand):
             "--category_id",
             "66",
         )
+
+        # Build slot layouts of the loaded structure types
+        count = slot_layout.warm()
+        self.stdout.write(f"Cached slot layouts of {count} structure types")
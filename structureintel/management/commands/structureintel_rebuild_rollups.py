@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from ...helper import rollups, timers
+
+
+class Command(BaseCommand):
+    help = (
+        "Recomputes the structure counts of the dashboard by region, constellation, "
+        "owner, type, power mode and service and the reinforce hour histograms"
+    )
+
+    def handle(self, *args, **options):
+        count = rollups.rebuild()
+        self.stdout.write(f"Rebuilt {count} structure counts")
+        count = timers.rebuild()
+        self.stdout.write(f"Rebuilt {count} reinforce hour counts")
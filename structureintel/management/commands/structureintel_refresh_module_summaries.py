@@ -0,0 +1,24 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from ...helper.fittings import refresh_module_summaries
+
+
+class Command(BaseCommand):
+    help = (
+        "Recomputes the service summary and module counts stored on structures "
+        "from their fittings"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="number of structures updated per query",
+        )
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            count = refresh_module_summaries(batch_size=max(1, options["batch_size"]))
+        self.stdout.write(f"Refreshed module summaries of {count} structures")
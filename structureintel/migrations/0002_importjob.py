@@ -0,0 +1,116 @@
+# Generated by Django 3.2.25 on 2026-10-18 07:38
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("structureintel", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ImportJob",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "input_format",
+                    models.CharField(
+                        choices=[("jsonl", "JSONL"), ("eft", "Multi-fit EFT")],
+                        max_length=5,
+                    ),
+                ),
+                (
+                    "content",
+                    models.TextField(
+                        blank=True,
+                        help_text="Uploaded data, cleared once it has been split up",
+                    ),
+                ),
+                (
+                    "status",
+                    models.CharField(
+                        choices=[
+                            ("PE", "pending"),
+                            ("RU", "running"),
+                            ("FI", "finished"),
+                            ("FA", "failed"),
+                        ],
+                        default="PE",
+                        max_length=2,
+                    ),
+                ),
+                ("total_chunks", models.PositiveIntegerField(default=0)),
+                ("finished_chunks", models.PositiveIntegerField(default=0)),
+                (
+                    "created_count",
+                    models.PositiveIntegerField(
+                        default=0, help_text="Number of imported structures"
+                    ),
+                ),
+                (
+                    "failed_count",
+                    models.PositiveIntegerField(
+                        default=0,
+                        help_text="Number of records that could not be imported",
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+                (
+                    "finished_at",
+                    models.DateTimeField(blank=True, default=None, null=True),
+                ),
+                (
+                    "user",
+                    models.ForeignKey(
+                        blank=True,
+                        default=None,
+                        help_text="User who uploaded the import",
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+        migrations.CreateModel(
+            name="ImportJobError",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "line",
+                    models.PositiveIntegerField(help_text="First line of the record"),
+                ),
+                ("message", models.TextField()),
+                (
+                    "job",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="errors",
+                        to="structureintel.importjob",
+                    ),
+                ),
+            ],
+        ),
+    ]
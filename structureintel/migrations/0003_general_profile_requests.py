@@ -0,0 +1,25 @@
+# Generated by Django 3.2.25 on 2026-10-18 07:52
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("structureintel", "0002_importjob"),
+    ]
+
+    operations = [
+        migrations.AlterModelOptions(
+            name="general",
+            options={
+                "default_permissions": (),
+                "managed": False,
+                "permissions": (
+                    ("basic_access", "Can access this app"),
+                    ("delete_structure", "Can delete structure"),
+                    ("profile_requests", "Can profile requests"),
+                ),
+            },
+        ),
+    ]
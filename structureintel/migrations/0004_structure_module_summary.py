@@ -0,0 +1,115 @@
+# Generated by Django 3.2.25 on 2026-10-18 07:53
+
+from collections import defaultdict
+
+from django.db import migrations, models
+
+SLOT_COUNT_FIELDS = {
+    "Highslot": "highslot_count",
+    "Midslot": "midslot_count",
+    "Lowslot": "lowslot_count",
+    "Rigslot": "rigslot_count",
+    "Service": "service_count",
+}
+
+
+def fill_module_summaries(apps, schema_editor):
+    """Compute the module fields of existing structures from their modules"""
+    Structure = apps.get_model("structureintel", "Structure")
+    StructureModule = apps.get_model("structureintel", "StructureModule")
+
+    modules = defaultdict(list)
+    for structure_id, slot, type_id, name in (
+        StructureModule.objects.order_by("id")
+        .values_list("structure_id", "slot", "eve_type_id", "eve_type__name")
+        .iterator()
+    ):
+        modules[structure_id].append((slot, type_id, name))
+
+    structures = []
+    for structure_id, structure_modules in modules.items():
+        structure = Structure(id=structure_id)
+        for slot, field in SLOT_COUNT_FIELDS.items():
+            setattr(
+                structure,
+                field,
+                sum(1 for module in structure_modules if module[0] == slot),
+            )
+        services = [module for module in structure_modules if module[0] == "Service"]
+        structure.service_type_ids = (
+            f",{','.join(str(type_id) for _, type_id, _ in services)},"
+            if services
+            else ""
+        )
+        structure.service_names = "\n".join(name for _, _, name in services)
+        structures.append(structure)
+    Structure.objects.bulk_update(
+        structures,
+        [*SLOT_COUNT_FIELDS.values(), "service_type_ids", "service_names"],
+        batch_size=500,
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("structureintel", "0003_general_profile_requests"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="structure",
+            name="highslot_count",
+            field=models.PositiveSmallIntegerField(
+                default=0, help_text="Number of modules fitted to high slots"
+            ),
+        ),
+        migrations.AddField(
+            model_name="structure",
+            name="lowslot_count",
+            field=models.PositiveSmallIntegerField(
+                default=0, help_text="Number of modules fitted to low slots"
+            ),
+        ),
+        migrations.AddField(
+            model_name="structure",
+            name="midslot_count",
+            field=models.PositiveSmallIntegerField(
+                default=0, help_text="Number of modules fitted to medium slots"
+            ),
+        ),
+        migrations.AddField(
+            model_name="structure",
+            name="rigslot_count",
+            field=models.PositiveSmallIntegerField(
+                default=0, help_text="Number of rigs fitted"
+            ),
+        ),
+        migrations.AddField(
+            model_name="structure",
+            name="service_count",
+            field=models.PositiveSmallIntegerField(
+                default=0, help_text="Number of services fitted"
+            ),
+        ),
+        migrations.AddField(
+            model_name="structure",
+            name="service_names",
+            field=models.TextField(
+                blank=True,
+                default="",
+                help_text="Names of the fitted services in order, one per line",
+            ),
+        ),
+        migrations.AddField(
+            model_name="structure",
+            name="service_type_ids",
+            field=models.CharField(
+                blank=True,
+                default="",
+                help_text="Type IDs of the fitted services in order, as ',id1,id2,'",
+                max_length=255,
+            ),
+        ),
+        migrations.RunPython(fill_module_summaries, migrations.RunPython.noop),
+    ]
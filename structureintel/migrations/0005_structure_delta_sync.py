@@ -0,0 +1,58 @@
+# Generated by Django 3.2.25 on 2026-10-18 08:01
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+def set_last_updated_at(apps, schema_editor):
+    Structure = apps.get_model("structureintel", "Structure")
+    Structure.objects.filter(last_updated_at__isnull=True).update(
+        last_updated_at=django.utils.timezone.now()
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("structureintel", "0004_structure_module_summary"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="DeletedStructure",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "structure_id",
+                    models.PositiveIntegerField(help_text="ID of the structure"),
+                ),
+                (
+                    "deleted_at",
+                    models.DateTimeField(
+                        db_index=True,
+                        default=django.utils.timezone.now,
+                        help_text="date the structure was deleted",
+                    ),
+                ),
+            ],
+        ),
+        migrations.AlterField(
+            model_name="structure",
+            name="last_updated_at",
+            field=models.DateTimeField(
+                auto_now=True,
+                db_index=True,
+                help_text="date this structure was last changed, used for delta sync",
+                null=True,
+            ),
+        ),
+        migrations.RunPython(set_last_updated_at, migrations.RunPython.noop),
+    ]
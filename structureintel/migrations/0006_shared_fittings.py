@@ -0,0 +1,235 @@
+# Generated by Django 3.2.25 on 2026-10-18 08:06
+
+import hashlib
+from collections import defaultdict
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+SLOTS = ("Highslot", "Midslot", "Lowslot", "Rigslot", "Service")
+
+SLOT_COUNT_FIELDS = {
+    "Highslot": "highslot_count",
+    "Midslot": "midslot_count",
+    "Lowslot": "lowslot_count",
+    "Rigslot": "rigslot_count",
+    "Service": "service_count",
+}
+
+
+def move_modules_to_fittings(apps, schema_editor):
+    """Store the modules of each structure once per distinct fitting"""
+    Fitting = apps.get_model("structureintel", "Fitting")
+    FittingModule = apps.get_model("structureintel", "FittingModule")
+    Structure = apps.get_model("structureintel", "Structure")
+    StructureModule = apps.get_model("structureintel", "StructureModule")
+
+    quantities = defaultdict(lambda: defaultdict(int))
+    for structure_id, slot, type_id in StructureModule.objects.values_list(
+        "structure_id", "slot", "eve_type_id"
+    ).iterator():
+        quantities[structure_id][(slot, type_id)] += 1
+
+    structure_ids = defaultdict(list)
+    modules = {}
+    for structure_id, fitting in quantities.items():
+        canonical = sorted(
+            (
+                (slot, type_id, quantity)
+                for (slot, type_id), quantity in fitting.items()
+            ),
+            key=lambda module: (
+                SLOTS.index(module[0]) if module[0] in SLOTS else len(SLOTS),
+                module[1],
+            ),
+        )
+        digest = hashlib.sha256(
+            "\n".join(
+                f"{slot}:{type_id}:{quantity}" for slot, type_id, quantity in canonical
+            ).encode("utf-8")
+        ).hexdigest()
+        structure_ids[digest].append(structure_id)
+        modules[digest] = canonical
+
+    for digest, fitting_structure_ids in structure_ids.items():
+        fitting = Fitting.objects.create(hash=digest)
+        FittingModule.objects.bulk_create(
+            FittingModule(
+                fitting=fitting, slot=slot, eve_type_id=type_id, quantity=quantity
+            )
+            for slot, type_id, quantity in modules[digest]
+        )
+        for start in range(0, len(fitting_structure_ids), 500):
+            Structure.objects.filter(
+                id__in=fitting_structure_ids[start : start + 500]
+            ).update(fitting=fitting)
+
+
+def fill_module_summaries(apps, schema_editor):
+    """Compute the module fields of structures from their fittings, with
+    services in the canonical order of the fittings
+    """
+    FittingModule = apps.get_model("structureintel", "FittingModule")
+    Structure = apps.get_model("structureintel", "Structure")
+
+    modules = defaultdict(list)
+    for fitting_id, slot, type_id, name, quantity in FittingModule.objects.order_by(
+        "fitting_id", "id"
+    ).values_list("fitting_id", "slot", "eve_type_id", "eve_type__name", "quantity"):
+        modules[fitting_id].append((slot, type_id, name, quantity))
+
+    summaries = {}
+    for fitting_id, fitting_modules in modules.items():
+        summary = {field: 0 for field in SLOT_COUNT_FIELDS.values()}
+        service_ids = []
+        service_names = []
+        for slot, type_id, name, quantity in fitting_modules:
+            summary[SLOT_COUNT_FIELDS[slot]] += quantity
+            if slot == "Service":
+                service_ids += [str(type_id)] * quantity
+                service_names += [name] * quantity
+        summary["service_type_ids"] = (
+            f",{','.join(service_ids)}," if service_ids else ""
+        )
+        summary["service_names"] = "\n".join(service_names)
+        summaries[fitting_id] = summary
+
+    structures = []
+    for structure_id, fitting_id in Structure.objects.values_list("id", "fitting_id"):
+        summary = summaries.get(fitting_id)
+        if summary is None:
+            summary = {field: 0 for field in SLOT_COUNT_FIELDS.values()}
+            summary.update(service_type_ids="", service_names="")
+        structures.append(Structure(id=structure_id, **summary))
+    Structure.objects.bulk_update(
+        structures,
+        [*SLOT_COUNT_FIELDS.values(), "service_type_ids", "service_names"],
+        batch_size=500,
+    )
+
+
+def move_fittings_to_modules(apps, schema_editor):
+    """Copy the modules of each fitting to its structures"""
+    FittingModule = apps.get_model("structureintel", "FittingModule")
+    Structure = apps.get_model("structureintel", "Structure")
+    StructureModule = apps.get_model("structureintel", "StructureModule")
+
+    modules = defaultdict(list)
+    for fitting_id, slot, type_id, quantity in FittingModule.objects.order_by(
+        "id"
+    ).values_list("fitting_id", "slot", "eve_type_id", "quantity"):
+        modules[fitting_id] += [(slot, type_id)] * quantity
+    for structure_id, fitting_id in Structure.objects.filter(
+        fitting__isnull=False
+    ).values_list("id", "fitting_id"):
+        StructureModule.objects.bulk_create(
+            StructureModule(structure_id=structure_id, slot=slot, eve_type_id=type_id)
+            for slot, type_id in modules[fitting_id]
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("eveuniverse", "0007_evetype_description"),
+        ("structureintel", "0005_structure_delta_sync"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="Fitting",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "hash",
+                    models.CharField(
+                        help_text="SHA-256 of the canonical modules of this fitting",
+                        max_length=64,
+                        unique=True,
+                    ),
+                ),
+                ("created_at", models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.CreateModel(
+            name="FittingModule",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "slot",
+                    models.CharField(
+                        choices=[
+                            ("Highslot", "Highslot"),
+                            ("Midslot", "Medslot"),
+                            ("Lowslot", "Lowslot"),
+                            ("Rigslot", "Rigslot"),
+                            ("Service", "Service"),
+                        ],
+                        max_length=255,
+                    ),
+                ),
+                (
+                    "quantity",
+                    models.PositiveSmallIntegerField(
+                        default=1,
+                        help_text="Number of these modules fitted to the slot",
+                    ),
+                ),
+                (
+                    "eve_type",
+                    models.ForeignKey(
+                        help_text="eve type of the module",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="eveuniverse.evetype",
+                    ),
+                ),
+                (
+                    "fitting",
+                    models.ForeignKey(
+                        help_text="Fitting this module belongs to",
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="modules",
+                        to="structureintel.fitting",
+                    ),
+                ),
+            ],
+            options={
+                "unique_together": {("fitting", "slot", "eve_type")},
+            },
+        ),
+        migrations.AddField(
+            model_name="structure",
+            name="fitting",
+            field=models.ForeignKey(
+                blank=True,
+                default=None,
+                help_text="Fitted modules, shared with all structures of the same fitting",
+                null=True,
+                on_delete=django.db.models.deletion.PROTECT,
+                related_name="structures",
+                to="structureintel.fitting",
+            ),
+        ),
+        migrations.RunPython(move_modules_to_fittings, move_fittings_to_modules),
+        migrations.RunPython(fill_module_summaries, migrations.RunPython.noop),
+        migrations.DeleteModel(
+            name="StructureModule",
+        ),
+    ]
@@ -0,0 +1,77 @@
+# Generated by Django 3.2.25 on 2026-10-18 08:12
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+        ("structureintel", "0006_shared_fittings"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="FittingRevision",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "created_at",
+                    models.DateTimeField(
+                        default=django.utils.timezone.now,
+                        help_text="date the fitting was submitted",
+                    ),
+                ),
+                (
+                    "fitting",
+                    models.ForeignKey(
+                        blank=True,
+                        default=None,
+                        help_text="Fitting of the structure from this revision on",
+                        null=True,
+                        on_delete=django.db.models.deletion.PROTECT,
+                        related_name="+",
+                        to="structureintel.fitting",
+                    ),
+                ),
+                (
+                    "structure",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="fitting_revisions",
+                        to="structureintel.structure",
+                    ),
+                ),
+                (
+                    "submitted_by",
+                    models.ForeignKey(
+                        blank=True,
+                        default=None,
+                        help_text="User who submitted the fitting",
+                        null=True,
+                        on_delete=django.db.models.deletion.SET_NULL,
+                        related_name="+",
+                        to=settings.AUTH_USER_MODEL,
+                    ),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="fittingrevision",
+            index=models.Index(
+                fields=["structure", "created_at"],
+                name="structurein_structu_d786e8_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 3.2.25 on 2026-10-18 08:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("structureintel", "0007_fitting_revisions"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="structure",
+            index=models.Index(
+                fields=["reinforce_hour"], name="structurein_reinfor_ab6649_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="structure",
+            index=models.Index(
+                fields=["owner", "reinforce_hour"], name="structurein_owner_0834fd_idx"
+            ),
+        ),
+    ]
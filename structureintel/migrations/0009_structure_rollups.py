@@ -0,0 +1,104 @@
+# Generated by Django 3.2.25 on 2026-10-18 08:24
+
+from django.db import migrations, models
+from django.db.models import Count
+
+# fields the structures are grouped by for each dimension except services
+GROUP_FIELDS = {
+    "region": "eve_solar_system__eve_constellation__eve_region_id",
+    "constellation": "eve_solar_system__eve_constellation_id",
+    "owner": "owner",
+    "type": "eve_type_id",
+    "power_mode": "power_mode",
+}
+
+
+def fill_rollups(apps, schema_editor):
+    """Count the existing structures by region, constellation, owner, type,
+    power mode and service
+    """
+    FittingModule = apps.get_model("structureintel", "FittingModule")
+    Structure = apps.get_model("structureintel", "Structure")
+    StructureRollup = apps.get_model("structureintel", "StructureRollup")
+
+    rollups = []
+    structures = Structure.objects.order_by()
+    for dimension, field in GROUP_FIELDS.items():
+        rollups += [
+            StructureRollup(dimension=dimension, key=str(key), count=count)
+            for key, count in structures.exclude(**{f"{field}__isnull": True})
+            .values_list(field)
+            .annotate(count=Count("id"))
+        ]
+    rollups += [
+        StructureRollup(dimension="service", key=str(type_id), count=count)
+        for type_id, count in FittingModule.objects.filter(
+            slot="Service", fitting__structures__isnull=False
+        )
+        .order_by()
+        .values_list("eve_type_id")
+        .annotate(count=Count("fitting__structures", distinct=True))
+    ]
+    StructureRollup.objects.bulk_create(rollups, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("structureintel", "0008_reinforce_hour_indexes"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StructureRollup",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "dimension",
+                    models.CharField(
+                        choices=[
+                            ("region", "Region"),
+                            ("constellation", "Constellation"),
+                            ("owner", "Owner"),
+                            ("type", "Type"),
+                            ("power_mode", "Power mode"),
+                            ("service", "Service"),
+                        ],
+                        max_length=16,
+                    ),
+                ),
+                (
+                    "key",
+                    models.CharField(
+                        help_text="ID or value the structures are grouped by",
+                        max_length=255,
+                    ),
+                ),
+                (
+                    "count",
+                    models.IntegerField(default=0, help_text="Number of structures"),
+                ),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name="structurerollup",
+            index=models.Index(
+                fields=["dimension", "-count"], name="structureintel_rollup_top"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="structurerollup",
+            constraint=models.UniqueConstraint(
+                fields=("dimension", "key"), name="functional_pk_structurerollup"
+            ),
+        ),
+        migrations.RunPython(fill_rollups, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,97 @@
+# Generated by Django 3.2.25 on 2026-10-18 08:45
+
+from django.db import migrations, models
+from django.db.models import Count
+
+# fields the structures are grouped by for each scope except the total
+GROUP_FIELDS = {
+    "region": "eve_solar_system__eve_constellation__eve_region_id",
+    "system": "eve_solar_system_id",
+    "owner": "owner",
+}
+
+
+def fill_reinforce_hour_counts(apps, schema_editor):
+    """Count the existing structures by reinforce hour in total and per
+    region, system and owner
+    """
+    ReinforceHourCount = apps.get_model("structureintel", "ReinforceHourCount")
+    Structure = apps.get_model("structureintel", "Structure")
+
+    structures = Structure.objects.filter(reinforce_hour__isnull=False).order_by()
+    counts = [
+        ReinforceHourCount(scope="total", key="", hour=hour, count=count)
+        for hour, count in structures.values_list("reinforce_hour").annotate(
+            count=Count("id")
+        )
+    ]
+    for scope, field in GROUP_FIELDS.items():
+        counts += [
+            ReinforceHourCount(scope=scope, key=str(key), hour=hour, count=count)
+            for key, hour, count in structures.exclude(**{f"{field}__isnull": True})
+            .values_list(field, "reinforce_hour")
+            .annotate(count=Count("id"))
+        ]
+    ReinforceHourCount.objects.bulk_create(counts, batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("structureintel", "0009_structure_rollups"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="ReinforceHourCount",
+            fields=[
+                (
+                    "id",
+                    models.AutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                (
+                    "scope",
+                    models.CharField(
+                        choices=[
+                            ("total", "Total"),
+                            ("region", "Region"),
+                            ("system", "Solar system"),
+                            ("owner", "Owner"),
+                        ],
+                        max_length=8,
+                    ),
+                ),
+                (
+                    "key",
+                    models.CharField(
+                        blank=True,
+                        default="",
+                        help_text="ID or owner the structures are counted for, empty for the total",
+                        max_length=255,
+                    ),
+                ),
+                (
+                    "hour",
+                    models.PositiveSmallIntegerField(
+                        help_text="Reinforce hour in EVE time"
+                    ),
+                ),
+                (
+                    "count",
+                    models.IntegerField(default=0, help_text="Number of structures"),
+                ),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name="reinforcehourcount",
+            constraint=models.UniqueConstraint(
+                fields=("scope", "key", "hour"), name="functional_pk_reinforcehourcount"
+            ),
+        ),
+        migrations.RunPython(fill_reinforce_hour_counts, migrations.RunPython.noop),
+    ]
@@ -1,6 +1,8 @@
+from django.conf import settings
 from django.core.validators import MaxValueValidator
 from django.db import models
 from django.urls import reverse
+from django.utils.timezone import now
 from django.utils.translation import gettext_lazy as _
 from eveuniverse.models import EveSolarSystem, EveType
 
@@ -14,6 +16,7 @@ class General(models.Model):
         permissions = (
             ("basic_access", "Can access this app"),
             ("delete_structure", "Can delete structure"),
+            ("profile_requests", "Can profile requests"),
         )
 
 
@@ -59,11 +62,20 @@ class Structure(models.Model):
     eve_type = models.ForeignKey(
         EveType, on_delete=models.CASCADE, help_text="type of the structure"
     )
-    last_updated_at = models.DateTimeField(
+    fitting = models.ForeignKey(
+        "Fitting",
+        on_delete=models.PROTECT,
         null=True,
         default=None,
         blank=True,
-        help_text="date this structure was last updated from the EVE server",
+        related_name="structures",
+        help_text="Fitted modules, shared with all structures of the same fitting",
+    )
+    last_updated_at = models.DateTimeField(
+        auto_now=True,
+        null=True,
+        db_index=True,
+        help_text="date this structure was last changed, used for delta sync",
     )
     name = models.CharField(max_length=255, help_text="The full name of the structure")
     owner = models.CharField(max_length=255, help_text="The owner of the structure")
@@ -75,6 +87,41 @@ class Structure(models.Model):
         help_text=("Default reinforcement hour of this structure"),
     )
 
+    # summary of the fitted modules, maintained by helper.fittings
+    service_type_ids = models.CharField(
+        max_length=255,
+        default="",
+        blank=True,
+        help_text="Type IDs of the fitted services in order, as ',id1,id2,'",
+    )
+    service_names = models.TextField(
+        default="",
+        blank=True,
+        help_text="Names of the fitted services in order, one per line",
+    )
+    highslot_count = models.PositiveSmallIntegerField(
+        default=0, help_text="Number of modules fitted to high slots"
+    )
+    midslot_count = models.PositiveSmallIntegerField(
+        default=0, help_text="Number of modules fitted to medium slots"
+    )
+    lowslot_count = models.PositiveSmallIntegerField(
+        default=0, help_text="Number of modules fitted to low slots"
+    )
+    rigslot_count = models.PositiveSmallIntegerField(
+        default=0, help_text="Number of rigs fitted"
+    )
+    service_count = models.PositiveSmallIntegerField(
+        default=0, help_text="Number of services fitted"
+    )
+
+    class Meta:
+        indexes = [
+            # structures leaving reinforcement in a window of hours
+            models.Index(fields=["reinforce_hour"]),
+            models.Index(fields=["owner", "reinforce_hour"]),
+        ]
+
     def __str__(self) -> str:
         try:
             location_name = self.eve_solar_system.name
@@ -86,7 +133,104 @@ class Structure(models.Model):
         return reverse("structureintel:index")
 
 
-class StructureModule(models.Model):
+class DeletedStructure(models.Model):
+    """Tombstone of a deleted structure for delta sync of the structure list"""
+
+    structure_id = models.PositiveIntegerField(help_text="ID of the structure")
+    deleted_at = models.DateTimeField(
+        default=now, db_index=True, help_text="date the structure was deleted"
+    )
+
+    def __str__(self) -> str:
+        return f"{self.structure_id} deleted at {self.deleted_at}"
+
+
+class StructureRollup(models.Model):
+    """Number of structures with a value of a dimension, maintained by helper.rollups"""
+
+    class Dimension(models.TextChoices):
+        REGION = "region", _("Region")
+        CONSTELLATION = "constellation", _("Constellation")
+        OWNER = "owner", _("Owner")
+        TYPE = "type", _("Type")
+        POWER_MODE = "power_mode", _("Power mode")
+        SERVICE = "service", _("Service")
+
+    dimension = models.CharField(max_length=16, choices=Dimension.choices)
+    key = models.CharField(
+        max_length=255, help_text="ID or value the structures are grouped by"
+    )
+    count = models.IntegerField(default=0, help_text="Number of structures")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["dimension", "key"], name="functional_pk_structurerollup"
+            )
+        ]
+        indexes = [
+            # largest counts of a dimension
+            models.Index(
+                fields=["dimension", "-count"], name="structureintel_rollup_top"
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.dimension} {self.key}: {self.count}"
+
+
+class ReinforceHourCount(models.Model):
+    """Number of structures with a reinforce hour in an area or of an owner,
+    maintained by helper.timers
+    """
+
+    class Scope(models.TextChoices):
+        TOTAL = "total", _("Total")
+        REGION = "region", _("Region")
+        SYSTEM = "system", _("Solar system")
+        OWNER = "owner", _("Owner")
+
+    scope = models.CharField(max_length=8, choices=Scope.choices)
+    key = models.CharField(
+        max_length=255,
+        blank=True,
+        default="",
+        help_text="ID or owner the structures are counted for, empty for the total",
+    )
+    hour = models.PositiveSmallIntegerField(help_text="Reinforce hour in EVE time")
+    count = models.IntegerField(default=0, help_text="Number of structures")
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["scope", "key", "hour"],
+                name="functional_pk_reinforcehourcount",
+            )
+        ]
+
+    def __str__(self) -> str:
+        return f"{self.scope} {self.key} {self.hour}: {self.count}"
+
+
+class Fitting(models.Model):
+    """A fitting shared by all structures with the same modules.
+
+    Fittings are content addressed by the hash of their canonical modules
+    and never change once created.
+    """
+
+    hash = models.CharField(
+        max_length=64,
+        unique=True,
+        help_text="SHA-256 of the canonical modules of this fitting",
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self) -> str:
+        return self.hash[:12]
+
+
+class FittingModule(models.Model):
     class Slot(models.TextChoices):
         HIGHSLOT = "Highslot"
         MEDSLOT = "Midslot"
@@ -94,21 +238,130 @@ class StructureModule(models.Model):
         RIGSLOT = "Rigslot"
         SERVICE = "Service"
 
-    structure = models.ForeignKey(
-        Structure,
+    fitting = models.ForeignKey(
+        Fitting,
         on_delete=models.CASCADE,
-        related_name="items",
-        help_text="Structure this item is located in",
+        related_name="modules",
+        help_text="Fitting this module belongs to",
     )
 
     eve_type = models.ForeignKey(
         EveType,
         on_delete=models.CASCADE,
-        help_text="eve type of the item",
+        help_text="eve type of the module",
         related_name="+",
     )
 
     slot = models.CharField(max_length=255, choices=Slot.choices)
+    quantity = models.PositiveSmallIntegerField(
+        default=1, help_text="Number of these modules fitted to the slot"
+    )
+
+    class Meta:
+        unique_together = ("fitting", "slot", "eve_type")
 
     def __str__(self) -> str:
         return str(self.eve_type.name)
+
+
+class FittingRevision(models.Model):
+    """A fitting submitted for a structure.
+
+    Revisions only point to the shared fitting, so each costs one row and
+    changes are computed between the modules of consecutive revisions.
+    """
+
+    structure = models.ForeignKey(
+        Structure, on_delete=models.CASCADE, related_name="fitting_revisions"
+    )
+    fitting = models.ForeignKey(
+        Fitting,
+        on_delete=models.PROTECT,
+        null=True,
+        default=None,
+        blank=True,
+        related_name="+",
+        help_text="Fitting of the structure from this revision on",
+    )
+    created_at = models.DateTimeField(
+        default=now, help_text="date the fitting was submitted"
+    )
+    submitted_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        default=None,
+        blank=True,
+        related_name="+",
+        help_text="User who submitted the fitting",
+    )
+
+    class Meta:
+        indexes = [models.Index(fields=["structure", "created_at"])]
+
+    def __str__(self) -> str:
+        return f"{self.structure_id} at {self.created_at}"
+
+
+class ImportJob(models.Model):
+    """A bulk import of structures processed in the background"""
+
+    class Format(models.TextChoices):
+        JSONL = "jsonl", _("JSONL")
+        EFT = "eft", _("Multi-fit EFT")
+
+    class Status(models.TextChoices):
+        PENDING = "PE", _("pending")
+        RUNNING = "RU", _("running")
+        FINISHED = "FI", _("finished")
+        FAILED = "FA", _("failed")
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.SET_NULL,
+        null=True,
+        default=None,
+        blank=True,
+        related_name="+",
+        help_text="User who uploaded the import",
+    )
+    input_format = models.CharField(choices=Format.choices, max_length=5)
+    content = models.TextField(
+        blank=True, help_text="Uploaded data, cleared once it has been split up"
+    )
+    status = models.CharField(
+        choices=Status.choices, max_length=2, default=Status.PENDING
+    )
+    total_chunks = models.PositiveIntegerField(default=0)
+    finished_chunks = models.PositiveIntegerField(default=0)
+    created_count = models.PositiveIntegerField(
+        default=0, help_text="Number of imported structures"
+    )
+    failed_count = models.PositiveIntegerField(
+        default=0, help_text="Number of records that could not be imported"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+    finished_at = models.DateTimeField(null=True, default=None, blank=True)
+
+    def __str__(self) -> str:
+        return f"Import {self.pk} ({self.get_status_display()})"
+
+    @property
+    def progress(self) -> int:
+        """Progress in percent"""
+        if self.status == self.Status.FINISHED:
+            return 100
+        if not self.total_chunks:
+            return 0
+        return int(100 * self.finished_chunks / self.total_chunks)
+
+
+class ImportJobError(models.Model):
+    """A record of an import job that could not be imported"""
+
+    job = models.ForeignKey(ImportJob, on_delete=models.CASCADE, related_name="errors")
+    line = models.PositiveIntegerField(help_text="First line of the record")
+    message = models.TextField()
+
+    def __str__(self) -> str:
+        return f"Line {self.line}: {self.message}"
@@ -0,0 +1,96 @@
+from typing import Iterable, Optional
+
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from eveuniverse.models import EveSolarSystem, EveStargate, EveType
+
+from .helper import rollups, timers
+from .helper.cache import (
+    EVE_TYPES,
+    LIST_DATA,
+    SOLAR_SYSTEMS,
+    STARGATES,
+    bump_version_on_commit,
+    drop_version_on_commit,
+    fitting_version_name,
+)
+from .models import DeletedStructure, Structure
+
+# fields of a structure the stored counts are derived from
+COUNTED_FIELDS = sorted(set(rollups.KEY_FIELDS) | set(timers.KEY_FIELDS))
+
+
+def _project(row: Optional[dict], fields: Iterable[str]) -> Optional[dict]:
+    return {field: row[field] for field in fields} if row else None
+
+
+def _counts_changed(old: Optional[dict], new: Optional[dict]) -> None:
+    for counts in (rollups, timers):
+        counts.structure_changed(
+            _project(old, counts.KEY_FIELDS), _project(new, counts.KEY_FIELDS)
+        )
+
+
+def _counted_values(structure: Structure) -> dict:
+    # forms may assign IDs as strings
+    return {
+        field: Structure._meta.get_field(field).to_python(getattr(structure, field))
+        for field in COUNTED_FIELDS
+    }
+
+
+@receiver(post_save, sender=Structure)
+@receiver(post_delete, sender=Structure)
+def structure_data_changed(sender, instance, **kwargs):
+    bump_version_on_commit(LIST_DATA)
+
+
+@receiver(post_save, sender=Structure)
+def structure_fitting_changed(sender, instance, **kwargs):
+    # fittings never change, modules change by assigning another fitting
+    bump_version_on_commit(fitting_version_name(instance.pk))
+
+
+@receiver(post_delete, sender=Structure)
+def structure_deleted(sender, instance, **kwargs):
+    DeletedStructure.objects.create(structure_id=instance.pk)
+    # the version key is kept without timeout, so it would never go away
+    drop_version_on_commit(fitting_version_name(instance.pk))
+    _counts_changed(_counted_values(instance), None)
+
+
+@receiver(pre_save, sender=Structure)
+def structure_saving(sender, instance, **kwargs):
+    # the stored values are needed to move the counts of the rollups and timers
+    instance._counted_row = (
+        Structure.objects.filter(pk=instance.pk).values(*COUNTED_FIELDS).first()
+        if instance.pk
+        else None
+    )
+
+
+@receiver(post_save, sender=Structure)
+def structure_saved(sender, instance, **kwargs):
+    _counts_changed(getattr(instance, "_counted_row", None), _counted_values(instance))
+
+
+@receiver(post_save, sender=EveType)
+@receiver(post_delete, sender=EveType)
+def eve_type_changed(sender, **kwargs):
+    # type names are part of the structure list payloads
+    bump_version_on_commit(EVE_TYPES)
+    bump_version_on_commit(LIST_DATA)
+
+
+@receiver(post_save, sender=EveSolarSystem)
+@receiver(post_delete, sender=EveSolarSystem)
+def solar_system_changed(sender, **kwargs):
+    # system names are part of the structure list payloads
+    bump_version_on_commit(SOLAR_SYSTEMS)
+    bump_version_on_commit(LIST_DATA)
+
+
+@receiver(post_save, sender=EveStargate)
+@receiver(post_delete, sender=EveStargate)
+def stargate_changed(sender, **kwargs):
+    bump_version_on_commit(STARGATES)
@@ -1,13 +1,110 @@
+import io
+
 from celery import shared_task
 
+from django.db import transaction
+from django.db.models import F
+from django.utils.timezone import now
+
 from allianceauth.services.hooks import get_extension_logger
 
+from .app_settings import STRUCTUREINTEL_IMPORT_CHUNK_SIZE
+from .helper.delta import purge_tombstones
+from .helper.importer import (
+    READERS,
+    ImportRecord,
+    RecordError,
+    StructureImporter,
+    iter_batches,
+)
+from .models import ImportJob, ImportJobError
+
 logger = get_extension_logger(__name__)
 
-# Create your tasks here
+
+@shared_task
+def import_structures(job_id: int) -> None:
+    """Split an import job into chunks, which are imported in parallel"""
+    job = ImportJob.objects.get(pk=job_id)
+    reader = READERS[job.input_format]
+    chunks = []
+    errors = []
+    try:
+        for batch in iter_batches(
+            reader(io.StringIO(job.content)), STRUCTUREINTEL_IMPORT_CHUNK_SIZE
+        ):
+            errors += [error for _, error in batch if error]
+            chunk = [record._asdict() for record, _ in batch if record]
+            if chunk:
+                chunks.append(chunk)
+    except Exception:
+        ImportJob.objects.filter(pk=job_id).update(
+            status=ImportJob.Status.FAILED, finished_at=now()
+        )
+        raise
+
+    with transaction.atomic():
+        _store_errors(job_id, errors)
+        ImportJob.objects.filter(pk=job_id).update(
+            status=ImportJob.Status.RUNNING,
+            content="",
+            total_chunks=len(chunks),
+            failed_count=len(errors),
+        )
+    logger.info("Import %d: Importing %d chunks", job_id, len(chunks))
+    if not chunks:
+        _finish_job(job_id)
+        return
+    for chunk in chunks:
+        import_chunk.delay(job_id, chunk)
+
+
+@shared_task
+def import_chunk(job_id: int, records: list) -> None:
+    """Import a chunk of records and update the progress of its job"""
+    records = [ImportRecord(**record) for record in records]
+    try:
+        result = StructureImporter(batch_size=len(records)).import_batch(records)
+        created, errors = result.created, result.errors
+    except Exception:
+        logger.exception("Import %d: Failed to import chunk", job_id)
+        created = 0
+        errors = [
+            RecordError(record.line, "Import failed with an unexpected error")
+            for record in records
+        ]
+
+    with transaction.atomic():
+        _store_errors(job_id, errors)
+        ImportJob.objects.filter(pk=job_id).update(
+            finished_chunks=F("finished_chunks") + 1,
+            created_count=F("created_count") + created,
+            failed_count=F("failed_count") + len(errors),
+        )
+    _finish_job(job_id)
 
 
-# Example Task
 @shared_task
-def my_task():
-    pass
+def purge_deleted_structures() -> None:
+    """Delete expired tombstones of deleted structures"""
+    deleted = purge_tombstones()
+    if deleted:
+        logger.info("Purged %d tombstones of deleted structures", deleted)
+
+
+def _store_errors(job_id: int, errors: list) -> None:
+    ImportJobError.objects.bulk_create(
+        ImportJobError(job_id=job_id, line=error.line, message=error.message)
+        for error in errors
+    )
+
+
+def _finish_job(job_id: int) -> None:
+    """Mark a job as finished once all of its chunks are done"""
+    finished = ImportJob.objects.filter(
+        pk=job_id,
+        status=ImportJob.Status.RUNNING,
+        finished_chunks__gte=F("total_chunks"),
+    ).update(status=ImportJob.Status.FINISHED, finished_at=now())
+    if finished:
+        logger.info("Import %d: Finished", job_id)
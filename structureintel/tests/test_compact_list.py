@@ -0,0 +1,106 @@
+import json
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from .testdata import create_eveuniverse, create_structures, create_user
+
+MODULE_PATH = "structureintel.views"
+
+
+class TestCompactList(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_eveuniverse()
+        cls.user = create_user(permissions=["structureintel.delete_structure"])
+        cls.structures = create_structures(2)
+        create_structures(1, with_modules=False)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def get_list_data(self, **params):
+        response = self.client.get(
+            reverse("structureintel:structureintel_list_data"), params
+        )
+        self.assertEqual(response.status_code, 200)
+        return response
+
+    def test_should_return_rows_and_lookup_tables(self):
+        payload = self.get_list_data(format="compact").json()
+        structure = self.structures[0]
+        system = structure.eve_solar_system
+        self.assertEqual(len(payload["data"]), 3)
+        row = dict(zip(payload["columns"], payload["data"][0]))
+        self.assertDictEqual(
+            row,
+            {
+                "id": structure.id,
+                "system_id": system.id,
+                "type_id": 35832,
+                "name": "Structure 0",
+                "owner": "Test Corp",
+                "service_type_ids": [35892, 35894],
+                "power_mode": "FU",
+                "reinforce_hour": 0,
+            },
+        )
+        self.assertListEqual(
+            payload["systems"][str(system.id)],
+            [system.name, system.eve_constellation_id],
+        )
+        self.assertEqual(
+            payload["regions"][str(system.eve_constellation.eve_region_id)],
+            system.eve_constellation.eve_region.name,
+        )
+        self.assertDictEqual(
+            payload["types"],
+            {
+                "35832": "Astrahus",
+                "35892": "Standup Market Hub I",
+                "35894": "Standup Cloning Center I",
+            },
+        )
+        self.assertEqual(payload["power_modes"]["FU"], "Full Power")
+        self.assertTrue(payload["can_delete"])
+        self.assertListEqual(payload["data"][2][5], [])
+
+    def test_should_be_smaller_than_rendered_list(self):
+        compact = self.get_list_data(format="compact").content
+        rendered = self.get_list_data().content
+        self.assertLess(len(compact) * 2, len(rendered))
+
+    def test_should_cache_formats_separately(self):
+        self.get_list_data()
+        payload = self.get_list_data(format="compact").json()
+        self.assertIn("columns", payload)
+
+    def test_should_return_compact_page(self):
+        payload = self.get_list_data(
+            format="compact",
+            draw="1",
+            start="0",
+            length="2",
+            **{"columns[0][data]": "structure_name", "order[0][column]": "0"},
+        ).json()
+        self.assertEqual(payload["recordsTotal"], 3)
+        self.assertListEqual(
+            [row[3] for row in payload["data"]], ["Structure 0", "Structure 0"]
+        )
+        self.assertIn("filter_options", payload)
+        self.assertIn("systems", payload)
+
+    @patch(MODULE_PATH + ".STRUCTUREINTEL_LIST_STREAMING_CHUNK_SIZE", 2)
+    @patch(MODULE_PATH + ".STRUCTUREINTEL_LIST_STREAMING", True)
+    def test_should_stream_compact_list(self):
+        response = self.get_list_data(format="compact")
+        streamed = json.loads(b"".join(response.streaming_content))
+        with patch(MODULE_PATH + ".STRUCTUREINTEL_LIST_STREAMING", False):
+            cached = self.get_list_data(format="compact").json()
+        self.assertIn("cursor", streamed)
+        streamed.pop("cursor")
+        cached.pop("cursor")
+        self.assertEqual(streamed, cached)
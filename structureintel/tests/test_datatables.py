@@ -0,0 +1,148 @@
+from unittest.mock import patch
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.http import QueryDict
+from django.test import RequestFactory, TestCase
+
+from ..helper import datatables
+from ..helper.cache import LIST_DATA, bump_version
+from ..helper.datatables import DataTablesRequest, StructureDataTable
+from ..models import Structure
+from .testdata import create_eveuniverse, create_structure, create_user
+
+COLUMNS = ("location", "type", "structure_name", "power", "reinforcement")
+
+
+def params(**kwargs) -> QueryDict:
+    data = {"draw": "1", "start": "0", "length": "10"}
+    for idx, name in enumerate(COLUMNS):
+        data[f"columns[{idx}][data]"] = name
+    data["order[0][column]"] = "2"
+    data["order[0][dir]"] = "asc"
+    data.update(kwargs)
+    query = QueryDict(mutable=True)
+    query.update(data)
+    return query
+
+
+class TestDataTablesRequest(TestCase):
+    def test_should_parse_paging(self):
+        request = DataTablesRequest(params(draw="3", start="20", length="5"))
+        self.assertEqual(request.draw, 3)
+        self.assertEqual(request.start, 20)
+        self.assertEqual(request.length, 5)
+
+    @patch(datatables.__name__ + ".STRUCTUREINTEL_LIST_MAX_PAGE_LENGTH", 100)
+    def test_should_limit_page_length(self):
+        self.assertEqual(DataTablesRequest(params(length="-1")).length, 100)
+        self.assertEqual(DataTablesRequest(params(length="500")).length, 100)
+
+    def test_should_ignore_invalid_values(self):
+        request = DataTablesRequest(params(draw="x", start="-5", length="y"))
+        self.assertEqual(request.draw, 0)
+        self.assertEqual(request.start, 0)
+        self.assertEqual(request.length, 10)
+        request = DataTablesRequest(params(start="abc"))
+        self.assertEqual(request.start, 0)
+
+    def test_should_parse_order_and_column_searches(self):
+        request = DataTablesRequest(
+            params(
+                **{
+                    "order[0][column]": "4",
+                    "order[0][dir]": "desc",
+                    "order[1][column]": "99",
+                    "columns[3][search][value]": " Low Power ",
+                }
+            )
+        )
+        self.assertListEqual(request.order, [("reinforcement", True)])
+        self.assertDictEqual(request.column_filters(), {"power": "Low Power"})
+
+
+class TestStructureDataTable(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_eveuniverse()
+        cls.user = create_user()
+        for num, (owner, power_mode) in enumerate(
+            (
+                ("Alpha", Structure.PowerMode.FULL_POWER),
+                ("Beta", Structure.PowerMode.LOW_POWER),
+                ("Gamma", Structure.PowerMode.FULL_POWER),
+                ("Delta", Structure.PowerMode.ABANDONED),
+            )
+        ):
+            create_structure(
+                name=f"Structure {num}",
+                owner=owner,
+                power_mode=power_mode,
+                reinforce_hour=num,
+                eve_solar_system_id=30000001 + 10 * (num % 2),
+            )
+
+    def setUp(self):
+        cache.clear()
+        datatables.clear()
+        self.request = RequestFactory().get("/")
+        self.request.user = User.objects.get(pk=self.user.pk)
+
+    def page(self, **kwargs) -> dict:
+        return StructureDataTable(params(**kwargs)).to_dict(self.request)
+
+    def names(self, payload: dict) -> list:
+        return [row["structure_name"].split("<br>")[0] for row in payload["data"]]
+
+    def test_should_return_page(self):
+        payload = self.page(start="1", length="2")
+        self.assertListEqual(self.names(payload), ["Structure 1", "Structure 2"])
+        self.assertEqual(payload["recordsTotal"], 4)
+        self.assertEqual(payload["recordsFiltered"], 4)
+        self.assertEqual(payload["draw"], 1)
+
+    def test_should_return_all_rows_for_length_minus_one(self):
+        self.assertEqual(len(self.page(length="-1")["data"]), 4)
+
+    def test_should_return_empty_page_after_last_row(self):
+        payload = self.page(start="10")
+        self.assertListEqual(payload["data"], [])
+        self.assertEqual(payload["recordsFiltered"], 4)
+
+    def test_should_order_rows(self):
+        payload = self.page(**{"order[0][column]": "4", "order[0][dir]": "desc"})
+        self.assertListEqual(
+            self.names(payload),
+            ["Structure 3", "Structure 2", "Structure 1", "Structure 0"],
+        )
+        payload = self.page(**{"order[0][column]": "4", "order[0][dir]": "asc"})
+        self.assertEqual(self.names(payload)[0], "Structure 0")
+
+    def test_should_search_all_columns(self):
+        payload = self.page(**{"search[value]": "gamma"})
+        self.assertListEqual(self.names(payload), ["Structure 2"])
+        self.assertEqual(payload["recordsTotal"], 4)
+        self.assertEqual(payload["recordsFiltered"], 1)
+        payload = self.page(**{"search[value]": "Region 10000002"})
+        self.assertListEqual(self.names(payload), ["Structure 1", "Structure 3"])
+
+    def test_should_filter_by_power_label(self):
+        payload = self.page(**{"columns[3][search][value]": "Full Power"})
+        self.assertListEqual(self.names(payload), ["Structure 0", "Structure 2"])
+        self.assertEqual(payload["recordsFiltered"], 2)
+
+    def test_should_return_filter_options(self):
+        options = self.page()["filter_options"]
+        self.assertListEqual(options["power"], ["Abandoned", "Full Power", "Low Power"])
+        self.assertListEqual(options["type"], ["Astrahus"])
+        self.assertListEqual(
+            options["region_name"], ["Region 10000001", "Region 10000002"]
+        )
+
+    def test_should_compute_filter_options_once_per_version(self):
+        self.page()
+        with self.assertNumQueries(0):
+            StructureDataTable.filter_options()
+        create_structure(power_mode=Structure.PowerMode.UNKNOWN)
+        bump_version(LIST_DATA)
+        self.assertIn("Unknown", StructureDataTable.filter_options()["power"])
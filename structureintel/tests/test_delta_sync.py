@@ -0,0 +1,153 @@
+import json
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils.timezone import now
+
+from ..helper.delta import changes_since, make_cursor, parse_cursor, with_cursor
+from ..helper.fittings import refresh_module_summaries
+from ..models import DeletedStructure, Structure
+from ..tasks import purge_deleted_structures
+from .testdata import create_eveuniverse, create_structures, create_user
+
+MODULE_PATH = "structureintel.helper.delta"
+
+
+class TestCursor(TestCase):
+    def test_should_return_time_of_cursor(self):
+        moment = now()
+        self.assertEqual(parse_cursor(make_cursor(moment)), moment)
+
+    def test_should_reject_invalid_cursor(self):
+        for value in ("abc", "", "9" * 30):
+            with self.assertRaises(ValueError):
+                parse_cursor(value)
+
+
+@patch(MODULE_PATH + ".STRUCTUREINTEL_LIST_SYNC_OVERLAP", 0)
+class TestWithCursor(TestCase):
+    def test_should_add_cursor_as_first_member(self):
+        content = with_cursor('{"data": [1, 2]}', "123")
+        self.assertEqual(content, '{"cursor": "123", "data": [1, 2]}')
+        self.assertDictEqual(json.loads(content), {"cursor": "123", "data": [1, 2]})
+
+    def test_should_add_cursor_to_empty_object_and_whitespace(self):
+        self.assertEqual(json.loads(with_cursor("{}", "1")), {"cursor": "1"})
+        self.assertEqual(
+            json.loads(with_cursor(' \n{ "data": [] }\n', "1")),
+            {"cursor": "1", "data": []},
+        )
+
+    def test_should_reject_other_json_values(self):
+        for content in ("[]", '"text"', ""):
+            with self.assertRaises(ValueError):
+                with_cursor(content, "1")
+
+
+class TestChangesSince(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_eveuniverse()
+
+    def setUp(self):
+        self.structures = create_structures(3)
+        Structure.objects.update(last_updated_at=now() - timedelta(hours=1))
+        self.since = now() - timedelta(minutes=1)
+
+    def test_should_return_changed_and_deleted_structures(self):
+        changed = self.structures[1]
+        changed.name = "Changed"
+        changed.save()
+        deleted_id = self.structures[2].id
+        self.structures[2].delete()
+        changes = changes_since(self.since)
+        self.assertListEqual(
+            [structure.id for structure in changes.structures], [changed.id]
+        )
+        self.assertListEqual(changes.deleted_ids, [deleted_id])
+
+    def test_should_track_module_summary_refresh(self):
+        refresh_module_summaries([self.structures[0].id])
+        changes = changes_since(self.since)
+        self.assertListEqual(
+            [structure.id for structure in changes.structures],
+            [self.structures[0].id],
+        )
+
+    def test_should_include_overlap_before_cursor(self):
+        with patch(MODULE_PATH + ".STRUCTUREINTEL_LIST_SYNC_OVERLAP", 120):
+            changes = changes_since(now() - timedelta(minutes=59))
+        self.assertEqual(changes.structures.count(), 3)
+
+    @patch(MODULE_PATH + ".STRUCTUREINTEL_TOMBSTONE_MAX_AGE", 1)
+    def test_should_require_reload_when_tombstones_may_be_purged(self):
+        self.assertIsNone(changes_since(now() - timedelta(days=2)))
+
+
+class TestPurgeDeletedStructures(TestCase):
+    @patch(MODULE_PATH + ".STRUCTUREINTEL_TOMBSTONE_MAX_AGE", 7)
+    def test_should_delete_expired_tombstones(self):
+        DeletedStructure.objects.create(
+            structure_id=1, deleted_at=now() - timedelta(days=8)
+        )
+        DeletedStructure.objects.create(structure_id=2)
+        purge_deleted_structures()
+        self.assertListEqual(
+            list(DeletedStructure.objects.values_list("structure_id", flat=True)),
+            [2],
+        )
+
+
+@patch(MODULE_PATH + ".STRUCTUREINTEL_LIST_SYNC_OVERLAP", 0)
+class TestListDelta(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_eveuniverse()
+        cls.user = create_user()
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+        self.structures = create_structures(2)
+
+    def get_list_data(self, **params):
+        return self.client.get(
+            reverse("structureintel:structureintel_list_data"), params
+        )
+
+    def test_should_return_changes_since_cursor_of_list(self):
+        cursor = self.get_list_data(format="compact").json()["cursor"]
+        deleted_id = self.structures[0].id
+        self.structures[0].delete()
+        created = create_structures(1)[0]
+        payload = self.get_list_data(format="compact", since=cursor).json()
+        self.assertListEqual([row[0] for row in payload["data"]], [created.id])
+        self.assertListEqual(payload["deleted"], [deleted_id])
+        self.assertIn("systems", payload)
+        self.assertGreaterEqual(int(payload["cursor"]), int(cursor))
+
+    def test_should_give_cached_list_current_cursor(self):
+        first = self.get_list_data().json()["cursor"]
+        second = self.get_list_data().json()["cursor"]
+        self.assertGreater(int(second), int(first))
+
+    def test_should_return_rendered_changes(self):
+        cursor = make_cursor(now())
+        self.structures[1].save()
+        payload = self.get_list_data(since=cursor).json()
+        self.assertListEqual(
+            [row["id"] for row in payload["data"]], [self.structures[1].id]
+        )
+        self.assertListEqual(payload["deleted"], [])
+
+    @patch(MODULE_PATH + ".STRUCTUREINTEL_TOMBSTONE_MAX_AGE", 1)
+    def test_should_request_reload_for_expired_cursor(self):
+        cursor = make_cursor(now() - timedelta(days=2))
+        payload = self.get_list_data(since=cursor).json()
+        self.assertTrue(payload["reload"])
+
+    def test_should_reject_invalid_cursor(self):
+        self.assertEqual(self.get_list_data(since="abc").status_code, 400)
@@ -0,0 +1,121 @@
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..helper import slot_layout
+from ..helper.cache import fitting_version_name
+from ..helper.details import details_context
+from .testdata import (
+    create_eveuniverse,
+    create_structure,
+    create_structures,
+    create_user,
+)
+
+
+class TestDetailsContext(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_eveuniverse()
+
+    def setUp(self):
+        cache.clear()
+        slot_layout.warm()
+
+    def test_should_load_structure_with_modules_in_one_query(self):
+        structure = create_structures(1)[0]
+        # structure with modules, revisions
+        with self.assertNumQueries(2):
+            context = details_context(structure.id)
+        self.assertEqual(context["name"], "Structure 0")
+        self.assertEqual(context["system"], structure.eve_solar_system.name)
+        self.assertDictEqual(
+            context["structure"], {"name": "Astrahus", "eve_type_id": 35832}
+        )
+        self.assertListEqual(
+            context["assets"]["HiSlot"],
+            [
+                {"id": 35923, "name": "Standup Launcher"},
+                {"id": 35926, "name": "Standup Point Defense Battery I"},
+            ],
+        )
+        self.assertDictEqual(
+            context["assets_grouped"]["SerSlot1"],
+            {"eve_type_id": 35894, "eve_type": {"name": "Standup Cloning Center I"}},
+        )
+        self.assertNotIn("SerSlot2", context["assets_grouped"])
+
+    def test_should_return_structure_without_modules(self):
+        structure = create_structure()
+        context = details_context(structure.id)
+        self.assertEqual(context["name"], "Test Structure")
+        self.assertDictEqual(context["assets_grouped"], {})
+        self.assertListEqual(context["assets"]["LoSlot"], [])
+
+    def test_should_return_none_for_unknown_structure(self):
+        self.assertIsNone(details_context(1))
+
+
+class TestStructureDetailsView(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_eveuniverse()
+        cls.user = create_user()
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def details_url(self, structure_id: int) -> str:
+        return reverse("structureintel:structure_details", args=[structure_id])
+
+    def test_should_render_details_once(self):
+        structure = create_structures(1)[0]
+        response = self.client.get(self.details_url(structure.id))
+        self.assertContains(response, "Standup Market Hub I")
+        with patch(
+            "structureintel.views.details_context", wraps=details_context
+        ) as mock_details_context:
+            response = self.client.get(self.details_url(structure.id))
+        self.assertContains(response, "Standup Market Hub I")
+        self.assertFalse(mock_details_context.called)
+
+    def test_should_render_again_when_fitting_changes(self):
+        structure = create_structure()
+        response = self.client.get(self.details_url(structure.id))
+        self.assertNotContains(response, "Standup Launcher")
+        with self.captureOnCommitCallbacks(execute=True):
+            structure.fitting_id = create_structures(1)[0].fitting_id
+            structure.save()
+        response = self.client.get(self.details_url(structure.id))
+        self.assertContains(response, "Standup Launcher")
+
+    def test_should_drop_fitting_version_of_deleted_structure(self):
+        structure = create_structure()
+        self.client.get(self.details_url(structure.id))
+        version_key = f"structureintel:version:{fitting_version_name(structure.id)}"
+        self.assertIsNotNone(cache.get(version_key))
+        with self.captureOnCommitCallbacks(execute=True):
+            structure.delete()
+        self.assertIsNone(cache.get(version_key))
+
+    def test_should_return_404_for_unknown_structure(self):
+        response = self.client.get(self.details_url(1))
+        self.assertEqual(response.status_code, 404)
+
+    def test_should_show_slot_panels_without_dogma_queries(self):
+        structure = create_structure()
+        slot_layout.warm()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(
+                reverse("structureintel:structure_details", args=[structure.id])
+            )
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "/static/structureintel/img/pannel/3h.png")
+        self.assertFalse(
+            any("dogma" in query["sql"] for query in queries.captured_queries)
+        )
@@ -0,0 +1,139 @@
+from django.test import SimpleTestCase
+
+from ..helper.fitting_parser import (
+    FittingItem,
+    iter_fitting,
+    parse_eft_header,
+    parse_fitting,
+)
+from ..models import FittingModule
+
+HEADER_PASTE = """High Power Slots
+Standup Launcher
+Standup Point Defense Battery I
+Medium Power Slots
+Standup Warp Scrambler I
+
+Low Power Slots
+Standup Ballistic Control System I
+Rig Slots
+Standup M-Set Missile Projection I
+Service Slots
+Standup Market Hub I
+Standup Cloning Center I
+"""
+
+EFT_PASTE = """[Astrahus, Perimeter - Trade Hub]
+Standup Ballistic Control System I
+[Empty Low slot]
+
+Standup Warp Scrambler I
+Standup Stasis Webifier I
+
+Standup Launcher, Standup Heavy Missile
+Standup Point Defense Battery I
+
+Standup M-Set Missile Projection I
+
+Standup Market Hub I
+
+
+Standup Heavy Missile x1000
+"""
+
+
+class TestParseFitting(SimpleTestCase):
+    def test_slot_values_match_model(self):
+        slots = {item.slot for item in parse_fitting(HEADER_PASTE)}
+        self.assertSetEqual(slots, set(FittingModule.Slot.values))
+
+    def test_should_parse_section_headers(self):
+        self.assertListEqual(
+            parse_fitting(HEADER_PASTE),
+            [
+                FittingItem("Highslot", "Standup Launcher"),
+                FittingItem("Highslot", "Standup Point Defense Battery I"),
+                FittingItem("Midslot", "Standup Warp Scrambler I"),
+                FittingItem("Lowslot", "Standup Ballistic Control System I"),
+                FittingItem("Rigslot", "Standup M-Set Missile Projection I"),
+                FittingItem("Service", "Standup Market Hub I"),
+                FittingItem("Service", "Standup Cloning Center I"),
+            ],
+        )
+
+    def test_should_parse_windows_line_endings(self):
+        self.assertListEqual(
+            parse_fitting(HEADER_PASTE.replace("\n", "\r\n")),
+            parse_fitting(HEADER_PASTE),
+        )
+
+    def test_should_parse_missing_sections(self):
+        paste = "Low Power Slots\nStandup Ballistic Control System I\nService Slots\nStandup Market Hub I\n"
+        self.assertListEqual(
+            parse_fitting(paste),
+            [
+                FittingItem("Lowslot", "Standup Ballistic Control System I"),
+                FittingItem("Service", "Standup Market Hub I"),
+            ],
+        )
+
+    def test_should_not_mix_rigs_with_other_sections(self):
+        paste = "High Power Slots\nStandup Launcher\nRig Slots\nStandup M-Set Missile Projection I\n"
+        self.assertListEqual(
+            parse_fitting(paste),
+            [
+                FittingItem("Highslot", "Standup Launcher"),
+                FittingItem("Rigslot", "Standup M-Set Missile Projection I"),
+            ],
+        )
+
+    def test_should_parse_eft(self):
+        self.assertListEqual(
+            parse_fitting(EFT_PASTE),
+            [
+                FittingItem("Lowslot", "Standup Ballistic Control System I"),
+                FittingItem("Midslot", "Standup Warp Scrambler I"),
+                FittingItem("Midslot", "Standup Stasis Webifier I"),
+                FittingItem(
+                    "Highslot", "Standup Launcher", charge="Standup Heavy Missile"
+                ),
+                FittingItem("Highslot", "Standup Point Defense Battery I"),
+                FittingItem("Rigslot", "Standup M-Set Missile Projection I"),
+                FittingItem("Service", "Standup Market Hub I"),
+                FittingItem(None, "Standup Heavy Missile", quantity=1000),
+            ],
+        )
+
+    def test_should_count_eft_blocks_with_empty_slots_only(self):
+        paste = "[Raitaru, Factory]\n[Empty Low slot]\n\n[Empty Med slot]\n\nStandup Launcher\n"
+        self.assertListEqual(
+            parse_fitting(paste), [FittingItem("Highslot", "Standup Launcher")]
+        )
+
+    def test_should_parse_quantity(self):
+        items = parse_fitting("Charges\nStandup Heavy Missile x250\n")
+        self.assertListEqual(
+            items, [FittingItem(None, "Standup Heavy Missile", quantity=250)]
+        )
+
+    def test_should_return_nothing_for_empty_paste(self):
+        self.assertListEqual(parse_fitting(""), [])
+        self.assertListEqual(parse_fitting("\n\n  \n"), [])
+
+    def test_iter_fitting_is_lazy(self):
+        items = iter_fitting(HEADER_PASTE)
+        self.assertEqual(next(items), FittingItem("Highslot", "Standup Launcher"))
+
+
+class TestParseEftHeader(SimpleTestCase):
+    def test_should_return_type_and_name(self):
+        self.assertEqual(
+            parse_eft_header("[Astrahus, Perimeter - Trade Hub]"),
+            ("Astrahus", "Perimeter - Trade Hub"),
+        )
+
+    def test_should_ignore_empty_slots(self):
+        self.assertIsNone(parse_eft_header("[Empty High slot]"))
+
+    def test_should_ignore_modules(self):
+        self.assertIsNone(parse_eft_header("Standup Launcher"))
@@ -0,0 +1,109 @@
+from django.core.cache import cache
+from django.test import TestCase
+from eveuniverse.models import EveSolarSystem
+
+from ..forms import StructureForm
+from ..helper import type_index
+from ..models import Fitting, FittingModule, Structure
+from .testdata import FITTING, create_eveuniverse
+
+
+def form_data(**kwargs) -> dict:
+    data = {
+        "eve_solar_system_2": str(EveSolarSystem.objects.first().id),
+        "eve_structure_type_2": "35832",
+        "name": "Perimeter - Trade Hub",
+        "owner": "Test Corp",
+        "mode": Structure.PowerMode.FULL_POWER,
+        "reinforcement_hour": "18",
+        "fitting": FITTING,
+    }
+    data.update(kwargs)
+    return data
+
+
+class TestStructureForm(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_eveuniverse()
+
+    def setUp(self):
+        cache.clear()
+
+    def test_should_save_structure_with_modules(self):
+        form = StructureForm(data=form_data())
+        self.assertTrue(form.is_valid(), form.errors)
+        structure = form.save()
+        self.assertEqual(structure.reinforce_hour, 18)
+        self.assertListEqual(
+            list(
+                FittingModule.objects.filter(fitting_id=structure.fitting_id)
+                .order_by("id")
+                .values_list("slot", "eve_type__name")
+            ),
+            [
+                ("Highslot", "Standup Launcher"),
+                ("Highslot", "Standup Point Defense Battery I"),
+                ("Midslot", "Standup Warp Scrambler I"),
+                ("Lowslot", "Standup Ballistic Control System I"),
+                ("Rigslot", "Standup M-Set Missile Projection I"),
+                ("Service", "Standup Market Hub I"),
+                ("Service", "Standup Cloning Center I"),
+            ],
+        )
+        structure.refresh_from_db()
+        self.assertEqual(structure.highslot_count, 2)
+        self.assertEqual(structure.service_count, 2)
+        self.assertEqual(structure.service_type_ids, ",35892,35894,")
+        self.assertEqual(
+            structure.service_names, "Standup Market Hub I\nStandup Cloning Center I"
+        )
+
+    def test_should_report_all_unknown_modules(self):
+        fitting = FITTING + "Standup Unknown Thing\nStandup Another Thing\n"
+        form = StructureForm(data=form_data(fitting=fitting))
+        self.assertFalse(form.is_valid())
+        self.assertIn(
+            "Standup Another Thing, Standup Unknown Thing", form.errors["fitting"][0]
+        )
+        self.assertFalse(Structure.objects.exists())
+
+    def test_should_store_fitting_with_constant_queries(self):
+        fitting = FITTING + "Standup Launcher\n" * 20
+        form = StructureForm(data=form_data(fitting=fitting))
+        type_index.get_type("Astrahus")
+        with self.assertNumQueries(18):
+            # solar system, structure type, savepoint, fitting lookup,
+            # savepoint, fitting, fitting ID, modules, release savepoint,
+            # structure, locations, rollups (2), revision, release savepoint
+            self.assertTrue(form.is_valid(), form.errors)
+            form.save()
+        self.assertEqual(FittingModule.objects.count(), 8)
+        launchers = FittingModule.objects.get(
+            eve_type_id=35923, slot=FittingModule.Slot.SERVICE
+        )
+        self.assertEqual(launchers.quantity, 20)
+
+    def test_should_share_fitting_of_same_modules(self):
+        form = StructureForm(data=form_data())
+        self.assertTrue(form.is_valid(), form.errors)
+        first = form.save()
+        reordered = FITTING.replace(
+            "Standup Launcher\nStandup Point Defense Battery I",
+            "Standup Point Defense Battery I\nStandup Launcher",
+        )
+        form = StructureForm(data=form_data(fitting=reordered, name="Other"))
+        self.assertTrue(form.is_valid(), form.errors)
+        with self.assertNumQueries(11):
+            # savepoint, fitting lookup, structure, locations, rollups (2),
+            # revision, release savepoint
+            second = form.save()
+        self.assertEqual(second.fitting_id, first.fitting_id)
+        self.assertEqual(Fitting.objects.count(), 1)
+
+    def test_should_save_structure_without_modules(self):
+        form = StructureForm(data=form_data(fitting="High Power Slots\n"))
+        self.assertTrue(form.is_valid(), form.errors)
+        structure = form.save()
+        self.assertIsNone(structure.fitting_id)
+        self.assertEqual(structure.service_names, "")
@@ -0,0 +1,134 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils.timezone import now
+
+from ..helper import slot_layout
+from ..helper.history import ModuleChange, revision_as_of, timeline
+from ..models import FittingModule, FittingRevision, Structure
+from .test_forms import form_data
+from .testdata import FITTING, create_eveuniverse, create_structures, create_user
+
+REFIT = FITTING.replace("Standup Market Hub I\n", "Standup Launcher\n")
+
+
+class TestFittingHistory(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_eveuniverse()
+        cls.user = create_user()
+
+    def setUp(self):
+        cache.clear()
+        slot_layout.warm()
+        self.client.force_login(self.user)
+
+    def add_structure(self) -> Structure:
+        response = self.client.post(
+            reverse("structureintel:add_structure"), form_data()
+        )
+        self.assertEqual(response.status_code, 302)
+        return Structure.objects.get()
+
+    def update_structure(self, structure: Structure, fitting: str):
+        response = self.client.post(
+            reverse("structureintel:update", args=[structure.id]),
+            form_data(fitting=fitting),
+        )
+        self.assertEqual(response.status_code, 302)
+
+    def test_should_record_first_fitting_with_submitter(self):
+        structure = self.add_structure()
+        revision = FittingRevision.objects.get()
+        self.assertEqual(revision.structure, structure)
+        self.assertEqual(revision.fitting_id, structure.fitting_id)
+        self.assertEqual(revision.submitted_by, self.user)
+
+    def test_should_not_record_unchanged_fitting(self):
+        structure = self.add_structure()
+        self.update_structure(structure, FITTING)
+        self.assertEqual(FittingRevision.objects.count(), 1)
+
+    def test_should_record_changed_fitting(self):
+        structure = self.add_structure()
+        self.update_structure(structure, REFIT)
+        structure.refresh_from_db()
+        self.assertListEqual(
+            list(
+                FittingRevision.objects.order_by("id").values_list(
+                    "fitting_id", flat=True
+                )
+            ),
+            [FittingRevision.objects.first().fitting_id, structure.fitting_id],
+        )
+        self.assertIn("Standup Launcher", structure.service_names)
+
+    def test_should_record_previous_fitting_of_structure_without_history(self):
+        structure = create_structures(1)[0]
+        self.update_structure(structure, REFIT)
+        first, second = FittingRevision.objects.order_by("created_at")
+        self.assertEqual(first.fitting_id, structure.fitting_id)
+        self.assertIsNone(first.submitted_by)
+        self.assertEqual(second.submitted_by, self.user)
+
+    def test_should_show_current_fitting_in_update_form(self):
+        structure = self.add_structure()
+        response = self.client.get(
+            reverse("structureintel:update", args=[structure.id])
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(
+            response.context["form"].initial["fitting"].split(), FITTING.split()
+        )
+
+    def test_should_return_revision_as_of_time(self):
+        structure = self.add_structure()
+        self.update_structure(structure, REFIT)
+        first, second = FittingRevision.objects.order_by("id")
+        FittingRevision.objects.filter(id=first.id).update(
+            created_at=now() - timedelta(days=2)
+        )
+        with self.assertNumQueries(1):
+            revision = revision_as_of(structure.id, now() - timedelta(days=1))
+        self.assertEqual(revision, first)
+        self.assertEqual(revision_as_of(structure.id, now()), second)
+        self.assertIsNone(revision_as_of(structure.id, now() - timedelta(days=3)))
+
+    def test_should_list_changes_newest_first(self):
+        structure = self.add_structure()
+        self.update_structure(structure, REFIT)
+        with self.assertNumQueries(2):
+            entries = timeline(structure.id)
+        self.assertListEqual(
+            entries[0]["changes"],
+            [
+                ModuleChange(
+                    FittingModule.Slot.SERVICE, 35892, "Standup Market Hub I", -1
+                ),
+                ModuleChange(FittingModule.Slot.SERVICE, 35923, "Standup Launcher", 1),
+            ],
+        )
+        self.assertEqual(len(entries[1]["changes"]), 7)
+        self.assertEqual(entries[1]["submitted_by"], self.user.username)
+
+    def test_should_render_fitting_as_of_time(self):
+        structure = self.add_structure()
+        created_at = FittingRevision.objects.get().created_at
+        self.update_structure(structure, REFIT)
+        url = reverse("structureintel:structure_details", args=[structure.id])
+        response = self.client.get(url, {"as_of": created_at.isoformat()})
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, "Standup Market Hub I")
+        self.assertContains(response, "History")
+        response = self.client.get(url)
+        self.assertNotContains(response, 'title="Standup Market Hub I"')
+
+    def test_should_reject_invalid_time(self):
+        structure = self.add_structure()
+        response = self.client.get(
+            reverse("structureintel:structure_details", args=[structure.id]),
+            {"as_of": "yesterday"},
+        )
+        self.assertEqual(response.status_code, 400)
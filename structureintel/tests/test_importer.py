@@ -0,0 +1,195 @@
+import json
+import tempfile
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from ..helper import type_index
+from ..helper.importer import (
+    StructureImporter,
+    iter_eft_records,
+    iter_jsonl_records,
+    make_record,
+)
+from ..models import Fitting, FittingModule, Structure
+from .testdata import FITTING, create_eveuniverse, create_user
+
+EFT_FITS = """# system: System 10000001-0
+# owner: Test Corp
+# power: Low Power
+# reinforce_hour: 21
+[Astrahus, Perimeter - Trade Hub]
+Standup Ballistic Control System I
+
+Standup Warp Scrambler I
+
+Standup Launcher, Standup Heavy Missile
+
+# system: 30000012
+# reinforce_hour: 3
+[Fortizar, Keepstar Staging]
+[Empty Low slot]
+
+[Empty Med slot]
+
+[Empty High slot]
+
+[Empty Rig slot]
+
+Standup Market Hub I
+"""
+
+
+def jsonl(*records) -> str:
+    return "\n".join(json.dumps(record) for record in records) + "\n"
+
+
+def record(**kwargs) -> dict:
+    data = {
+        "system": "System 10000001-1",
+        "type": "Astrahus",
+        "name": "Imported Structure",
+        "owner": "Test Corp",
+        "power_mode": "Full Power",
+        "reinforce_hour": 18,
+        "fitting": FITTING,
+    }
+    data.update(kwargs)
+    return data
+
+
+class TestReaders(TestCase):
+    def test_should_read_jsonl_lazily(self):
+        records = iter_jsonl_records(StringIO(jsonl(record(), record())))
+        first, error = next(records)
+        self.assertIsNone(error)
+        self.assertEqual(first.line, 1)
+        self.assertEqual(first.structure_type, "Astrahus")
+        self.assertEqual(first.reinforce_hour, "18")
+
+    def test_should_report_invalid_json(self):
+        records = list(iter_jsonl_records(["{invalid\n", "\n", "[1]\n"]))
+        self.assertListEqual(
+            [(error.line, error.message[:12]) for _, error in records],
+            [(1, "Invalid JSON"), (3, "Record is no")],
+        )
+
+    def test_should_read_multi_fit_eft(self):
+        records = [record for record, _ in iter_eft_records(StringIO(EFT_FITS))]
+        self.assertEqual(len(records), 2)
+        self.assertEqual(records[0].line, 5)
+        self.assertEqual(records[0].name, "Perimeter - Trade Hub")
+        self.assertEqual(records[0].power_mode, "Low Power")
+        self.assertEqual(records[1].structure_type, "Fortizar")
+        self.assertEqual(records[1].system, "30000012")
+        self.assertEqual(records[1].owner, "")
+
+
+class TestStructureImporter(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_eveuniverse()
+
+    def setUp(self):
+        cache.clear()
+
+    def test_should_import_batch(self):
+        records = [make_record(num, record(name=f"S{num}")) for num in range(3)]
+        result = StructureImporter().import_batch(records)
+        self.assertEqual(result.created, 3)
+        self.assertListEqual(result.errors, [])
+        self.assertEqual(Fitting.objects.count(), 1)
+        self.assertEqual(FittingModule.objects.count(), 7)
+        self.assertListEqual(
+            list(Structure.objects.values_list("service_count", flat=True)), [2] * 3
+        )
+
+    def test_should_resolve_batch_with_constant_queries(self):
+        records = [make_record(num, record(name=f"S{num}")) for num in range(10)]
+        type_index.get_type("Astrahus")
+        # systems, savepoint, fitting lookup, savepoint, fitting, fitting ID,
+        # modules, release savepoint, structures, locations, rollups (2),
+        # regions, hour counts (2), release savepoint
+        with self.assertNumQueries(16):
+            StructureImporter().import_batch(records)
+
+    def test_should_report_errors_per_record(self):
+        records = [
+            make_record(1, record(system="Jita")),
+            make_record(2, record(fitting="Service Slots\nUnknown Module\n")),
+            make_record(3, record(reinforce_hour=24)),
+            make_record(4, record(power_mode="Half Power")),
+            make_record(5, record(reinforce_hour="")),
+            make_record(6, record()),
+        ]
+        result = StructureImporter().import_batch(records)
+        self.assertEqual(result.created, 1)
+        self.assertListEqual(
+            [(error.line, error.message) for error in result.errors],
+            [
+                (1, "Unknown solar system: 'Jita'"),
+                (2, "Unknown modules: Unknown Module"),
+                (3, "Invalid reinforcement hour: '24'"),
+                (4, "Unknown power mode: 'Half Power'"),
+                (5, "Missing reinforcement hour"),
+            ],
+        )
+
+
+class TestImportCommand(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_eveuniverse()
+
+    def setUp(self):
+        cache.clear()
+
+    def call_command(self, content: str, suffix: str, *args) -> str:
+        with tempfile.NamedTemporaryFile("w", suffix=suffix) as file:
+            file.write(content)
+            file.flush()
+            out = StringIO()
+            call_command(
+                "structureintel_import", file.name, *args, stdout=out, stderr=out
+            )
+        return out.getvalue()
+
+    def test_should_import_jsonl_in_batches(self):
+        content = jsonl(*[record(name=f"S{num}") for num in range(5)], {"name": "x"})
+        output = self.call_command(content, ".jsonl", "--batch-size", "2")
+        self.assertEqual(Structure.objects.count(), 5)
+        self.assertIn("Line 6: Unknown solar system: ''", output)
+        self.assertIn("Imported 5 structures", output)
+        self.assertIn("1 records failed", output)
+
+    def test_should_import_eft(self):
+        output = self.call_command(EFT_FITS, ".txt")
+        self.assertIn("Imported 2 structures", output)
+        fortizar = Structure.objects.get(name="Keepstar Staging")
+        self.assertEqual(fortizar.eve_solar_system_id, 30000012)
+        self.assertEqual(fortizar.power_mode, Structure.PowerMode.UNKNOWN)
+        self.assertListEqual(
+            list(fortizar.fitting.modules.values_list("slot", "eve_type__name")),
+            [("Service", "Standup Market Hub I")],
+        )
+        astrahus = Structure.objects.get(name="Perimeter - Trade Hub")
+        self.assertEqual(astrahus.reinforce_hour, 21)
+        self.assertEqual(astrahus.fitting.modules.count(), 3)
+
+    def test_should_reject_eft_without_reinforce_hour(self):
+        output = self.call_command(
+            "# system: System 10000001-0\n[Astrahus, No Hour]\nStandup Market Hub I\n",
+            ".txt",
+        )
+        self.assertIn("Line 2: Missing reinforcement hour", output)
+        self.assertFalse(Structure.objects.filter(name="No Hour").exists())
+        user = create_user()
+        self.client.force_login(user)
+        for params in ({}, {"format": "compact"}):
+            response = self.client.get(
+                reverse("structureintel:structureintel_list_data"), params
+            )
+            self.assertEqual(response.status_code, 200)
@@ -0,0 +1,84 @@
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from ..helper import instrumentation
+from .testdata import create_eveuniverse, create_structures, create_user
+
+MODULE_PATH = "structureintel.helper.instrumentation"
+
+
+class TestPercentile(TestCase):
+    def test_should_use_nearest_rank(self):
+        values = [float(value) for value in range(1, 101)]
+        self.assertEqual(instrumentation.percentile(values, 50), 50)
+        self.assertEqual(instrumentation.percentile(values, 99), 99)
+        self.assertEqual(instrumentation.percentile([3.0], 90), 3)
+        self.assertIsNone(instrumentation.percentile([], 50))
+
+
+@patch(MODULE_PATH + ".STRUCTUREINTEL_INSTRUMENTATION", True)
+class TestInstrumentation(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_eveuniverse()
+        create_structures(3)
+        cls.user = create_user()
+
+    def setUp(self):
+        cache.clear()
+        instrumentation.reset()
+        self.client.force_login(self.user)
+
+    def test_should_record_metrics_of_views(self):
+        url = reverse("structureintel:structureintel_list_data")
+        self.client.get(url)
+        self.client.get(url)
+        stats = instrumentation.stats_summary()["list_data"]
+        self.assertEqual(stats["count"], 2)
+        self.assertEqual(stats["window"], 2)
+        self.assertEqual(stats["cache_hit_ratio"], 0.5)
+        self.assertGreater(stats["sql_count_mean"], 0)
+        self.assertGreater(stats["wall_ms"]["max"], 0)
+
+    @patch(MODULE_PATH + ".STRUCTUREINTEL_SLOW_REQUEST_MS", 0)
+    @patch(MODULE_PATH + ".logger")
+    def test_should_log_slow_requests(self, mock_logger):
+        self.client.get(reverse("structureintel:solar_system"), {"term": "System"})
+        self.assertTrue(mock_logger.warning.called)
+        args = mock_logger.warning.call_args[0]
+        self.assertEqual(args[1:3], ("Slow request ", "solar_system"))
+        self.assertEqual(
+            instrumentation.stats_summary()["solar_system"]["slow_count"], 1
+        )
+
+    def test_should_record_class_based_views(self):
+        self.client.get(reverse("structureintel:add_structure"))
+        self.assertIn("create_structure", instrumentation.stats_summary())
+
+
+class TestStatsView(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = create_user()
+
+    def setUp(self):
+        instrumentation.reset()
+
+    def test_should_record_nothing_when_disabled(self):
+        self.client.force_login(self.user)
+        self.client.get(reverse("structureintel:index"))
+        self.assertDictEqual(instrumentation.stats_summary(), {})
+
+    def test_should_return_stats_to_staff_only(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse("structureintel:stats"))
+        self.assertEqual(response.status_code, 302)
+
+        self.user.is_staff = True
+        self.user.save()
+        response = self.client.get(reverse("structureintel:stats"))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("views", response.json())
@@ -0,0 +1,155 @@
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.db import transaction
+from django.http import QueryDict
+from django.test import TestCase
+from django.urls import reverse
+from eveuniverse.models import EveSolarSystem, EveType
+
+from ..helper.cache import (
+    EVE_TYPES,
+    LIST_DATA,
+    SOLAR_SYSTEMS,
+    bump_version,
+    get_version,
+    list_data_key,
+)
+from ..models import Structure
+from .testdata import create_eveuniverse, create_structure, create_user
+
+MODULE_PATH = "structureintel.views"
+
+
+class TestListDataKey(TestCase):
+    def test_should_key_payloads_by_permission_and_format(self):
+        keys = {
+            list_data_key("v1", False),
+            list_data_key("v1", True),
+            list_data_key("v1", False, compact=True),
+            list_data_key("v2", False),
+        }
+        self.assertEqual(len(keys), 4)
+
+    def test_should_ignore_parameters_changing_with_every_request(self):
+        first = QueryDict("draw=1&_=123&start=0&profile=1")
+        second = QueryDict("start=0&draw=7&_=456")
+        self.assertEqual(
+            list_data_key("v1", False, first), list_data_key("v1", False, second)
+        )
+        self.assertNotEqual(
+            list_data_key("v1", False, first),
+            list_data_key("v1", False, QueryDict("draw=1&start=10")),
+        )
+
+
+class TestVersionBumps(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_eveuniverse()
+
+    def setUp(self):
+        cache.clear()
+
+    def assert_bumps(self, names, change):
+        versions = [get_version(name) for name in names]
+        with self.captureOnCommitCallbacks(execute=True):
+            change()
+        for name, version in zip(names, versions):
+            self.assertNotEqual(get_version(name), version, name)
+
+    def test_should_bump_on_structure_changes(self):
+        structure = create_structure()
+
+        def update():
+            structure.owner = "Other Corp"
+            structure.save()
+
+        self.assert_bumps([LIST_DATA], create_structure)
+        self.assert_bumps([LIST_DATA], update)
+        self.assert_bumps([LIST_DATA], structure.delete)
+
+    def test_should_bump_on_eve_type_and_solar_system_changes(self):
+        def rename_type():
+            EveType.objects.filter(id=35832).update(name="Astrahus II")
+            eve_type = EveType.objects.get(id=35832)
+            eve_type.save()
+
+        def rename_system():
+            system = EveSolarSystem.objects.get(id=30000001)
+            system.name = "Renamed"
+            system.save()
+
+        self.assert_bumps([EVE_TYPES, LIST_DATA], rename_type)
+        self.assert_bumps([SOLAR_SYSTEMS, LIST_DATA], rename_system)
+
+    def test_should_bump_only_on_commit(self):
+        version = get_version(LIST_DATA)
+        with self.captureOnCommitCallbacks() as callbacks:
+            create_structure()
+            self.assertEqual(get_version(LIST_DATA), version)
+        self.assertTrue(callbacks)
+
+    def test_should_not_bump_on_rollback(self):
+        version = get_version(LIST_DATA)
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            try:
+                with transaction.atomic():
+                    create_structure()
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        self.assertListEqual(callbacks, [])
+        self.assertEqual(get_version(LIST_DATA), version)
+
+
+@patch(MODULE_PATH + ".STRUCTUREINTEL_LIST_STREAMING", False)
+class TestListDataCache(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_eveuniverse()
+        cls.user = create_user()
+        cls.admin = create_user(
+            "Alfred", permissions=["structureintel.delete_structure"]
+        )
+        create_structure()
+
+    def setUp(self):
+        cache.clear()
+
+    def get_list_data(self, user, **kwargs):
+        self.client.force_login(user)
+        return self.client.get(
+            reverse("structureintel:structureintel_list_data"), **kwargs
+        )
+
+    def test_should_cache_payload_per_permission(self):
+        self.assertNotIn("btn-danger", self.get_list_data(self.user).content.decode())
+        self.assertIn("btn-danger", self.get_list_data(self.admin).content.decode())
+        self.assertNotIn("btn-danger", self.get_list_data(self.user).content.decode())
+
+    def test_should_serve_cached_payload_until_version_changes(self):
+        self.get_list_data(self.user)
+        # changes without signals do not invalidate the cached payload
+        Structure.objects.update(name="Renamed")
+        self.assertNotIn("Renamed", self.get_list_data(self.user).content.decode())
+        with self.captureOnCommitCallbacks(execute=True):
+            create_structure(name="Added")
+        self.assertEqual(len(self.get_list_data(self.user).json()["data"]), 2)
+
+    def test_should_answer_matching_etag_with_not_modified(self):
+        response = self.get_list_data(self.user)
+        self.assertEqual(response.status_code, 200)
+        etag = response["ETag"]
+        response = self.get_list_data(self.user, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b"")
+        bump_version(LIST_DATA)
+        response = self.get_list_data(self.user, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_should_use_different_etags_per_permission(self):
+        self.assertNotEqual(
+            self.get_list_data(self.user)["ETag"],
+            self.get_list_data(self.admin)["ETag"],
+        )
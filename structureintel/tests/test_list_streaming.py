@@ -0,0 +1,83 @@
+import json
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from .testdata import create_eveuniverse, create_structures, create_user
+
+MODULE_PATH = "structureintel.views"
+
+
+@patch(MODULE_PATH + ".STRUCTUREINTEL_LIST_STREAMING_CHUNK_SIZE", 2)
+@patch(MODULE_PATH + ".STRUCTUREINTEL_LIST_STREAMING", True)
+class TestListStreaming(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_eveuniverse()
+        cls.user = create_user()
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def get_list_data(self, **kwargs):
+        return self.client.get(
+            reverse("structureintel:structureintel_list_data"), **kwargs
+        )
+
+    def test_should_stream_structures_in_chunks(self):
+        create_structures(5)
+        response = self.get_list_data()
+        self.assertTrue(response.streaming)
+        chunks = [chunk.decode() for chunk in response.streaming_content]
+        # opening, three chunks of at most two structures, closing
+        self.assertEqual(len(chunks), 5)
+        data = json.loads("".join(chunks))["data"]
+        self.assertListEqual(
+            [row["structure_name"] for row in data],
+            [f"Structure {num}<br>Test Corp" for num in range(5)],
+        )
+
+    def test_should_fetch_one_page_per_chunk(self):
+        create_structures(5)
+        for params in ({}, {"format": "compact"}):
+            response = self.client.get(
+                reverse("structureintel:structureintel_list_data"), params
+            )
+            with CaptureQueriesContext(connection) as context:
+                payload = json.loads(b"".join(response.streaming_content))
+            self.assertEqual(len(payload["data"]), 5)
+            pages = [
+                query["sql"]
+                for query in context.captured_queries
+                if "LIMIT 2" in query["sql"]
+            ]
+            self.assertEqual(len(pages), 3)
+            self.assertNotIn('"id" >', pages[0])
+            self.assertIn('"id" >', pages[1])
+
+    def test_should_stream_same_rows_as_cached_list(self):
+        create_structures(3)
+        response = self.get_list_data()
+        streamed = json.loads(b"".join(response.streaming_content))
+        with patch(MODULE_PATH + ".STRUCTUREINTEL_LIST_STREAMING", False):
+            cached = self.get_list_data().json()
+        self.assertIn("cursor", streamed)
+        streamed.pop("cursor")
+        cached.pop("cursor")
+        self.assertEqual(streamed, cached)
+
+    def test_should_stream_empty_list(self):
+        response = self.get_list_data()
+        payload = json.loads(b"".join(response.streaming_content))
+        self.assertEqual(payload["data"], [])
+
+    def test_should_revalidate_streamed_list(self):
+        create_structures(1)
+        etag = self.get_list_data()["ETag"]
+        response = self.get_list_data(HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
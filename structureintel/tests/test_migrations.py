@@ -0,0 +1,178 @@
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
+from django.test import TransactionTestCase
+
+from .testdata import create_eveuniverse
+
+
+class MigrationTestCase(TransactionTestCase):
+    def migrate(self, targets):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(targets)
+        return executor.loader.project_state(targets).apps
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+
+class TestModuleSummaryBackfill(MigrationTestCase):
+    """Module fields of structures created before they existed"""
+
+    before = [("structureintel", "0003_general_profile_requests")]
+    after = [("structureintel", "0006_shared_fittings")]
+
+    def test_should_fill_module_fields_of_existing_structures(self):
+        create_eveuniverse()
+        apps = self.migrate(self.before)
+        Structure = apps.get_model("structureintel", "Structure")
+        StructureModule = apps.get_model("structureintel", "StructureModule")
+        fitted = Structure.objects.create(
+            eve_solar_system_id=30000001,
+            eve_type_id=35832,
+            name="Fitted",
+            owner="Test Corp",
+            power_mode="FU",
+        )
+        empty = Structure.objects.create(
+            eve_solar_system_id=30000001,
+            eve_type_id=35832,
+            name="Empty",
+            owner="Test Corp",
+            power_mode="FU",
+        )
+        for slot, type_id in (
+            ("Highslot", 35923),
+            ("Highslot", 35923),
+            ("Service", 35894),
+            ("Service", 35892),
+        ):
+            StructureModule.objects.create(
+                structure=fitted, slot=slot, eve_type_id=type_id
+            )
+
+        apps = self.migrate(self.after)
+        Structure = apps.get_model("structureintel", "Structure")
+        fitted = Structure.objects.get(id=fitted.id)
+        self.assertEqual(fitted.highslot_count, 2)
+        self.assertEqual(fitted.service_count, 2)
+        # services in the canonical order of the shared fitting
+        self.assertEqual(fitted.service_type_ids, ",35892,35894,")
+        self.assertEqual(
+            fitted.service_names, "Standup Market Hub I\nStandup Cloning Center I"
+        )
+        empty = Structure.objects.get(id=empty.id)
+        self.assertEqual(empty.service_type_ids, "")
+        self.assertEqual(empty.highslot_count, 0)
+
+    def test_should_fill_module_fields_before_moving_modules(self):
+        create_eveuniverse()
+        apps = self.migrate(self.before)
+        Structure = apps.get_model("structureintel", "Structure")
+        StructureModule = apps.get_model("structureintel", "StructureModule")
+        structure = Structure.objects.create(
+            eve_solar_system_id=30000001,
+            eve_type_id=35832,
+            name="Fitted",
+            owner="Test Corp",
+            power_mode="FU",
+        )
+        StructureModule.objects.create(
+            structure=structure, slot="Service", eve_type_id=35892
+        )
+        apps = self.migrate([("structureintel", "0004_structure_module_summary")])
+        structure = apps.get_model("structureintel", "Structure").objects.get()
+        self.assertEqual(structure.service_count, 1)
+        self.assertEqual(structure.service_type_ids, ",35892,")
+        self.assertEqual(structure.service_names, "Standup Market Hub I")
+
+
+class TestRollupBackfill(MigrationTestCase):
+    """Rollups of structures created before they were stored"""
+
+    def test_should_count_existing_structures(self):
+        create_eveuniverse()
+        apps = self.migrate([("structureintel", "0008_reinforce_hour_indexes")])
+        Fitting = apps.get_model("structureintel", "Fitting")
+        FittingModule = apps.get_model("structureintel", "FittingModule")
+        Structure = apps.get_model("structureintel", "Structure")
+        fitting = Fitting.objects.create(hash="a" * 64)
+        for slot, type_id in (("Highslot", 35923), ("Service", 35892)):
+            FittingModule.objects.create(
+                fitting=fitting, slot=slot, eve_type_id=type_id
+            )
+        for system_id, owner in ((30000001, "Alpha"), (30000011, "Alpha")):
+            Structure.objects.create(
+                eve_solar_system_id=system_id,
+                eve_type_id=35832,
+                name="Structure",
+                owner=owner,
+                power_mode="FU",
+                fitting=fitting,
+            )
+
+        apps = self.migrate([("structureintel", "0009_structure_rollups")])
+        StructureRollup = apps.get_model("structureintel", "StructureRollup")
+        counts = {
+            (dimension, key): count
+            for dimension, key, count in StructureRollup.objects.values_list(
+                "dimension", "key", "count"
+            )
+        }
+        self.assertDictEqual(
+            counts,
+            {
+                ("region", "10000001"): 1,
+                ("region", "10000002"): 1,
+                ("constellation", "20000001"): 1,
+                ("constellation", "20000002"): 1,
+                ("owner", "Alpha"): 2,
+                ("type", "35832"): 2,
+                ("power_mode", "FU"): 2,
+                ("service", "35892"): 2,
+            },
+        )
+
+
+class TestReinforceHourCountBackfill(MigrationTestCase):
+    """Hour counts of structures created before they were stored"""
+
+    def test_should_count_existing_structures(self):
+        create_eveuniverse()
+        apps = self.migrate([("structureintel", "0009_structure_rollups")])
+        Structure = apps.get_model("structureintel", "Structure")
+        for hour, system_id, owner in (
+            (11, 30000001, "Alpha"),
+            (11, 30000011, "Beta"),
+            (None, 30000001, "Alpha"),
+        ):
+            Structure.objects.create(
+                eve_solar_system_id=system_id,
+                eve_type_id=35832,
+                name="Structure",
+                owner=owner,
+                power_mode="FU",
+                reinforce_hour=hour,
+            )
+
+        apps = self.migrate([("structureintel", "0010_reinforce_hour_counts")])
+        ReinforceHourCount = apps.get_model("structureintel", "ReinforceHourCount")
+        counts = {
+            (scope, key, hour): count
+            for scope, key, hour, count in ReinforceHourCount.objects.values_list(
+                "scope", "key", "hour", "count"
+            )
+        }
+        self.assertDictEqual(
+            counts,
+            {
+                ("total", "", 11): 2,
+                ("region", "10000001", 11): 1,
+                ("region", "10000002", 11): 1,
+                ("system", "30000001", 11): 1,
+                ("system", "30000011", 11): 1,
+                ("owner", "Alpha", 11): 1,
+                ("owner", "Beta", 11): 1,
+            },
+        )
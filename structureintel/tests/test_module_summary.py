@@ -0,0 +1,132 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..helper.fittings import module_summary
+from ..models import Fitting, FittingModule, Structure
+from .testdata import create_eveuniverse, create_structures, create_user
+
+
+class TestModuleSummary(TestCase):
+    def test_should_count_modules_and_collect_services(self):
+        summary = module_summary(
+            [
+                (FittingModule.Slot.HIGHSLOT, 35923, "Standup Launcher", 2),
+                (FittingModule.Slot.SERVICE, 35892, "Standup Market Hub I", 1),
+                (FittingModule.Slot.SERVICE, 35894, "Standup Cloning Center I", 1),
+            ]
+        )
+        self.assertDictEqual(
+            summary,
+            {
+                "highslot_count": 2,
+                "midslot_count": 0,
+                "lowslot_count": 0,
+                "rigslot_count": 0,
+                "service_count": 2,
+                "service_type_ids": ",35892,35894,",
+                "service_names": "Standup Market Hub I\nStandup Cloning Center I",
+            },
+        )
+
+    def test_should_return_empty_summary(self):
+        summary = module_summary([])
+        self.assertEqual(summary["service_type_ids"], "")
+        self.assertEqual(summary["service_names"], "")
+        self.assertEqual(summary["highslot_count"], 0)
+
+
+class TestRefreshModuleSummaries(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_eveuniverse()
+
+    def test_should_backfill_all_structures(self):
+        create_structures(3)
+        Structure.objects.update(service_type_ids="", service_names="", service_count=0)
+        fitting = Fitting.objects.create(hash="market")
+        FittingModule.objects.create(
+            fitting=fitting, eve_type_id=35892, slot=FittingModule.Slot.SERVICE
+        )
+        Structure.objects.update(fitting=fitting)
+        out = StringIO()
+        call_command(
+            "structureintel_refresh_module_summaries", "--batch-size", "2", stdout=out
+        )
+        self.assertIn("Refreshed module summaries of 3 structures", out.getvalue())
+        self.assertListEqual(
+            list(
+                Structure.objects.order_by("id").values_list(
+                    "service_count", "service_type_ids", "service_names"
+                )
+            ),
+            [(1, ",35892,", "Standup Market Hub I")] * 3,
+        )
+
+
+class TestListServices(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_eveuniverse()
+        cls.user = create_user()
+        create_structures(3)
+        create_structures(1, with_modules=False)
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def get_list_data(self, params=None):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(
+                reverse("structureintel:structureintel_list_data"), params or {}
+            )
+        self.assertEqual(response.status_code, 200)
+        for query in context.captured_queries:
+            self.assertNotIn("structureintel_structuremodule", query["sql"])
+        return response.json()
+
+    def page_params(self, **kwargs) -> dict:
+        params = {
+            "draw": "1",
+            "start": "0",
+            "length": "10",
+            "columns[0][data]": "structure_name",
+            "columns[1][data]": "services",
+            "order[0][column]": "0",
+            "order[0][dir]": "asc",
+        }
+        params.update(kwargs)
+        return params
+
+    def test_should_list_services_without_module_queries(self):
+        data = self.get_list_data()
+        self.assertListEqual(
+            sorted(row["services"] for row in data["data"]),
+            [""] + ["Standup Market Hub I<br>Standup Cloning Center I"] * 3,
+        )
+
+    def test_should_filter_by_service(self):
+        data = self.get_list_data(
+            self.page_params(**{"columns[1][search][value]": "Standup Market Hub I"})
+        )
+        self.assertEqual(data["recordsFiltered"], 3)
+        self.assertListEqual(
+            data["filter_options"]["services"],
+            ["Standup Cloning Center I", "Standup Market Hub I"],
+        )
+
+    def test_should_not_match_unknown_service(self):
+        data = self.get_list_data(
+            self.page_params(**{"columns[1][search][value]": "Unknown Service"})
+        )
+        self.assertEqual(data["recordsFiltered"], 0)
+
+    def test_should_search_service_names(self):
+        data = self.get_list_data(self.page_params(**{"search[value]": "cloning"}))
+        self.assertEqual(data["recordsFiltered"], 3)
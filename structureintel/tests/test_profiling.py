@@ -0,0 +1,90 @@
+import os
+import shutil
+import tempfile
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from ..helper import profiling
+from .testdata import create_eveuniverse, create_structures, create_user
+
+MODULE_PATH = "structureintel.helper.profiling"
+
+
+class TestProfiling(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_eveuniverse()
+        create_structures(3)
+        cls.user = create_user(permissions=["structureintel.profile_requests"])
+        cls.user.is_staff = True
+        cls.user.save()
+
+    def setUp(self):
+        cache.clear()
+        self.directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, self.directory)
+        for name, value in (
+            ("STRUCTUREINTEL_PROFILING", True),
+            ("STRUCTUREINTEL_PROFILING_DIR", self.directory),
+            ("STRUCTUREINTEL_PROFILING_MAX_CAPTURES", 2),
+        ):
+            patcher = patch(f"{MODULE_PATH}.{name}", value)
+            patcher.start()
+            self.addCleanup(patcher.stop)
+        self.client.force_login(self.user)
+
+    def profile_list_data(self):
+        return self.client.get(
+            reverse("structureintel:structureintel_list_data"), {"profile": "1"}
+        )
+
+    def test_should_capture_profiled_request(self):
+        response = self.profile_list_data()
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("Structure 0", response.content.decode())
+        captures = profiling.list_captures()
+        self.assertEqual(len(captures), 1)
+        self.assertEqual(captures[0]["view"], "list_data")
+        self.assertGreater(captures[0]["sql_count"], 0)
+        self.assertTrue(
+            os.path.isfile(os.path.join(self.directory, f"{captures[0]['id']}.prof"))
+        )
+
+    def test_should_keep_latest_captures_only(self):
+        for _ in range(3):
+            self.profile_list_data()
+        self.assertEqual(len(profiling.list_captures()), 2)
+        self.assertEqual(len(os.listdir(self.directory)), 4)
+
+    def test_should_not_capture_requests_of_other_users(self):
+        self.client.force_login(create_user("Lex Luthor"))
+        response = self.profile_list_data()
+        self.assertEqual(response.status_code, 200)
+        self.assertListEqual(profiling.list_captures(), [])
+
+    def test_should_show_captures(self):
+        self.profile_list_data()
+        capture_id = profiling.list_captures()[0]["id"]
+
+        response = self.client.get(reverse("structureintel:profiles"))
+        self.assertContains(response, capture_id)
+
+        response = self.client.get(
+            reverse("structureintel:profile_detail", args=[capture_id])
+        )
+        self.assertContains(response, "cumulative")
+        self.assertContains(response, "structureintel_structure")
+
+        response = self.client.get(
+            reverse("structureintel:profile_download", args=[capture_id])
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_should_return_404_for_unknown_capture(self):
+        response = self.client.get(
+            reverse("structureintel:profile_detail", args=["..-secret"])
+        )
+        self.assertEqual(response.status_code, 404)
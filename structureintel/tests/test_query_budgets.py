@@ -0,0 +1,290 @@
+"""Query budgets of all views.
+
+Every view is requested with a small and a larger dataset and an empty
+cache. Its query count must stay within the budget and must not grow with
+the number of structures, so per-row queries fail these tests right away.
+Budgets include the queries for session, user and permissions.
+"""
+import shutil
+import tempfile
+from typing import Callable
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.db import connection
+from django.http import HttpResponse
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from ..helper import profiling
+from ..models import ImportJob, Structure
+from .testdata import (
+    FITTING,
+    create_eveuniverse,
+    create_stargates,
+    create_structures,
+    create_user,
+)
+
+PROFILING_PATH = "structureintel.helper.profiling"
+
+# structures created before the first and the second request
+DATASET_SIZES = (1, 10)
+
+PAGE_PARAMS = {
+    "draw": "1",
+    "start": "0",
+    "length": "50",
+    "columns[0][data]": "structure_name",
+    "order[0][column]": "0",
+    "order[0][dir]": "asc",
+}
+
+
+class QueryBudgetMixin:
+    def setUp(self):
+        self.client.force_login(self.user)
+
+    def assert_query_budget(
+        self, budget: int, request: Callable[[], HttpResponse], status: int = 200
+    ):
+        counts = []
+        created = 0
+        for size in DATASET_SIZES:
+            create_structures(size - created)
+            created = size
+            cache.clear()
+            with CaptureQueriesContext(connection) as context:
+                response = request()
+            self.assertEqual(response.status_code, status)
+            counts.append(len(context))
+        self.assertLessEqual(max(counts), budget, f"query counts: {counts}")
+        self.assertEqual(
+            len(set(counts)), 1, f"query count depends on dataset size: {counts}"
+        )
+
+
+class TestQueryBudgets(QueryBudgetMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_eveuniverse()
+        cls.user = create_user(permissions=["structureintel.delete_structure"])
+
+    def test_index(self):
+        self.assert_query_budget(
+            12, lambda: self.client.get(reverse("structureintel:index"))
+        )
+
+    def test_dashboard(self):
+        self.assert_query_budget(
+            22, lambda: self.client.get(reverse("structureintel:dashboard"))
+        )
+
+    def test_list_data(self):
+        self.assert_query_budget(
+            9,
+            lambda: self.client.get(reverse("structureintel:structureintel_list_data")),
+        )
+
+    def test_list_data_page(self):
+        self.assert_query_budget(
+            17,
+            lambda: self.client.get(
+                reverse("structureintel:structureintel_list_data"), PAGE_PARAMS
+            ),
+        )
+
+    def test_structure_details(self):
+        def request():
+            structure = Structure.objects.order_by("-id").first()
+            return self.client.get(
+                reverse("structureintel:structure_details", args=[structure.id])
+            )
+
+        # includes two queries for the fitting history
+        self.assert_query_budget(13, request)
+
+    def test_solar_system(self):
+        self.assert_query_budget(
+            9,
+            lambda: self.client.get(
+                reverse("structureintel:solar_system"), {"term": "System"}
+            ),
+        )
+
+    def test_structures(self):
+        self.assert_query_budget(
+            9,
+            lambda: self.client.get(
+                reverse("structureintel:structures"), {"term": "a"}
+            ),
+        )
+
+    def test_add_structure_form(self):
+        self.assert_query_budget(
+            12, lambda: self.client.get(reverse("structureintel:add_structure"))
+        )
+
+    def test_add_structure(self):
+        launchers = []
+
+        def request():
+            # each request stores a new fitting
+            launchers.append("Standup Launcher\n")
+            return self.client.post(
+                reverse("structureintel:add_structure"),
+                {
+                    "eve_solar_system_2": "30000001",
+                    "eve_structure_type_2": "35832",
+                    "name": "Perimeter - Trade Hub",
+                    "owner": "Test Corp",
+                    "mode": Structure.PowerMode.FULL_POWER,
+                    "reinforcement_hour": "18",
+                    "fitting": FITTING + "".join(launchers),
+                },
+            )
+
+        self.assert_query_budget(27, request, status=302)
+
+    def test_update_structure_form(self):
+        def request():
+            structure = Structure.objects.order_by("-id").first()
+            return self.client.get(
+                reverse("structureintel:update", args=[structure.id])
+            )
+
+        self.assert_query_budget(17, request)
+
+    def test_update_structure(self):
+        launchers = []
+
+        def request():
+            # each request stores a new fitting and records a revision
+            launchers.append("Standup Launcher\n")
+            structure = Structure.objects.order_by("-id").first()
+            return self.client.post(
+                reverse("structureintel:update", args=[structure.id]),
+                {
+                    "eve_solar_system_2": "30000001",
+                    "eve_structure_type_2": "35832",
+                    "name": "Perimeter - Trade Hub",
+                    "owner": "Test Corp",
+                    "mode": Structure.PowerMode.LOW_POWER,
+                    "reinforcement_hour": "18",
+                    "fitting": FITTING + "".join(launchers),
+                },
+            )
+
+        self.assert_query_budget(34, request, status=302)
+
+    def test_delete_structure_confirmation(self):
+        def request():
+            structure = Structure.objects.order_by("-id").first()
+            return self.client.get(
+                reverse("structureintel:delete", args=[structure.id])
+            )
+
+        self.assert_query_budget(15, request)
+
+    def test_delete_structure(self):
+        def request():
+            structure = Structure.objects.order_by("-id").first()
+            return self.client.post(
+                reverse("structureintel:delete", args=[structure.id])
+            )
+
+        self.assert_query_budget(17, request, status=302)
+
+    def test_import_structures_form(self):
+        self.assert_query_budget(
+            12, lambda: self.client.get(reverse("structureintel:import_structures"))
+        )
+
+    def test_import_status(self):
+        job = ImportJob.objects.create(user=self.user, input_format="jsonl")
+        self.assert_query_budget(
+            13,
+            lambda: self.client.get(
+                reverse("structureintel:import_status", args=[job.pk])
+            ),
+        )
+
+    def test_import_status_data(self):
+        job = ImportJob.objects.create(user=self.user, input_format="jsonl")
+        self.assert_query_budget(
+            10,
+            lambda: self.client.get(
+                reverse("structureintel:import_status_data", args=[job.pk])
+            ),
+        )
+
+    def test_proximity(self):
+        create_stargates([(30000001, 30000002), (30000002, 30000003)])
+        self.assert_query_budget(
+            10,
+            lambda: self.client.get(
+                reverse("structureintel:proximity"), {"system": 30000001, "jumps": 2}
+            ),
+        )
+
+    def test_timers(self):
+        self.assert_query_budget(
+            13, lambda: self.client.get(reverse("structureintel:timers"), {"hours": 6})
+        )
+
+
+@patch(PROFILING_PATH + ".STRUCTUREINTEL_PROFILING", True)
+class TestStaffQueryBudgets(QueryBudgetMixin, TestCase):
+    """Budgets of the views for staff"""
+
+    @classmethod
+    def setUpTestData(cls):
+        create_eveuniverse()
+        cls.user = create_user(permissions=["structureintel.profile_requests"])
+        cls.user.is_staff = True
+        cls.user.save()
+
+    def setUp(self):
+        super().setUp()
+        directory = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, directory)
+        patcher = patch(PROFILING_PATH + ".STRUCTUREINTEL_PROFILING_DIR", directory)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def capture(self) -> str:
+        self.client.get(reverse("structureintel:index"), {"profile": "1"})
+        return profiling.list_captures()[0]["id"]
+
+    def test_stats(self):
+        self.assert_query_budget(
+            4, lambda: self.client.get(reverse("structureintel:stats"))
+        )
+
+    def test_profiles(self):
+        self.capture()
+        self.assert_query_budget(
+            12, lambda: self.client.get(reverse("structureintel:profiles"))
+        )
+
+    def test_profile_detail(self):
+        capture_id = self.capture()
+        self.assert_query_budget(
+            12,
+            lambda: self.client.get(
+                reverse("structureintel:profile_detail", args=[capture_id])
+            ),
+        )
+
+    def test_profile_download(self):
+        capture_id = self.capture()
+
+        def request():
+            response = self.client.get(
+                reverse("structureintel:profile_download", args=[capture_id])
+            )
+            response.close()
+            return response
+
+        self.assert_query_budget(8, request)
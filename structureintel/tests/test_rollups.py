@@ -0,0 +1,170 @@
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+from django.urls import reverse
+
+from allianceauth.tests.auth_utils import AuthUtils
+
+from ..helper import rollups
+from ..helper.fittings import refresh_module_summaries
+from ..helper.importer import StructureImporter, make_record
+from ..models import Structure, StructureRollup
+from .test_forms import form_data
+from .test_importer import record
+from .testdata import (
+    create_eveuniverse,
+    create_structure,
+    create_structures,
+    create_user,
+)
+
+Dimension = StructureRollup.Dimension
+
+
+def stored_counts() -> dict:
+    return {
+        (dimension, key): count
+        for dimension, key, count in StructureRollup.objects.filter(
+            count__gt=0
+        ).values_list("dimension", "key", "count")
+    }
+
+
+class TestRollups(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_eveuniverse()
+
+    def setUp(self):
+        cache.clear()
+        rollups.clear()
+
+    def assert_counts_match_rebuild(self):
+        counts = stored_counts()
+        rollups.rebuild()
+        self.assertDictEqual(counts, stored_counts())
+
+    def test_should_count_structures_with_grouped_queries(self):
+        create_structures(4)
+        create_structure(owner="Other Corp", eve_solar_system_id=30000011)
+        StructureRollup.objects.all().delete()
+        # savepoint, 5 dimensions, services, delete, insert, release savepoint
+        with self.assertNumQueries(10):
+            rollups.rebuild()
+        counts = stored_counts()
+        self.assertEqual(counts[(Dimension.REGION, "10000001")], 3)
+        self.assertEqual(counts[(Dimension.REGION, "10000002")], 2)
+        self.assertEqual(counts[(Dimension.CONSTELLATION, "20000002")], 2)
+        self.assertEqual(counts[(Dimension.OWNER, "Test Corp")], 4)
+        self.assertEqual(counts[(Dimension.TYPE, "35832")], 5)
+        self.assertEqual(counts[(Dimension.POWER_MODE, "FU")], 5)
+        self.assertEqual(counts[(Dimension.SERVICE, "35892")], 4)
+
+    def test_should_update_counts_of_created_changed_and_deleted_structures(self):
+        structures = create_structures(3)
+        structure = structures[0]
+        structure.owner = "Other Corp"
+        structure.eve_solar_system_id = 30000012
+        structure.power_mode = Structure.PowerMode.LOW_POWER
+        structure.save()
+        structures[1].delete()
+        create_structure(eve_type_id=35833)
+        counts = stored_counts()
+        self.assertEqual(counts[(Dimension.OWNER, "Other Corp")], 1)
+        self.assertEqual(counts[(Dimension.OWNER, "Test Corp")], 2)
+        self.assertEqual(counts[(Dimension.TYPE, "35833")], 1)
+        self.assertEqual(counts[(Dimension.SERVICE, "35894")], 2)
+        self.assert_counts_match_rebuild()
+
+    def test_should_not_update_counts_for_other_fields(self):
+        structure = create_structure()
+        structure.name = "Renamed"
+        # stored values, structure
+        with self.assertNumQueries(2):
+            structure.save()
+
+    def test_should_count_services_of_submitted_fittings(self):
+        user = create_user()
+        self.client.force_login(user)
+        self.client.post(reverse("structureintel:add_structure"), form_data())
+        self.assertEqual(stored_counts()[(Dimension.SERVICE, "35892")], 1)
+        self.assert_counts_match_rebuild()
+
+    def test_should_count_imported_structures(self):
+        StructureImporter().import_batch(
+            [make_record(num, record(name=f"S{num}")) for num in range(3)]
+        )
+        self.assertEqual(stored_counts()[(Dimension.REGION, "10000001")], 3)
+        self.assert_counts_match_rebuild()
+
+    def test_should_count_services_of_refreshed_structures(self):
+        structures = create_structures(2)
+        Structure.objects.filter(pk=structures[0].pk).update(fitting=None)
+        self.assertEqual(stored_counts()[(Dimension.SERVICE, "35892")], 2)
+        refresh_module_summaries([structures[0].pk])
+        self.assertEqual(stored_counts()[(Dimension.SERVICE, "35892")], 1)
+        self.assert_counts_match_rebuild()
+
+    def test_should_rebuild_with_command(self):
+        create_structures(2)
+        StructureRollup.objects.all().delete()
+        call_command("structureintel_rebuild_rollups", stdout=open("/dev/null", "w"))
+        self.assertEqual(stored_counts()[(Dimension.TYPE, "35832")], 2)
+
+    def test_should_serve_tables_from_process_cache(self):
+        create_structures(3)
+        with self.captureOnCommitCallbacks(execute=True):
+            create_structure(owner="Other Corp")
+        tables = {table.dimension: table for table in rollups.get_tables()}
+        with self.assertNumQueries(0):
+            rollups.get_tables()
+        self.assertEqual(tables[Dimension.OWNER].rows[0], ("Test Corp", "Test Corp", 3))
+        self.assertEqual(tables[Dimension.OWNER].distinct, 2)
+        self.assertEqual(tables[Dimension.TYPE].rows[0].label, "Astrahus")
+        self.assertEqual(tables[Dimension.POWER_MODE].rows[0].label, "Full Power")
+        self.assertEqual(tables[Dimension.REGION].rows[0].label, "Region 10000001")
+        with self.captureOnCommitCallbacks(execute=True):
+            create_structure(owner="Third Corp")
+        tables = {table.dimension: table for table in rollups.get_tables()}
+        self.assertEqual(tables[Dimension.OWNER].distinct, 3)
+
+    @patch(rollups.__name__ + ".STRUCTUREINTEL_DASHBOARD_MAX_ROWS", 1)
+    def test_should_limit_rows_per_dimension(self):
+        create_structure(owner="Alpha")
+        create_structure(owner="Beta")
+        create_structure(owner="Beta")
+        owners = next(
+            table
+            for table in rollups.get_tables()
+            if table.dimension == Dimension.OWNER
+        )
+        self.assertListEqual([row.key for row in owners.rows], ["Beta"])
+        self.assertEqual(owners.others, 1)
+        self.assertEqual(owners.total, 3)
+
+
+class TestDashboardView(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_eveuniverse()
+        cls.user = create_user()
+        create_structures(2)
+
+    def setUp(self):
+        cache.clear()
+        rollups.clear()
+
+    def test_should_show_counts(self):
+        self.client.force_login(self.user)
+        response = self.client.get(reverse("structureintel:dashboard"))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context["structure_count"], 2)
+        self.assertContains(response, "Standup Market Hub I")
+        self.assertContains(response, "Constellation 10000001")
+
+    def test_should_require_access(self):
+        self.client.force_login(AuthUtils.create_user("Joker"))
+        response = self.client.get(reverse("structureintel:dashboard"))
+        self.assertEqual(response.status_code, 302)
@@ -0,0 +1,56 @@
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test import RequestFactory, TestCase
+from django.test.utils import CaptureQueriesContext
+
+from ..helper.serializer import StructureCompactSerializer, StructureSerializer
+from ..models import Structure
+from .testdata import create_eveuniverse, create_structures, create_user
+
+
+class TestStructureSerializer(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_eveuniverse()
+        cls.user = create_user(permissions=["structureintel.delete_structure"])
+
+    def setUp(self):
+        self.request = RequestFactory().get("/")
+        self.request.user = self.user
+
+    def count_queries(self, serialize) -> int:
+        # permissions are cached on the user after the first check
+        self.request.user = User.objects.get(pk=self.user.pk)
+        with CaptureQueriesContext(connection) as context:
+            serialize(Structure.objects.all())
+        return len(context)
+
+    def assert_constant_queries(self, serialize):
+        create_structures(1)
+        single = self.count_queries(serialize)
+        create_structures(9)
+        self.assertEqual(self.count_queries(serialize), single)
+        # permissions of the user and groups, structures
+        self.assertLessEqual(single, 6)
+
+    def test_should_serialize_with_constant_queries(self):
+        self.assert_constant_queries(
+            lambda queryset: StructureSerializer(queryset).to_list(self.request)
+        )
+
+    def test_should_serialize_compact_with_constant_queries(self):
+        self.assert_constant_queries(
+            lambda queryset: StructureCompactSerializer(queryset).to_dict(self.request)
+        )
+
+    def test_should_serialize_structure(self):
+        structure = create_structures(1)[0]
+        (row,) = StructureSerializer(Structure.objects.all()).to_list(self.request)
+        self.assertEqual(row["id"], structure.id)
+        self.assertEqual(row["region_name"], "Region 10000001")
+        self.assertEqual(
+            row["services"], "Standup Market Hub I<br>Standup Cloning Center I"
+        )
+        self.assertIn("btn-danger", row["actions"])
+        self.assertNotIn("</button>", row["actions"].split("btn-danger")[1])
+        self.assertTrue(row["actions"].endswith("</a>"))
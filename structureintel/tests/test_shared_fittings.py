@@ -0,0 +1,77 @@
+from django.test import TestCase
+
+from ..helper.fitting_parser import parse_fitting
+from ..helper.fittings import (
+    CanonicalModule,
+    canonical_fitting,
+    fitting_hash,
+    get_or_create_fittings,
+)
+from ..models import Fitting, FittingModule
+from .testdata import FITTING, create_eveuniverse
+
+TYPE_IDS = {
+    "Standup Launcher": 35923,
+    "Standup Point Defense Battery I": 35926,
+    "Standup Warp Scrambler I": 35943,
+    "Standup Ballistic Control System I": 35955,
+    "Standup M-Set Missile Projection I": 37248,
+    "Standup Market Hub I": 35892,
+    "Standup Cloning Center I": 35894,
+}
+
+
+def fitting_of(text: str):
+    return canonical_fitting(parse_fitting(text), TYPE_IDS)
+
+
+class TestCanonicalFitting(TestCase):
+    def test_should_merge_modules_of_same_type_and_slot(self):
+        fitting = fitting_of("High Power Slots\nStandup Launcher\nStandup Launcher\n")
+        self.assertEqual(
+            fitting, (CanonicalModule(FittingModule.Slot.HIGHSLOT, 35923, 2),)
+        )
+
+    def test_should_ignore_order_of_modules(self):
+        reordered = FITTING.replace(
+            "Standup Market Hub I\nStandup Cloning Center I",
+            "Standup Cloning Center I\nStandup Market Hub I",
+        )
+        self.assertEqual(fitting_of(reordered), fitting_of(FITTING))
+        self.assertEqual(
+            fitting_hash(fitting_of(reordered)), fitting_hash(fitting_of(FITTING))
+        )
+
+    def test_should_hash_quantities(self):
+        self.assertNotEqual(
+            fitting_hash(fitting_of(FITTING)),
+            fitting_hash(fitting_of(FITTING + "Standup Market Hub I\n")),
+        )
+
+
+class TestGetOrCreateFittings(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_eveuniverse()
+
+    def test_should_store_each_fitting_once(self):
+        first = fitting_of(FITTING)
+        second = fitting_of("High Power Slots\nStandup Launcher\n")
+        fitting_ids = get_or_create_fittings([first, second, first])
+        self.assertEqual(Fitting.objects.count(), 2)
+        self.assertEqual(FittingModule.objects.count(), 8)
+        self.assertEqual(
+            Fitting.objects.get(id=fitting_ids[first]).hash, fitting_hash(first)
+        )
+
+    def test_should_look_up_known_fittings_with_one_query(self):
+        fitting = fitting_of(FITTING)
+        fitting_id = get_or_create_fittings([fitting])[fitting]
+        with self.assertNumQueries(1):
+            self.assertDictEqual(
+                get_or_create_fittings([fitting]), {fitting: fitting_id}
+            )
+
+    def test_should_not_store_empty_fittings(self):
+        self.assertDictEqual(get_or_create_fittings([()]), {})
+        self.assertFalse(Fitting.objects.exists())
@@ -0,0 +1,51 @@
+from io import StringIO
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase
+
+from ..helper import slot_layout
+from .testdata import create_eveuniverse
+
+
+class TestSlotLayout(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_eveuniverse()
+
+    def setUp(self):
+        cache.clear()
+        slot_layout.clear()
+
+    def test_should_return_layout_of_type(self):
+        layout = slot_layout.get_layout(35832)
+        self.assertDictEqual(
+            layout.counts, {"high": 3, "med": 3, "low": 2, "rig": 3, "service": 3}
+        )
+        self.assertEqual(
+            layout.image_urls["low"], "/static/structureintel/img/pannel/2l.png"
+        )
+
+    def test_should_return_empty_layout_for_types_without_attributes(self):
+        layout = slot_layout.get_layout(35833)
+        self.assertDictEqual(layout.counts, {})
+        self.assertEqual(layout.image_urls["high"], "")
+
+    def test_should_build_all_layouts_with_one_query(self):
+        with self.assertNumQueries(1):
+            slot_layout.get_layout(35832)
+        with self.assertNumQueries(0):
+            slot_layout.get_layout(35833)
+
+    @patch(
+        "structureintel.management.commands.structureintel_preload_structures"
+        ".call_command"
+    )
+    def test_preload_command_should_warm_layouts(self, mock_call_command):
+        out = StringIO()
+        call_command("structureintel_preload_structures", stdout=out)
+        self.assertTrue(mock_call_command.called)
+        self.assertIn("Cached slot layouts of 1 structure types", out.getvalue())
+        with self.assertNumQueries(0):
+            slot_layout.get_layout(35832)
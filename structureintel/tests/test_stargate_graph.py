@@ -0,0 +1,124 @@
+import pickle
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from ..helper import stargate_graph
+from ..helper.stargate_graph import systems_within
+from .testdata import (
+    create_eveuniverse,
+    create_stargates,
+    create_structure,
+    create_user,
+)
+
+# 30000001 - 30000002 - 30000003 - 30000011 - 30000012, 30000013 has no gates
+CONNECTIONS = [
+    (30000001, 30000002),
+    (30000002, 30000003),
+    (30000003, 30000011),
+    (30000011, 30000012),
+    (30000001, 30000003),
+]
+
+
+class TestStargateGraph(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_eveuniverse()
+        create_stargates(CONNECTIONS)
+
+    def setUp(self):
+        cache.clear()
+        stargate_graph.clear()
+
+    def test_should_store_connections_as_sparse_rows(self):
+        graph = stargate_graph.get_graph()
+        self.assertListEqual(
+            list(graph.system_ids), [30000001, 30000002, 30000003, 30000011, 30000012]
+        )
+        self.assertListEqual(list(graph.offsets), [0, 2, 4, 7, 9, 10])
+        self.assertListEqual(list(graph.neighbors), [1, 2, 0, 2, 0, 1, 3, 2, 4, 3])
+
+    def test_should_return_jumps_within_range(self):
+        self.assertDictEqual(
+            systems_within(30000001, 2),
+            {30000001: 0, 30000002: 1, 30000003: 1, 30000011: 2},
+        )
+        self.assertDictEqual(systems_within(30000001, 0), {30000001: 0})
+        self.assertEqual(systems_within(30000001, 20)[30000012], 3)
+
+    def test_should_only_reach_origin_without_stargates(self):
+        self.assertDictEqual(systems_within(30000013, 5), {30000013: 0})
+
+    def test_should_memoize_search_per_origin(self):
+        systems_within(30000001, 1)
+        with self.assertNumQueries(0), patch.object(
+            stargate_graph.StargateGraph, "_search"
+        ) as search:
+            self.assertEqual(len(systems_within(30000001, 5)), 5)
+        search.assert_not_called()
+
+    def test_should_rebuild_graph_when_stargates_change(self):
+        self.assertNotIn(30000013, systems_within(30000012, 5))
+        with self.captureOnCommitCallbacks(execute=True):
+            create_stargates([(30000012, 30000013)])
+        self.assertEqual(systems_within(30000012, 5)[30000013], 1)
+
+    def test_should_pickle_graph_without_search_results(self):
+        graph = stargate_graph.get_graph()
+        graph.reach(30000001)
+        copy = pickle.loads(pickle.dumps(graph))
+        self.assertListEqual(list(copy.neighbors), list(graph.neighbors))
+        self.assertDictEqual(
+            copy.reach(30000001).within(1), graph.reach(30000001).within(1)
+        )
+
+
+class TestProximity(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_eveuniverse()
+        create_stargates(CONNECTIONS)
+        cls.user = create_user()
+        cls.near = create_structure(eve_solar_system_id=30000002, name="Near")
+        cls.far = create_structure(eve_solar_system_id=30000012, name="Far")
+
+    def setUp(self):
+        cache.clear()
+        stargate_graph.clear()
+        self.client.force_login(self.user)
+
+    def test_should_return_structures_in_range_nearest_first(self):
+        response = self.client.get(
+            reverse("structureintel:proximity"), {"system": 30000003, "jumps": 2}
+        )
+        self.assertEqual(response.status_code, 200)
+        payload = response.json()
+        self.assertListEqual(
+            [(row["name"], row["jumps"]) for row in payload["structures"]],
+            [("Near", 1), ("Far", 2)],
+        )
+        self.assertEqual(payload["systems"]["30000003"], 0)
+
+    def test_should_reject_invalid_parameters(self):
+        for params in ({}, {"system": "Jita"}, {"system": 30000001, "jumps": 99}):
+            response = self.client.get(reverse("structureintel:proximity"), params)
+            self.assertEqual(response.status_code, 400)
+
+    def test_should_filter_list_page_by_proximity(self):
+        response = self.client.get(
+            reverse("structureintel:structureintel_list_data"),
+            {
+                "draw": "1",
+                "format": "compact",
+                "columns[0][data]": "structure_name",
+                "near": "30000001",
+                "jumps": "1",
+            },
+        )
+        payload = response.json()
+        self.assertEqual(payload["recordsFiltered"], 1)
+        self.assertEqual(payload["data"][0][0], self.near.id)
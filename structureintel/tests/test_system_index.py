@@ -0,0 +1,93 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from eveuniverse.models import EveConstellation, EveSolarSystem
+
+from ..helper import system_index
+from .testdata import create_eveuniverse, create_user
+
+
+def create_system(system_id: int, name: str) -> EveSolarSystem:
+    return EveSolarSystem.objects.create(
+        id=system_id,
+        name=name,
+        eve_constellation=EveConstellation.objects.first(),
+        security_status=0.9,
+    )
+
+
+class TestSystemIndex(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_eveuniverse()
+        create_system(30000142, "Jita")
+        create_system(30000143, "Jitanmi")
+        create_system(31000005, "J100001")
+        create_system(31000006, "J1000")
+
+    def setUp(self):
+        cache.clear()
+
+    def names(self, term: str, limit: int = 10) -> list:
+        return [entry.name for entry in system_index.search(term, limit)]
+
+    def test_should_find_systems_by_prefix_ignoring_case(self):
+        self.assertListEqual(self.names("jit"), ["Jita", "Jitanmi"])
+        self.assertListEqual(
+            self.names("SYSTEM 10000002"),
+            [
+                "System 10000002-0",
+                "System 10000002-1",
+                "System 10000002-2",
+            ],
+        )
+        self.assertListEqual(self.names("Perimeter"), [])
+
+    def test_should_rank_exact_match_and_short_names_first(self):
+        self.assertListEqual(self.names("j1000"), ["J1000", "J100001"])
+        self.assertListEqual(self.names("j", limit=3), ["Jita", "J1000", "J100001"])
+
+    def test_should_cap_results(self):
+        self.assertEqual(len(self.names("System", limit=4)), 4)
+        self.assertListEqual(self.names(" "), [])
+
+    def test_should_build_index_once(self):
+        with self.assertNumQueries(1):
+            self.names("Jita")
+        with self.assertNumQueries(0):
+            self.names("J1")
+
+    def test_should_rebuild_index_when_systems_change(self):
+        self.names("Jita")
+        create_system(30002187, "Amarr")
+        # post_save only invalidates the index once the transaction commits
+        self.assertListEqual(self.names("Amarr"), [])
+        with self.captureOnCommitCallbacks(execute=True):
+            EveSolarSystem.objects.get(id=30002187).save()
+        self.assertListEqual(self.names("Amarr"), ["Amarr"])
+
+
+class TestSolarSystemView(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_eveuniverse()
+        cls.user = create_user()
+
+    def setUp(self):
+        cache.clear()
+        self.client.force_login(self.user)
+
+    def test_should_return_cacheable_results(self):
+        response = self.client.get(
+            reverse("structureintel:solar_system"), {"term": "system 10000001-1"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertDictEqual(
+            response.json(), {"data": [{"id": 30000002, "text": "System 10000001-1"}]}
+        )
+        self.assertIn("max-age=3600", response["Cache-Control"])
+        self.assertIn("private", response["Cache-Control"])
+
+    def test_should_return_nothing_without_term(self):
+        response = self.client.get(reverse("structureintel:solar_system"))
+        self.assertDictEqual(response.json(), {"data": []})
@@ -0,0 +1,133 @@
+import json
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from .. import tasks
+from ..models import ImportJob, Structure
+from .testdata import FITTING, create_eveuniverse, create_user
+
+MODULE_PATH = "structureintel.tasks"
+
+
+def jsonl_content(count: int) -> str:
+    records = [
+        {
+            "system": "System 10000001-0",
+            "type": "Astrahus",
+            "name": f"Structure {num}",
+            "owner": "Test Corp",
+            "reinforce_hour": 12,
+            "fitting": FITTING,
+        }
+        for num in range(count)
+    ]
+    return "\n".join(json.dumps(record) for record in records) + "\n{broken\n"
+
+
+@patch(MODULE_PATH + ".STRUCTUREINTEL_IMPORT_CHUNK_SIZE", 2)
+class TestImportStructures(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_eveuniverse()
+
+    def setUp(self):
+        cache.clear()
+
+    @patch(MODULE_PATH + ".import_chunk.delay")
+    def test_should_split_job_into_chunks(self, mock_delay):
+        job = ImportJob.objects.create(
+            input_format=ImportJob.Format.JSONL, content=jsonl_content(5)
+        )
+        tasks.import_structures(job.pk)
+        job.refresh_from_db()
+        self.assertEqual(job.status, ImportJob.Status.RUNNING)
+        self.assertEqual(job.total_chunks, 3)
+        self.assertEqual(job.failed_count, 1)
+        self.assertEqual(job.content, "")
+        self.assertEqual(mock_delay.call_count, 3)
+
+    @patch(MODULE_PATH + ".import_chunk.delay", new=tasks.import_chunk)
+    def test_should_import_all_chunks_and_finish(self):
+        job = ImportJob.objects.create(
+            input_format=ImportJob.Format.JSONL, content=jsonl_content(5)
+        )
+        tasks.import_structures(job.pk)
+        job.refresh_from_db()
+        self.assertEqual(job.status, ImportJob.Status.FINISHED)
+        self.assertEqual(job.progress, 100)
+        self.assertEqual(job.created_count, 5)
+        self.assertEqual(job.failed_count, 1)
+        self.assertEqual(Structure.objects.count(), 5)
+        self.assertEqual(job.errors.get().line, 6)
+
+    @patch(MODULE_PATH + ".logger")
+    @patch(MODULE_PATH + ".StructureImporter.import_batch", side_effect=OSError)
+    def test_should_count_failed_chunk_as_done(self, mock_import_batch, mock_logger):
+        job = ImportJob.objects.create(
+            input_format=ImportJob.Format.JSONL,
+            status=ImportJob.Status.RUNNING,
+            total_chunks=1,
+        )
+        tasks.import_chunk(job.pk, [{"line": 1}, {"line": 2}])
+        job.refresh_from_db()
+        self.assertEqual(job.status, ImportJob.Status.FINISHED)
+        self.assertEqual(job.failed_count, 2)
+
+    def test_should_finish_job_without_records(self):
+        job = ImportJob.objects.create(input_format=ImportJob.Format.EFT, content="")
+        tasks.import_structures(job.pk)
+        job.refresh_from_db()
+        self.assertEqual(job.status, ImportJob.Status.FINISHED)
+
+
+class TestImportViews(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_eveuniverse()
+        cls.user = create_user()
+
+    @patch("structureintel.views.tasks.import_structures.delay")
+    def test_should_create_job_from_paste(self, mock_delay):
+        self.client.force_login(self.user)
+        response = self.client.post(
+            reverse("structureintel:import_structures"),
+            {"input_format": "jsonl", "content": jsonl_content(1)},
+        )
+        job = ImportJob.objects.get()
+        self.assertRedirects(
+            response,
+            reverse("structureintel:import_status", args=[job.pk]),
+            fetch_redirect_response=False,
+        )
+        self.assertEqual(job.user, self.user)
+        mock_delay.assert_called_once_with(job.pk)
+
+    def test_should_require_content(self):
+        self.client.force_login(self.user)
+        response = self.client.post(
+            reverse("structureintel:import_structures"), {"input_format": "jsonl"}
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(ImportJob.objects.exists())
+
+    def test_should_return_progress_of_own_jobs_only(self):
+        job = ImportJob.objects.create(
+            user=self.user,
+            input_format=ImportJob.Format.JSONL,
+            status=ImportJob.Status.RUNNING,
+            total_chunks=4,
+            finished_chunks=1,
+        )
+        other_job = ImportJob.objects.create(input_format=ImportJob.Format.JSONL)
+        self.client.force_login(self.user)
+        response = self.client.get(
+            reverse("structureintel:import_status_data", args=[job.pk])
+        )
+        self.assertEqual(response.json()["progress"], 25)
+        response = self.client.get(
+            reverse("structureintel:import_status_data", args=[other_job.pk])
+        )
+        self.assertEqual(response.status_code, 404)
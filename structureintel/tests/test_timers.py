@@ -0,0 +1,184 @@
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from ..helper import stargate_graph, timers
+from ..models import ReinforceHourCount, Structure
+from .testdata import (
+    create_eveuniverse,
+    create_stargates,
+    create_structure,
+    create_user,
+)
+
+MODULE_PATH = "structureintel.views"
+
+# 10:30 EVE time, so the first full hour is 11:00
+NOW = datetime(2022, 5, 1, 10, 30, tzinfo=timezone.utc)
+
+
+class TestTimerHours(TestCase):
+    def test_should_return_hours_in_order_of_next_occurrence(self):
+        self.assertListEqual(timers.window_hours(NOW, 3), [11, 12, 13])
+        late = datetime(2022, 5, 1, 22, 5, tzinfo=timezone.utc)
+        self.assertListEqual(timers.window_hours(late, 3), [23, 0, 1])
+        self.assertEqual(len(timers.window_hours(NOW, 30)), 24)
+
+    def test_should_return_next_end_of_timer(self):
+        self.assertEqual(
+            timers.next_occurrence(NOW, 11),
+            datetime(2022, 5, 1, 11, tzinfo=timezone.utc),
+        )
+        self.assertEqual(
+            timers.next_occurrence(NOW, 10),
+            datetime(2022, 5, 2, 10, tzinfo=timezone.utc),
+        )
+
+
+class TestHistograms(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_eveuniverse()
+        cls.structures = [
+            create_structure(
+                reinforce_hour=hour, eve_solar_system_id=system_id, owner=owner
+            )
+            for hour, system_id, owner in (
+                (11, 30000001, "Alpha"),
+                (11, 30000002, "Beta"),
+                (12, 30000011, "Alpha"),
+                (None, 30000001, "Alpha"),
+            )
+        ]
+
+    def stored_counts(self) -> dict:
+        return {
+            (scope, key, hour): count
+            for scope, key, hour, count in ReinforceHourCount.objects.filter(
+                count__gt=0
+            ).values_list("scope", "key", "hour", "count")
+        }
+
+    def test_should_count_structures_by_hour(self):
+        self.assertEqual(timers.histogram()[11], 2)
+        self.assertEqual(sum(timers.histogram()), 3)
+        self.assertEqual(timers.histogram(region_id=10000001)[11], 2)
+        self.assertEqual(timers.histogram(owner="Alpha")[12], 1)
+        self.assertEqual(timers.histogram(system_ids=[30000002])[11], 1)
+
+    def test_should_answer_single_filters_with_one_query(self):
+        for params, hour, count in (
+            ({"region_id": 10000002}, 12, 1),
+            ({"owner": "Beta"}, 11, 1),
+            ({"system_ids": [30000001, 30000002]}, 11, 2),
+        ):
+            with self.assertNumQueries(1):
+                self.assertEqual(timers.histogram(**params)[hour], count)
+        with self.assertNumQueries(1):
+            self.assertEqual(sum(timers.histogram(owner="Nobody")), 0)
+
+    def test_should_query_combined_filters(self):
+        with self.assertNumQueries(1):
+            counts = timers.histogram(region_id=10000001, owner="Alpha")
+        self.assertEqual(counts[11], 1)
+        self.assertEqual(sum(counts), 1)
+
+    def test_should_move_counts_when_structures_change(self):
+        structure = self.structures[0]
+        structure.reinforce_hour = 5
+        structure.eve_solar_system_id = 30000011
+        structure.save()
+        self.assertEqual(timers.histogram()[5], 1)
+        self.assertEqual(timers.histogram()[11], 1)
+        self.assertEqual(timers.histogram(region_id=10000002)[5], 1)
+        self.assertEqual(timers.histogram(region_id=10000001)[11], 1)
+        self.assertEqual(timers.histogram(owner="Alpha")[11], 0)
+        structure.delete()
+        self.assertEqual(timers.histogram()[5], 0)
+        self.assertEqual(sum(timers.histogram()), 2)
+
+    def test_should_not_query_counts_when_other_fields_change(self):
+        structure = self.structures[0]
+        structure.name = "Renamed"
+        with patch("structureintel.helper.timers._apply") as apply:
+            structure.save()
+        apply.assert_not_called()
+
+    def test_should_count_structures_without_signals(self):
+        structure = create_structure(reinforce_hour=3, owner="Gamma")
+        Structure.objects.filter(pk=structure.pk).update(reinforce_hour=4)
+        self.assertEqual(timers.histogram()[3], 1)
+        timers.rebuild()
+        self.assertEqual(timers.histogram()[3], 0)
+        self.assertEqual(timers.histogram(owner="Gamma")[4], 1)
+
+    def test_should_rebuild_same_counts(self):
+        structure = self.structures[1]
+        structure.owner = "Alpha"
+        structure.save()
+        self.structures[2].delete()
+        counts = self.stored_counts()
+        timers.rebuild()
+        self.assertDictEqual(self.stored_counts(), counts)
+
+
+@patch(MODULE_PATH + ".now", lambda: NOW)
+class TestTimersView(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_eveuniverse()
+        create_stargates([(30000001, 30000002)])
+        cls.user = create_user()
+        cls.first = create_structure(
+            reinforce_hour=11, name="First", eve_solar_system_id=30000002
+        )
+        cls.second = create_structure(
+            reinforce_hour=13, name="Second", eve_solar_system_id=30000011
+        )
+        cls.wrapped = create_structure(
+            reinforce_hour=2, name="Wrapped", eve_solar_system_id=30000001
+        )
+        create_structure(reinforce_hour=10, name="Later")
+
+    def setUp(self):
+        cache.clear()
+        stargate_graph.clear()
+        self.client.force_login(self.user)
+
+    def get_timers(self, **params):
+        return self.client.get(reverse("structureintel:timers"), params)
+
+    def names(self, payload: dict) -> list:
+        return [row[3] for row in payload["data"]]
+
+    def test_should_return_timers_in_window_ordered_by_end(self):
+        payload = self.get_timers(hours=18).json()
+        self.assertListEqual(self.names(payload), ["First", "Second", "Wrapped"])
+        self.assertEqual(payload["ends_at"]["2"], "2022-05-02T02:00:00Z")
+        self.assertEqual(sum(payload["histogram"]), 4)
+        self.assertFalse(payload["truncated"])
+        self.assertIn("systems", payload)
+
+    def test_should_limit_timers_to_area(self):
+        payload = self.get_timers(hours=24, region=10000002).json()
+        self.assertListEqual(self.names(payload), ["Second"])
+        self.assertEqual(sum(payload["histogram"]), 1)
+        payload = self.get_timers(hours=24, near=30000001, jumps=1).json()
+        self.assertListEqual(self.names(payload), ["First", "Wrapped", "Later"])
+
+    @patch(MODULE_PATH + ".STRUCTUREINTEL_TIMERS_MAX_RESULTS", 1)
+    def test_should_truncate_timers(self):
+        payload = self.get_timers(hours=24).json()
+        self.assertListEqual(self.names(payload), ["First"])
+        self.assertTrue(payload["truncated"])
+
+    def test_should_reject_invalid_parameters(self):
+        for params in ({"hours": 0}, {"hours": "x"}, {"region": "The Forge"}):
+            self.assertEqual(self.get_timers(**params).status_code, 400)
+
+    def test_should_use_reinforce_hour_index(self):
+        structures = timers.timers(Structure.objects.all(), NOW, 3)
+        self.assertIn("structurein_reinfor", structures.explain().replace("\n", " "))
@@ -0,0 +1,103 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from eveuniverse.models import EveCategory, EveGroup, EveType
+
+from ..helper import type_index
+from ..helper.cache import EVE_TYPES, bump_version
+from .testdata import create_eveuniverse, create_user
+
+
+class TestTypeIndex(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_eveuniverse()
+
+    def setUp(self):
+        cache.clear()
+
+    def test_should_return_type_info(self):
+        self.assertEqual(
+            type_index.get_type("Standup Launcher"),
+            type_index.TypeInfo(35923, 1415, 66),
+        )
+        self.assertIsNone(type_index.get_type("Unknown"))
+
+    def test_should_build_index_once(self):
+        with self.assertNumQueries(1):
+            type_index.get_type("Astrahus")
+        with self.assertNumQueries(0):
+            type_ids, unknown = type_index.resolve_type_ids(
+                ["Astrahus", "Standup Launcher"]
+            )
+        self.assertDictEqual(type_ids, {"Astrahus": 35832, "Standup Launcher": 35923})
+        self.assertListEqual(unknown, [])
+
+    def test_should_rebuild_index_when_types_change(self):
+        type_index.get_type("Astrahus")
+        EveType.objects.filter(id=35832).update(name="Astrahus II")
+        bump_version(EVE_TYPES)
+        self.assertIsNone(type_index.get_type("Astrahus"))
+        self.assertEqual(type_index.get_type("Astrahus II").id, 35832)
+
+    def test_should_look_up_types_missing_from_index(self):
+        category = EveCategory.objects.create(id=6, name="Ship", published=True)
+        group = EveGroup.objects.create(
+            id=25, name="Frigate", eve_category=category, published=True
+        )
+        EveType.objects.create(id=587, name="Rifter", eve_group=group, published=True)
+        type_index.get_type("Astrahus")
+        with self.assertNumQueries(1):
+            type_ids, unknown = type_index.resolve_type_ids(
+                ["Rifter", "Astrahus", "Nonexistent"]
+            )
+        self.assertDictEqual(type_ids, {"Rifter": 587, "Astrahus": 35832})
+        self.assertListEqual(unknown, ["Nonexistent"])
+
+
+class TestStructureTypeCatalog(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        create_eveuniverse()
+        EveType.objects.create(
+            id=35834, name="Keepstar", eve_group_id=1657, published=False
+        )
+        cls.user = create_user()
+
+    def setUp(self):
+        cache.clear()
+        type_index.clear()
+
+    def names(self, term: str, limit: int = 10) -> list:
+        return [entry.name for entry in type_index.search_structure_types(term, limit)]
+
+    def test_should_find_published_structure_types_by_substring(self):
+        self.assertListEqual(self.names("ZAR"), ["Fortizar"])
+        self.assertListEqual(self.names("a"), ["Astrahus", "Fortizar"])
+        self.assertListEqual(self.names("a", limit=1), ["Astrahus"])
+        self.assertListEqual(self.names("Keepstar"), [])
+        self.assertListEqual(self.names("Standup"), [])
+
+    def test_should_share_catalog_between_processes(self):
+        with self.assertNumQueries(1):
+            self.names("Astrahus")
+        type_index.clear()
+        with self.assertNumQueries(0):
+            self.names("Fortizar")
+
+    def test_should_rebuild_catalog_when_types_change(self):
+        self.names("Astrahus")
+        with self.captureOnCommitCallbacks(execute=True):
+            EveType.objects.filter(id=35834).update(published=True)
+            EveType.objects.get(id=35834).save()
+        self.assertListEqual(self.names("Keepstar"), ["Keepstar"])
+
+    def test_view_should_return_cacheable_results(self):
+        self.client.force_login(self.user)
+        response = self.client.get(
+            reverse("structureintel:structures"), {"term": "fort"}
+        )
+        self.assertDictEqual(
+            response.json(), {"data": [{"id": 35833, "text": "Fortizar"}]}
+        )
+        self.assertIn("max-age=3600", response["Cache-Control"])
@@ -0,0 +1,196 @@
+from django.contrib.auth.models import Permission, User
+from eveuniverse.models import (
+    EveCategory,
+    EveConstellation,
+    EveDogmaAttribute,
+    EveGroup,
+    EveRegion,
+    EveSolarSystem,
+    EveStargate,
+    EveType,
+    EveTypeDogmaAttribute,
+)
+
+from allianceauth.tests.auth_utils import AuthUtils
+
+from ..helper.fittings import (
+    CanonicalModule,
+    get_or_create_fittings,
+    refresh_module_summaries,
+)
+from ..models import FittingModule, Structure
+
+STRUCTURE_CATEGORY_ID = 65
+STRUCTURE_MODULE_CATEGORY_ID = 66
+
+MODULES = {
+    FittingModule.Slot.HIGHSLOT: (
+        (35923, "Standup Launcher"),
+        (35926, "Standup Point Defense Battery I"),
+    ),
+    FittingModule.Slot.MEDSLOT: (
+        (35943, "Standup Warp Scrambler I"),
+        (35945, "Standup Stasis Webifier I"),
+    ),
+    FittingModule.Slot.LOWSLOT: ((35955, "Standup Ballistic Control System I"),),
+    FittingModule.Slot.RIGSLOT: ((37248, "Standup M-Set Missile Projection I"),),
+    FittingModule.Slot.SERVICE: (
+        (35892, "Standup Market Hub I"),
+        (35894, "Standup Cloning Center I"),
+    ),
+}
+
+# slot count dogma attributes of the Astrahus
+ASTRAHUS_SLOTS = {14: 3, 13: 3, 12: 2, 1137: 3, 2056: 3}
+
+FITTING = """High Power Slots
+Standup Launcher
+Standup Point Defense Battery I
+Medium Power Slots
+Standup Warp Scrambler I
+Low Power Slots
+Standup Ballistic Control System I
+Rig Slots
+Standup M-Set Missile Projection I
+Service Slots
+Standup Market Hub I
+Standup Cloning Center I
+"""
+
+
+def create_eveuniverse():
+    """Create a minimal eve universe with two regions and structure types"""
+    for region_num, region_id in enumerate((10000001, 10000002)):
+        region = EveRegion.objects.create(id=region_id, name=f"Region {region_id}")
+        constellation = EveConstellation.objects.create(
+            id=region_id + 10000000,
+            name=f"Constellation {region_id}",
+            eve_region=region,
+        )
+        for num in range(3):
+            EveSolarSystem.objects.create(
+                id=30000001 + region_num * 10 + num,
+                name=f"System {region_id}-{num}",
+                eve_constellation=constellation,
+                security_status=-0.5,
+            )
+
+    structures = EveCategory.objects.create(
+        id=STRUCTURE_CATEGORY_ID, name="Structure", published=True
+    )
+    citadels = EveGroup.objects.create(
+        id=1657, name="Citadel", eve_category=structures, published=True
+    )
+    EveType.objects.create(
+        id=35832, name="Astrahus", eve_group=citadels, published=True
+    )
+    EveType.objects.create(
+        id=35833, name="Fortizar", eve_group=citadels, published=True
+    )
+    for attribute_id, value in ASTRAHUS_SLOTS.items():
+        attribute, _ = EveDogmaAttribute.objects.get_or_create(
+            id=attribute_id, defaults={"name": f"Slots {attribute_id}"}
+        )
+        EveTypeDogmaAttribute.objects.create(
+            eve_type_id=35832, eve_dogma_attribute=attribute, value=value
+        )
+
+    structure_modules = EveCategory.objects.create(
+        id=STRUCTURE_MODULE_CATEGORY_ID, name="Structure Module", published=True
+    )
+    modules = EveGroup.objects.create(
+        id=1415, name="Structure Module", eve_category=structure_modules, published=True
+    )
+    for slot_modules in MODULES.values():
+        for type_id, name in slot_modules:
+            EveType.objects.create(
+                id=type_id, name=name, eve_group=modules, published=True
+            )
+
+
+def create_stargates(connections) -> None:
+    """Create a pair of stargates for every connection between two systems"""
+    celestials, _ = EveCategory.objects.get_or_create(
+        id=2, defaults={"name": "Celestial", "published": True}
+    )
+    stargates, _ = EveGroup.objects.get_or_create(
+        id=10,
+        defaults={"name": "Stargate", "eve_category": celestials, "published": True},
+    )
+    gate_type, _ = EveType.objects.get_or_create(
+        id=16, defaults={"name": "Stargate", "eve_group": stargates, "published": True}
+    )
+    next_id = 50000001 + EveStargate.objects.count()
+    for first_id, second_id in connections:
+        for source_id, destination_id in (
+            (first_id, second_id),
+            (second_id, first_id),
+        ):
+            EveStargate.objects.create(
+                id=next_id,
+                name=f"Stargate ({destination_id})",
+                eve_solar_system_id=source_id,
+                destination_eve_solar_system_id=destination_id,
+                eve_type=gate_type,
+            )
+            next_id += 1
+
+
+def create_structure(**kwargs) -> Structure:
+    params = {
+        "eve_solar_system": EveSolarSystem.objects.first(),
+        "eve_type_id": 35832,
+        "name": "Test Structure",
+        "owner": "Test Corp",
+        "power_mode": Structure.PowerMode.FULL_POWER,
+        "reinforce_hour": 18,
+    }
+    params.update(kwargs)
+    return Structure.objects.create(**params)
+
+
+def create_structures(count: int, with_modules: bool = True) -> list:
+    """Create structures spread over all systems, all with the same full fitting"""
+    systems = list(EveSolarSystem.objects.order_by("id"))
+    structures = [
+        create_structure(
+            eve_solar_system=systems[num % len(systems)],
+            name=f"Structure {num}",
+            reinforce_hour=num % 24,
+        )
+        for num in range(count)
+    ]
+    if with_modules:
+        fitting = tuple(
+            CanonicalModule(slot, type_id, 1)
+            for slot, slot_modules in MODULES.items()
+            for type_id, _ in slot_modules
+        )
+        fitting_id = get_or_create_fittings([fitting])[fitting]
+        Structure.objects.filter(
+            id__in=[structure.id for structure in structures]
+        ).update(fitting_id=fitting_id)
+        for structure in structures:
+            structure.fitting_id = fitting_id
+        refresh_module_summaries([structure.id for structure in structures])
+    return structures
+
+
+def create_user(username: str = "Bruce Wayne", permissions=None):
+    """Create a user with a main character and the given app permissions.
+
+    App permissions are looked up on the General model, since
+    ``delete_structure`` is also a default permission of Structure.
+    """
+    user = AuthUtils.create_user(username)
+    AuthUtils.add_main_character_2(user, username, 1001 + user.pk)
+    for permission in ["structureintel.basic_access"] + list(permissions or []):
+        app_label, codename = permission.split(".")
+        user.user_permissions.add(
+            Permission.objects.get(
+                content_type__app_label=app_label,
+                content_type__model="general",
+                codename=codename,
+            )
+        )
+    return User.objects.get(pk=user.pk)
@@ -6,14 +6,33 @@ app_name = "structureintel"
 
 urlpatterns = [
     path("", views.index, name="index"),
+    path("dashboard", views.dashboard, name="dashboard"),
     path("list_data", views.structureintel_list_data, name="structureintel_list_data"),
     path("add_structure/", views.CreateStructureView.as_view(), name="add_structure"),
     path("solar_system", views.solar_system, name="solar_system"),
     path("structures", views.structures, name="structures"),
+    path("proximity", views.proximity, name="proximity"),
+    path("timers", views.reinforcement_timers, name="timers"),
     path(
         "<int:structure_id>/structure_details",
         views.structure_details,
         name="structure_details",
     ),
+    path("update/<int:pk>", views.UpdateStructureView.as_view(), name="update"),
     path("remove/<int:pk>", views.RemoveStructureView.as_view(), name="delete"),
+    path("import/", views.import_structures, name="import_structures"),
+    path("import/<int:job_id>", views.import_status, name="import_status"),
+    path(
+        "import/<int:job_id>/data",
+        views.import_status_data,
+        name="import_status_data",
+    ),
+    path("stats", views.stats, name="stats"),
+    path("profiles/", views.profiles, name="profiles"),
+    path("profiles/<str:capture_id>", views.profile_detail, name="profile_detail"),
+    path(
+        "profiles/<str:capture_id>/download",
+        views.profile_download,
+        name="profile_download",
+    ),
 ]
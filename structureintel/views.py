@@ -1,162 +1,477 @@
-from enum import IntEnum
+import json
+from typing import Optional
 
+from django.contrib.admin.views.decorators import staff_member_required
 from django.contrib.auth.decorators import login_required, permission_required
 from django.contrib.auth.mixins import LoginRequiredMixin, PermissionRequiredMixin
-from django.contrib.staticfiles.storage import staticfiles_storage
-from django.http import JsonResponse
-from django.shortcuts import get_object_or_404, render
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import (
+    FileResponse,
+    Http404,
+    HttpResponse,
+    HttpResponseBadRequest,
+    JsonResponse,
+    StreamingHttpResponse,
+)
+from django.shortcuts import get_object_or_404, redirect, render
+from django.template.loader import render_to_string
+from django.utils.cache import patch_cache_control
+from django.utils.dateparse import parse_datetime
+from django.utils.decorators import method_decorator
+from django.utils.timezone import is_naive, make_aware, now
 from django.views import View
-from django.views.generic import CreateView, DeleteView
-from eveuniverse.models import EveSolarSystem, EveType, EveTypeDogmaAttribute
+from django.views.decorators.http import condition
+from django.views.generic import CreateView, DeleteView, UpdateView
 
-from structureintel.forms import StructureForm
+from structureintel import tasks
+from structureintel.app_settings import (
+    STRUCTUREINTEL_AUTOCOMPLETE_MAX_AGE,
+    STRUCTUREINTEL_AUTOCOMPLETE_MAX_RESULTS,
+    STRUCTUREINTEL_INSTRUMENTATION,
+    STRUCTUREINTEL_LIST_POLL_INTERVAL,
+    STRUCTUREINTEL_LIST_SERVER_SIDE,
+    STRUCTUREINTEL_LIST_STREAMING,
+    STRUCTUREINTEL_LIST_STREAMING_CHUNK_SIZE,
+    STRUCTUREINTEL_PROFILING,
+    STRUCTUREINTEL_PROXIMITY_MAX_JUMPS,
+    STRUCTUREINTEL_TIMERS_MAX_RESULTS,
+)
+from structureintel.forms import StructureForm, StructureImportForm
+from structureintel.helper import (
+    delta,
+    instrumentation,
+    profiling,
+    rollups,
+    stargate_graph,
+    system_index,
+    timers,
+    type_index,
+)
+from structureintel.helper.cache import (
+    LIST_DATA,
+    details_get,
+    details_key,
+    details_set,
+    get_version,
+    list_data_get,
+    list_data_key,
+    list_data_set,
+)
+from structureintel.helper.datatables import StructureDataTable
+from structureintel.helper.details import details_context
+from structureintel.helper.instrumentation import instrument, mark_cache
 from structureintel.helper.serializer import (
     EveTypeSerializer,
     SolarSystemSerializer,
+    StructureCompactSerializer,
     StructureSerializer,
 )
 
-from .models import Structure, StructureModule
+from .models import ImportJob, Structure
 
 
+@instrument("index")
 @login_required
 @permission_required("structureintel.basic_access")
 def index(request):
-    return render(request, "structureintel/index.html")
+    context = {
+        "server_side": STRUCTUREINTEL_LIST_SERVER_SIDE,
+        "poll_interval": STRUCTUREINTEL_LIST_POLL_INTERVAL,
+        "proximity_max_jumps": STRUCTUREINTEL_PROXIMITY_MAX_JUMPS,
+        "timer_hours": (1, 3, 6, 12, 24),
+    }
+    return render(request, "structureintel/index.html", context)
 
 
+@instrument("dashboard")
 @login_required
 @permission_required("structureintel.basic_access")
-def structureintel_list_data(request) -> JsonResponse:
-    """Fetch view for structure list"""
-    structures = Structure.objects.all()
-    serializer = StructureSerializer(structures)
-    return JsonResponse({"data": serializer.to_list(request)})
+def dashboard(request):
+    """Structure counts by region, constellation, owner, type, power mode
+    and service, read from the stored rollups
+    """
+    tables = rollups.get_tables()
+    context = {
+        "tables": tables,
+        "structure_count": next(
+            table.total for table in tables if table.dimension == rollups.Dimension.TYPE
+        ),
+    }
+    return render(request, "structureintel/dashboard.html", context)
+
+
+def _is_compact(request) -> bool:
+    return request.GET.get("format") == "compact"
+
+
+def _list_data_etag(request) -> Optional[str]:
+    """ETag of the full structure list, which only changes with the dataset"""
+    if "draw" in request.GET or "since" in request.GET:
+        return None
+    can_delete = request.user.has_perm("structureintel.delete_structure")
+    return f"{get_version(LIST_DATA)}-{int(can_delete)}-{int(_is_compact(request))}"
+
+
+@instrument("list_data")
+@login_required
+@permission_required("structureintel.basic_access")
+@condition(etag_func=_list_data_etag)
+def structureintel_list_data(request) -> HttpResponse:
+    """Fetch view for structure list
+
+    Requests from DataTables in server-side processing mode (with a ``draw``
+    parameter) get only the requested page, otherwise the full list is returned.
+    With ``format=compact`` rows are sent as arrays of raw values plus lookup
+    tables, see ``StructureCompactSerializer``.
+    Payloads are cached until structures or their modules change. With
+    ``STRUCTUREINTEL_LIST_STREAMING`` the full list is streamed uncached instead.
+    All payloads carry a cursor, which can be passed back as ``since`` to get
+    only the changes since then, see ``delta``.
+    """
+    can_delete = request.user.has_perm("structureintel.delete_structure")
+    compact = _is_compact(request)
+    cursor = delta.make_cursor(now())
+    version = get_version(LIST_DATA)
+    if "since" in request.GET:
+        response = _list_delta(request, compact, cursor)
+    elif "draw" in request.GET:
+        table = StructureDataTable(request.GET)
+        key = list_data_key(version, can_delete, request.GET, compact)
+        payload = list_data_get(key)
+        mark_cache(request, payload is not None)
+        if payload is None:
+            payload = table.to_dict(request, compact)
+            list_data_set(key, payload)
+        payload["draw"] = table.request.draw
+        payload["cursor"] = cursor
+        response = JsonResponse(payload)
+    elif STRUCTUREINTEL_LIST_STREAMING:
+        serializer_class = (
+            StructureCompactSerializer if compact else StructureSerializer
+        )
+        serializer = serializer_class(Structure.objects.order_by("id"))
+        response = StreamingHttpResponse(
+            serializer.iter_json(
+                request, STRUCTUREINTEL_LIST_STREAMING_CHUNK_SIZE, {"cursor": cursor}
+            ),
+            content_type="application/json",
+        )
+    else:
+        key = list_data_key(version, can_delete, compact=compact)
+        content = list_data_get(key)
+        mark_cache(request, content is not None)
+        if content is None:
+            structures = Structure.objects.all()
+            if compact:
+                payload = StructureCompactSerializer(structures).to_dict(request)
+            else:
+                payload = {"data": StructureSerializer(structures).to_list(request)}
+            content = json.dumps(payload, cls=DjangoJSONEncoder)
+            list_data_set(key, content)
+        # cached payloads get the cursor of this request, which is safe
+        # since they are invalidated by every change
+        content = delta.with_cursor(content, cursor)
+        response = HttpResponse(content, content_type="application/json")
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
 
 
+def _list_delta(request, compact: bool, cursor: str) -> HttpResponse:
+    """Structures changed and IDs of structures deleted since a cursor"""
+    try:
+        since = delta.parse_cursor(request.GET["since"])
+    except ValueError:
+        return HttpResponseBadRequest("Invalid cursor")
+    changes = delta.changes_since(since)
+    if changes is None:
+        return JsonResponse({"cursor": cursor, "reload": True})
+    if compact:
+        payload = StructureCompactSerializer(changes.structures).to_dict(request)
+    else:
+        payload = {"data": StructureSerializer(changes.structures).to_list(request)}
+    payload.update(cursor=cursor, deleted=changes.deleted_ids)
+    return JsonResponse(payload)
+
+
+@instrument("solar_system")
 @login_required
 @permission_required("structureintel.basic_access")
 def solar_system(request) -> JsonResponse:
+    """Autocomplete for solar systems, served from the in-process prefix index"""
     term = request.GET.get("term")
     if not term:
         return JsonResponse({"data": []})
-    queryset = EveSolarSystem.objects.all().filter(name__istartswith=term)
-    return JsonResponse({"data": SolarSystemSerializer(queryset).to_list()})
+    systems = system_index.search(term, STRUCTUREINTEL_AUTOCOMPLETE_MAX_RESULTS)
+    response = JsonResponse({"data": SolarSystemSerializer(systems).to_list()})
+    patch_cache_control(
+        response, private=True, max_age=STRUCTUREINTEL_AUTOCOMPLETE_MAX_AGE
+    )
+    return response
 
 
+@instrument("structures")
 @login_required
 @permission_required("structureintel.basic_access")
 def structures(request) -> JsonResponse:
+    """Autocomplete for structure types, served from the cached type catalog"""
     term = request.GET.get("term")
     if not term:
         return JsonResponse({"data": []})
-    queryset = EveType.objects.all()
-    queryset = queryset.filter(eve_group__eve_category_id=65, published=True)
-    queryset = queryset.distinct().filter(name__icontains=term)
-    return JsonResponse({"data": EveTypeSerializer(queryset).to_list()})
+    types = type_index.search_structure_types(
+        term, STRUCTUREINTEL_AUTOCOMPLETE_MAX_RESULTS
+    )
+    response = JsonResponse({"data": EveTypeSerializer(types).to_list()})
+    patch_cache_control(
+        response, private=True, max_age=STRUCTUREINTEL_AUTOCOMPLETE_MAX_AGE
+    )
+    return response
 
 
+@instrument("proximity")
 @login_required
 @permission_required("structureintel.basic_access")
-def structure_details(request, structure_id):
-    class Slot(IntEnum):
-        HIGH = 14
-        MEDIUM = 13
-        LOW = 12
-        RIG = 1137
-        SERVICE = 2056
-
-        def image_url(self) -> str:
-            """Return url to image file for this slot variant"""
-            id_map = {
-                self.HIGH: "h",
-                self.MEDIUM: "m",
-                self.LOW: "l",
-                self.RIG: "r",
-                self.SERVICE: "s",
-            }
-            try:
-                slot_num = type_attributes[self.value]
-                return staticfiles_storage.url(
-                    f"structureintel/img/pannel/{slot_num}{id_map[self.value]}.png"
-                )
-            except KeyError:
-                return ""
-
-    structure: Structure = get_object_or_404(Structure, id=structure_id)
-
-    type_attributes = {
-        obj["eve_dogma_attribute_id"]: int(obj["value"])
-        for obj in EveTypeDogmaAttribute.objects.filter(
-            eve_type_id=structure.eve_type_id
-        ).values("eve_dogma_attribute_id", "value")
-    }
-    slot_image_urls = {
-        "high": Slot.HIGH.image_url(),
-        "med": Slot.MEDIUM.image_url(),
-        "low": Slot.LOW.image_url(),
-        "rig": Slot.RIG.image_url(),
-        "service": Slot.SERVICE.image_url(),
+def proximity(request) -> JsonResponse:
+    """Structures within a number of jumps from a solar system.
+
+    Expects ``system`` as ID and ``jumps``. Returns the jumps to all systems
+    in range by system ID and the structures in them, nearest first.
+    """
+    try:
+        origin_id = int(request.GET["system"])
+        max_jumps = int(request.GET.get("jumps", 0))
+    except (KeyError, ValueError):
+        return HttpResponseBadRequest("Invalid system or jumps")
+    if not 0 <= max_jumps <= STRUCTUREINTEL_PROXIMITY_MAX_JUMPS:
+        return HttpResponseBadRequest(
+            f"jumps must be between 0 and {STRUCTUREINTEL_PROXIMITY_MAX_JUMPS}"
+        )
+    systems = stargate_graph.systems_within(origin_id, max_jumps)
+    structures = [
+        {
+            "id": structure_id,
+            "name": name,
+            "owner": owner,
+            "system_id": system_id,
+            "system_name": system_name,
+            "type_name": type_name,
+            "jumps": systems[system_id],
+        }
+        for structure_id, name, owner, system_id, system_name, type_name in (
+            Structure.objects.filter(eve_solar_system_id__in=list(systems))
+            .order_by("name", "id")
+            .values_list(
+                "id",
+                "name",
+                "owner",
+                "eve_solar_system_id",
+                "eve_solar_system__name",
+                "eve_type__name",
+            )
+        )
+    ]
+    structures.sort(key=lambda structure: structure["jumps"])
+    return JsonResponse(
+        {
+            "system": origin_id,
+            "jumps": max_jumps,
+            "systems": systems,
+            "structures": structures,
+        }
+    )
+
+
+@instrument("timers")
+@login_required
+@permission_required("structureintel.basic_access")
+def reinforcement_timers(request) -> JsonResponse:
+    """Structures leaving reinforcement within the next ``hours``.
+
+    The area can be limited to a ``region`` ID, an ``owner`` and the systems
+    within ``jumps`` of a ``near`` system. Structures are returned in the
+    compact list format, ordered by the end of their timer, with the end of
+    the timers by reinforce hour and the number of structures in the area by
+    reinforce hour.
+    """
+    try:
+        hours = int(request.GET.get("hours", 6))
+        region_id = int(request.GET["region"]) if request.GET.get("region") else None
+        near = int(request.GET["near"]) if request.GET.get("near") else None
+        jumps = int(request.GET.get("jumps", 0))
+    except ValueError:
+        return HttpResponseBadRequest("Invalid parameters")
+    if not 1 <= hours <= timers.HOURS_PER_DAY:
+        return HttpResponseBadRequest(
+            f"hours must be between 1 and {timers.HOURS_PER_DAY}"
+        )
+    if not 0 <= jumps <= STRUCTUREINTEL_PROXIMITY_MAX_JUMPS:
+        return HttpResponseBadRequest(
+            f"jumps must be between 0 and {STRUCTUREINTEL_PROXIMITY_MAX_JUMPS}"
+        )
+    owner = request.GET.get("owner", "").strip()
+    system_ids = (
+        list(stargate_graph.systems_within(near, jumps)) if near is not None else None
+    )
+    structures = Structure.objects.all()
+    if region_id is not None:
+        structures = structures.filter(**{timers.REGION_FIELD: region_id})
+    if owner:
+        structures = structures.filter(owner=owner)
+    if system_ids is not None:
+        structures = structures.filter(eve_solar_system_id__in=system_ids)
+    moment = now()
+    found = timers.timers(structures, moment, hours)[
+        : STRUCTUREINTEL_TIMERS_MAX_RESULTS + 1
+    ]
+    payload = StructureCompactSerializer(found).to_dict(request)
+    payload["truncated"] = len(payload["data"]) > STRUCTUREINTEL_TIMERS_MAX_RESULTS
+    del payload["data"][STRUCTUREINTEL_TIMERS_MAX_RESULTS:]
+    payload["ends_at"] = {
+        hour: timers.next_occurrence(moment, hour)
+        for hour in timers.window_hours(moment, hours)
     }
+    payload["histogram"] = timers.histogram(region_id, owner, system_ids)
+    return JsonResponse(payload)
+
 
-    fittingModules = StructureModule.objects.filter(structure_id=structure.id)
-    hSlotCounter = -1
-    mSlotCounter = -1
-    lSlotCounter = -1
-    rSlotCounter = -1
-    sSlotCounter = -1
-    activeSlotCounter = None
-    assets_grouped = {}
-    assets = {"HiSlot": [], "MedSlot": [], "LoSlot": [], "RigSlot": [], "SerSlot": []}
-    for fittingModule in fittingModules:
-        slotStr = None
-        if fittingModule.slot == StructureModule.Slot.HIGHSLOT:
-            slotStr = "HiSlot"
-            hSlotCounter = hSlotCounter + 1
-            activeSlotCounter = hSlotCounter
-        elif fittingModule.slot == StructureModule.Slot.MEDSLOT:
-            slotStr = "MedSlot"
-            mSlotCounter = mSlotCounter + 1
-            activeSlotCounter = mSlotCounter
-        elif fittingModule.slot == StructureModule.Slot.LOWSLOT:
-            slotStr = "LoSlot"
-            lSlotCounter = lSlotCounter + 1
-            activeSlotCounter = lSlotCounter
-        elif fittingModule.slot == StructureModule.Slot.RIGSLOT:
-            slotStr = "RigSlot"
-            rSlotCounter = rSlotCounter + 1
-            activeSlotCounter = rSlotCounter
-        elif fittingModule.slot == StructureModule.Slot.SERVICE:
-            slotStr = "SerSlot"
-            sSlotCounter = sSlotCounter + 1
-            activeSlotCounter = sSlotCounter
-        if slotStr:
-            assets_grouped[slotStr + str(activeSlotCounter)] = {
-                "eve_type_id": fittingModule.eve_type.id,
-                "eve_type": {"name": fittingModule.eve_type.name},
-            }
-            assets[slotStr].append(
-                {"id": fittingModule.eve_type.id, "name": fittingModule.eve_type.name}
+@instrument("structure_details")
+@login_required
+@permission_required("structureintel.basic_access")
+def structure_details(request, structure_id):
+    """Details modal of a structure, rendered once per fitting version.
+
+    Shows the fitting at the time given by ``as_of`` in ISO 8601, which is
+    rendered on every request.
+    """
+    if request.GET.get("as_of"):
+        try:
+            as_of = parse_datetime(request.GET["as_of"])
+        except ValueError:
+            as_of = None
+        if as_of is None:
+            return HttpResponseBadRequest("Invalid as_of")
+        if is_naive(as_of):
+            as_of = make_aware(as_of)
+        context = details_context(structure_id, as_of)
+        if context is None:
+            raise Http404("No structure matches the given query.")
+        return HttpResponse(
+            render_to_string("structureintel/structure_details.html", context)
+        )
+
+    key = details_key(structure_id)
+    content = details_get(key)
+    mark_cache(request, content is not None)
+    if content is None:
+        context = details_context(structure_id)
+        if context is None:
+            raise Http404("No structure matches the given query.")
+        content = render_to_string("structureintel/structure_details.html", context)
+        details_set(key, content)
+    return HttpResponse(content)
+
+
+@instrument("import_structures")
+@login_required
+@permission_required("structureintel.basic_access")
+def import_structures(request):
+    """Upload structures for an import in the background"""
+    if request.method == "POST":
+        form = StructureImportForm(request.POST, request.FILES)
+        if form.is_valid():
+            job = ImportJob.objects.create(
+                user=request.user,
+                input_format=form.cleaned_data["input_format"],
+                content=form.cleaned_data["content"],
             )
+            tasks.import_structures.delay(job.pk)
+            return redirect("structureintel:import_status", job.pk)
+    else:
+        form = StructureImportForm()
+    return render(request, "structureintel/structure_import.html", {"form": form})
+
+
+@instrument("import_status")
+@login_required
+@permission_required("structureintel.basic_access")
+def import_status(request, job_id):
+    job = get_object_or_404(ImportJob, pk=job_id, user=request.user)
+    return render(request, "structureintel/import_status.html", {"job": job})
+
+
+@instrument("import_status_data")
+@login_required
+@permission_required("structureintel.basic_access")
+def import_status_data(request, job_id) -> JsonResponse:
+    """Fetch view for the progress of an import"""
+    job = get_object_or_404(ImportJob, pk=job_id, user=request.user)
+    errors = job.errors.order_by("line").values("line", "message")[:100]
+    return JsonResponse(
+        {
+            "status": job.status,
+            "status_display": job.get_status_display(),
+            "progress": job.progress,
+            "total_chunks": job.total_chunks,
+            "finished_chunks": job.finished_chunks,
+            "created": job.created_count,
+            "failed": job.failed_count,
+            "errors": list(errors),
+        }
+    )
+
+
+@login_required
+@staff_member_required
+def stats(request) -> JsonResponse:
+    """Rolling request stats of the instrumented views in this process"""
+    response = JsonResponse(
+        {
+            "enabled": STRUCTUREINTEL_INSTRUMENTATION,
+            "views": instrumentation.stats_summary(),
+        }
+    )
+    patch_cache_control(response, private=True, no_cache=True)
+    return response
+
+
+@login_required
+@staff_member_required
+@permission_required("structureintel.profile_requests")
+def profiles(request):
+    """List of the latest profiling captures"""
     context = {
-        "system": structure.eve_solar_system.name,
-        "name": structure.name,
-        "slots": slot_image_urls,
-        "assets_grouped": assets_grouped,
-        "assets": assets,
-        "structure": {
-            "name": structure.eve_type.name,
-            "eve_type_id": structure.eve_type.id,
-        },
+        "enabled": STRUCTUREINTEL_PROFILING,
+        "captures": profiling.list_captures(),
     }
-    return render(request, "structureintel/structure_details.html", context)
+    return render(request, "structureintel/profiles.html", context)
+
+
+@login_required
+@staff_member_required
+@permission_required("structureintel.profile_requests")
+def profile_detail(request, capture_id):
+    capture = profiling.load_capture(capture_id)
+    if capture is None:
+        raise Http404("No capture matches the given query.")
+    context = {"capture": capture, "stats": profiling.stats_text(capture_id)}
+    return render(request, "structureintel/profile_detail.html", context)
+
+
+@login_required
+@staff_member_required
+@permission_required("structureintel.profile_requests")
+def profile_download(request, capture_id):
+    """Raw cProfile stats of a capture for tools like snakeviz"""
+    path = profiling.stats_path(capture_id)
+    if path is None:
+        raise Http404("No capture matches the given query.")
+    return FileResponse(open(path, "rb"), as_attachment=True)
 
 
 class AddUpdateMixin:
     def get_form_kwargs(self):
         """Inject the request user into the kwargs passed to the form."""
         kwargs = super().get_form_kwargs()
-        # kwargs.update({"user": self.request.user})
+        kwargs.update({"user": self.request.user})
         return kwargs
 
 
@@ -166,12 +481,21 @@ class StructureManagementView(LoginRequiredMixin, PermissionRequiredMixin, View)
     title = "Edit Structure"
 
 
+@method_decorator(instrument("create_structure"), name="dispatch")
 class CreateStructureView(StructureManagementView, AddUpdateMixin, CreateView):
     template_name_suffix = "_create_form"
     permission_required = "structureintel.basic_access"
     title = "Create New Structure"
 
 
+@method_decorator(instrument("update_structure"), name="dispatch")
+class UpdateStructureView(StructureManagementView, AddUpdateMixin, UpdateView):
+    template_name_suffix = "_create_form"
+    permission_required = "structureintel.basic_access"
+    title = "Update Structure"
+
+
+@method_decorator(instrument("delete_structure"), name="dispatch")
 class RemoveStructureView(LoginRequiredMixin, PermissionRequiredMixin, DeleteView):
     model = Structure
     permission_required = (